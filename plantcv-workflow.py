@@ -80,6 +80,14 @@ def options():
     cmdline_grp.add_argument("-o", "--other_args", help='Other arguments to pass to the workflow script.',
                              required=False)
     cmdline_grp.add_argument("-z", "--cleanup", help='Remove temporary working directory', default=False)
+    cmdline_grp.add_argument("-r", "--resume",
+                             help='Resume the run of this workflow and output file: only process images that were not '
+                                  'processed successfully by a previous run and add their results to the others.',
+                             default=False, action="store_true")
+    cmdline_grp.add_argument("-n", "--inprocess",
+                             help='Import the workflow once per worker and run its main() function for each image '
+                                  'instead of starting a new Python process per image.',
+                             default=False, action="store_true")
     args = parser.parse_args()
 
     # Create a config
@@ -131,6 +139,8 @@ def options():
         config.coprocess = args.coprocess
         config.cleanup = args.cleanup
         config.append = not args.create
+        config.inprocess = args.inprocess
+        config.resume = args.resume
         config.cluster = "LocalCluster"
         config.cluster_config = {"n_workers": args.cpu, "cores": 1, "memory": "1GB", "disk": "1GB"}
 
@@ -161,16 +171,22 @@ def main():
     # Get options
     config = options()
 
-    # Create temporary directory for job
-    if config.tmp_dir is not None:
-        os.makedirs(config.tmp_dir, exist_ok=True)
-    config.tmp_dir = tempfile.mkdtemp(prefix=start_time + '_', dir=config.tmp_dir)
+    manifest = None
+    if config.resume:
+        # Resumable runs keep their job directory and a manifest of the processed images
+        manifest = plantcv.parallel.RunManifest(config=config)
+        config.tmp_dir = manifest.job_dir
+    else:
+        # Create temporary directory for job
+        if config.tmp_dir is not None:
+            os.makedirs(config.tmp_dir, exist_ok=True)
+        config.tmp_dir = tempfile.mkdtemp(prefix=start_time + '_', dir=config.tmp_dir)
 
     # Create img_outdir
     os.makedirs(config.img_outdir, exist_ok=True)
 
-    # Remove JSON results file if append=False
-    if not config.append and os.path.exists(config.json):
+    # Remove JSON results file if append=False (a resumed run rebuilds it at the end)
+    if not config.append and manifest is None and os.path.exists(config.json):
         os.remove(config.json)
 
     # Read image metadata
@@ -178,6 +194,8 @@ def main():
     parser_start_time = time.time()
     print("Reading image metadata...", file=sys.stderr)
     meta = plantcv.parallel.metadata_parser(config=config)
+    if manifest is not None:
+        meta = manifest.pending(meta=meta, coprocess=config.coprocess)
     parser_clock_time = time.time() - parser_start_time
     print(f"Reading image metadata took {parser_clock_time} seconds.", file=sys.stderr)
     ###########################################
@@ -195,7 +213,13 @@ def main():
     multi_start_time = time.time()
     print("Processing images... ", file=sys.stderr)
     cluster_client = plantcv.parallel.create_dask_cluster(cluster=config.cluster, cluster_config=config.cluster_config)
-    plantcv.parallel.multiprocess(jobs=jobs, client=cluster_client)
+    callback = None
+    if manifest is not None:
+        callback = manifest.record
+    plantcv.parallel.multiprocess(jobs=jobs, client=cluster_client, inprocess=config.inprocess, callback=callback,
+                                  batch_size=config.batch_size)
+    if manifest is not None:
+        manifest.close()
     multi_clock_time = time.time() - multi_start_time
     print(f"Processing images took {multi_clock_time} seconds.", file=sys.stderr)
     ###########################################
@@ -205,13 +229,18 @@ def main():
     # Process results start time
     process_results_start_time = time.time()
     print("Processing results... ", file=sys.stderr)
-    plantcv.parallel.process_results(job_dir=config.tmp_dir, json_file=config.json)
+    # Parse results with up to one local process per worker
+    workers = min(config.cluster_config.get("n_workers", 1), os.cpu_count() or 1)
+    if manifest is not None:
+        # Combine the results of every attempt of the run with the results the run started from
+        manifest.restore_base(json_file=config.json)
+    plantcv.parallel.process_results(job_dir=config.tmp_dir, json_file=config.json, workers=workers)
     process_results_clock_time = time.time() - process_results_start_time
     print(f"Processing results took {process_results_clock_time} seconds.", file=sys.stderr)
     ###########################################
 
-    # Cleanup
-    if config.cleanup is True:
+    # Cleanup (the run directory of a resumable run is kept so that later runs can skip the processed images)
+    if config.cleanup is True and manifest is None:
         shutil.rmtree(config.tmp_dir)
 ###########################################
 
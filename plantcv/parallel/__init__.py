@@ -9,6 +9,7 @@ from plantcv.parallel.job_builder import job_builder
 from plantcv.parallel.process_results import process_results
 from plantcv.parallel.multiprocess import multiprocess
 from plantcv.parallel.multiprocess import create_dask_cluster
+from plantcv.parallel.run_manifest import RunManifest
 
 __all__ = ["metadata_parser", "job_builder", "process_results", "multiprocess", "convert_datetime_to_unixtime",
            "check_date_range", "WorkflowConfig"]
@@ -34,6 +35,10 @@ class WorkflowConfig:
         self.coprocess = None
         self.cleanup = True
         self.append = True
+        self.inprocess = False
+        self.metadata_index = None
+        self.resume = False
+        self.batch_size = None
         self.cluster = "LocalCluster"
         self.cluster_config = {
             "n_workers": 1,
@@ -0,0 +1,247 @@
+import os
+import json
+import sqlite3
+import hashlib
+
+
+class MetadataIndex:
+    """Persistent (SQLite) index of image directories and the metadata parsed from image filenames.
+
+    Directories are keyed by path and modification time. The contents of a directory are only listed again, and its
+    image filenames only parsed again, when its modification time changes (i.e. files were added, removed, or renamed).
+    Parsed filename metadata are stored in one table per parsing configuration so that metadata filters and date ranges
+    are evaluated as indexed queries.
+    """
+
+    def __init__(self, index_file):
+        """Open (or create) a metadata index.
+
+        Inputs:
+        index_file = path to the SQLite index file
+
+        :param index_file: str
+        """
+        self.conn = sqlite3.connect(index_file)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS directories "
+                          "(path TEXT PRIMARY KEY, mtime INTEGER, subdirs TEXT, files TEXT)")
+        # In-memory copy of the directory listings used during this session
+        self.listings = {}
+
+    def close(self):
+        """Commit changes and close the index."""
+        self.conn.commit()
+        self.conn.close()
+
+    def listdir(self, path):
+        """List the subdirectories and files of a directory, using the cached listing if the directory is unchanged.
+
+        Inputs:
+        path    = directory path
+
+        Returns:
+        mtime   = directory modification time (ns), or None if the directory does not exist
+        subdirs = list of subdirectory names
+        files   = list of file names
+
+        :param path: str
+        :return mtime: int
+        :return subdirs: list
+        :return files: list
+        """
+        if path in self.listings:
+            return self.listings[path]
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            self.listings[path] = (None, [], [])
+            return self.listings[path]
+        row = self.conn.execute("SELECT mtime, subdirs, files FROM directories WHERE path = ?", (path,)).fetchone()
+        if row is not None and row[0] == mtime:
+            listing = (mtime, json.loads(row[1]), json.loads(row[2]))
+        else:
+            subdirs = []
+            files = []
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    # Like os.walk, do not follow symbolic links to directories
+                    if entry.is_dir() and not entry.is_symlink():
+                        subdirs.append(entry.name)
+                    elif entry.is_file():
+                        files.append(entry.name)
+            listing = (mtime, subdirs, files)
+            self.conn.execute("INSERT OR REPLACE INTO directories (path, mtime, subdirs, files) VALUES (?, ?, ?, ?)",
+                              (path, mtime, json.dumps(subdirs), json.dumps(files)))
+        self.listings[path] = listing
+        return listing
+
+    def exists(self, path):
+        """Check whether a file exists, using the cached listing of its directory.
+
+        Inputs:
+        path   = file path
+
+        Returns:
+        exists = True if the file exists
+
+        :param path: str
+        :return exists: bool
+        """
+        dirpath, filename = os.path.split(path)
+        return filename in self.listdir(dirpath)[2]
+
+    def walk(self, top, recursive=True):
+        """Walk a directory tree top-down (like os.walk).
+
+        Inputs:
+        top       = top directory
+        recursive = walk all subdirectories if True, otherwise only list top
+
+        Returns:
+        dirpath   = directory path (generator)
+        mtime     = directory modification time (ns)
+        files     = list of file names
+
+        :param top: str
+        :param recursive: bool
+        :return dirpath: str
+        :return mtime: int
+        :return files: list
+        """
+        stack = [top]
+        while stack:
+            dirpath = stack.pop()
+            mtime, subdirs, files = self.listdir(dirpath)
+            if mtime is None:
+                continue
+            yield dirpath, mtime, files
+            if recursive:
+                stack.extend(reversed([os.path.join(dirpath, subdir) for subdir in subdirs]))
+
+    def update_images(self, signature, n_terms, top, recursive, parser):
+        """Synchronize the parsed image metadata of a directory tree with the index.
+
+        Only directories that are new or changed since the last update are parsed.
+
+        Inputs:
+        signature = string that identifies the parsing configuration
+        n_terms   = number of metadata terms parsed from each filename
+        top       = top directory
+        recursive = include all subdirectories if True, otherwise only top
+        parser    = function that takes a filename and returns a list of n_terms metadata values and the image Unix time
+                    (or None if it is not an image or does not have the expected metadata)
+
+        Returns:
+        table     = name of the image table
+
+        :param signature: str
+        :param n_terms: int
+        :param top: str
+        :param recursive: bool
+        :param parser: function
+        :return table: str
+        """
+        table, parsed = self._image_tables(signature=signature, n_terms=n_terms)
+        placeholders = ", ".join(["?"] * (n_terms + 3))
+        visited = []
+        for dirpath, mtime, files in self.walk(top=top, recursive=recursive):
+            visited.append(dirpath)
+            row = self.conn.execute(f"SELECT mtime FROM {parsed} WHERE dirpath = ?", (dirpath,)).fetchone()
+            if row is not None and row[0] == mtime:
+                continue
+            rows = []
+            for filename in files:
+                image = parser(filename)
+                if image is not None:
+                    metadata, unixtime = image
+                    rows.append([dirpath, filename, unixtime] + list(metadata))
+            self.conn.execute(f"DELETE FROM {table} WHERE dirpath = ?", (dirpath,))
+            self.conn.executemany(f"INSERT INTO {table} VALUES ({placeholders})", rows)
+            self.conn.execute(f"INSERT OR REPLACE INTO {parsed} (dirpath, mtime) VALUES (?, ?)", (dirpath, mtime))
+        if recursive:
+            # Remove directories under top that no longer exist
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS visited (dirpath TEXT PRIMARY KEY)")
+            self.conn.execute("DELETE FROM visited")
+            self.conn.executemany("INSERT OR IGNORE INTO visited VALUES (?)", [(d,) for d in visited])
+            for tbl in (table, parsed):
+                self.conn.execute(f"DELETE FROM {tbl} WHERE ({_scope_sql(recursive=True)}) AND "
+                                  f"dirpath NOT IN (SELECT dirpath FROM visited)", _scope_args(top, recursive=True))
+        self.conn.commit()
+        return table
+
+    def query_images(self, table, top, recursive, filters, start_date, end_date):
+        """Query the indexed images of a directory tree.
+
+        Inputs:
+        table      = name of the image table (from update_images)
+        top        = top directory
+        recursive  = include all subdirectories if True, otherwise only top
+        filters    = dictionary of metadata term positions and a filter value or list of values
+        start_date = start of the date range (Unix time)
+        end_date   = end of the date range (Unix time)
+
+        Returns:
+        image      = tuple of directory path, filename, and metadata values (generator)
+
+        :param table: str
+        :param top: str
+        :param recursive: bool
+        :param filters: dict
+        :param start_date: int
+        :param end_date: int
+        :return image: tuple
+        """
+        where = [_scope_sql(recursive=recursive), "(unixtime IS NULL OR unixtime BETWEEN ? AND ?)"]
+        args = _scope_args(top, recursive=recursive) + [start_date, end_date]
+        for i, values in filters.items():
+            if not isinstance(values, list):
+                values = [values]
+            where.append(f"t{i} IN ({', '.join(['?'] * len(values))})")
+            args.extend(values)
+        sql = f"SELECT * FROM {table} WHERE {' AND '.join(where)} ORDER BY rowid"
+        for row in self.conn.execute(sql, args):
+            yield row[0], row[1], list(row[3:])
+
+    def _image_tables(self, signature, n_terms):
+        """Create (if needed) the image and parsed directory tables of a parsing configuration.
+
+        Inputs:
+        signature = string that identifies the parsing configuration
+        n_terms   = number of metadata terms parsed from each filename
+
+        Returns:
+        table     = name of the image table
+        parsed    = name of the parsed directory table
+
+        :param signature: str
+        :param n_terms: int
+        :return table: str
+        :return parsed: str
+        """
+        key = hashlib.sha1(signature.encode("utf-8")).hexdigest()[:16]
+        table = f"images_{key}"
+        parsed = f"parsed_{key}"
+        # Metadata columns have no type affinity so that values are compared exactly as in Python
+        terms = ", ".join([f"t{i}" for i in range(n_terms)])
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (dirpath TEXT, filename TEXT, unixtime INTEGER"
+                          f"{', ' if terms else ''}{terms})")
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_dirpath ON {table} (dirpath)")
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_unixtime ON {table} (unixtime)")
+        for i in range(n_terms):
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_t{i} ON {table} (t{i})")
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS {parsed} (dirpath TEXT PRIMARY KEY, mtime INTEGER)")
+        return table, parsed
+
+
+def _scope_sql(recursive):
+    """SQL condition that selects a directory (and optionally its subdirectories)."""
+    if recursive:
+        return "(dirpath = ? OR substr(dirpath, 1, ?) = ?)"
+    return "dirpath = ?"
+
+
+def _scope_args(top, recursive):
+    """Arguments of the SQL condition from _scope_sql."""
+    if recursive:
+        prefix = os.path.join(top, "")
+        return [top, len(prefix), prefix]
+    return [top]
@@ -1,12 +1,180 @@
+import os
+import sys
+import threading
+import traceback
+import math
+import time
+import importlib.util
 import dask_jobqueue
-from dask.distributed import Client, progress
+import matplotlib.pyplot as plt
+from dask.distributed import Client, as_completed
+from dask.utils import format_time
 from subprocess import call
+from plantcv.plantcv import params
+from plantcv.plantcv import outputs
+from plantcv.plantcv._image_writer import _flush_images
+
+
+# Workflow modules imported by in-process workers, keyed by workflow script path
+_workflow_modules = {}
+# In-process jobs share the global params and outputs so only one can run at a time in a worker process
+_workflow_lock = threading.Lock()
+# Target processing time of a batch of jobs (seconds)
+_BATCH_TIME = 30
+# Number of batches submitted at a time for each worker thread
+_BATCHES_PER_THREAD = 2
 
 
 # Process images using multiprocessing
 ###########################################
 def _process_images_multiproc(job):
-    call(job)
+    return call(job) == 0
+
+
+# Import a workflow script as a module (once per worker process)
+###########################################
+def _import_workflow(workflow):
+    """Import a workflow script as a module and cache it for subsequent jobs.
+
+    Inputs:
+    workflow = path to a PlantCV workflow script
+
+    Returns:
+    module   = the imported workflow module
+
+    :param workflow: str
+    :return module: module
+    """
+    workflow = os.path.abspath(workflow)
+    if workflow not in _workflow_modules:
+        spec = importlib.util.spec_from_file_location(f"plantcv_workflow_{len(_workflow_modules)}", workflow)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        if not callable(getattr(module, "main", None)):
+            raise AttributeError(f"The workflow {workflow} does not define a main() function.")
+        _workflow_modules[workflow] = module
+    return _workflow_modules[workflow]
+
+
+# Process images in the worker process
+###########################################
+def _process_images_inprocess(job):
+    """Run a workflow job in the current process.
+
+    The workflow script is imported once per worker and its main() function is called with sys.argv set to the job
+    arguments, so workflows that parse their inputs with argparse work unchanged. The global PlantCV params and outputs
+    are reset before each image.
+
+    Inputs:
+    job     = a job built by job_builder (interpreter, workflow script, workflow arguments)
+
+    Returns:
+    success = True if the workflow finished without errors
+
+    :param job: list
+    :return success: bool
+    """
+    workflow = job[1]
+    with _workflow_lock:
+        argv = sys.argv
+        sys.argv = job[1:]
+        try:
+            module = _import_workflow(workflow)
+            # Reset global PlantCV state so results do not leak between images
+            params.__init__()
+            outputs.clear()
+            module.main()
+            # Images written in the background are part of the job
+            _flush_images()
+            return True
+        except (Exception, SystemExit):
+            # Report the failed image the same way a failed workflow subprocess would and continue
+            print(f"Error processing job: {' '.join(map(str, job))}", file=sys.stderr)
+            traceback.print_exc()
+            return False
+        finally:
+            sys.argv = argv
+            plt.close("all")
+
+
+# Process a batch of jobs sequentially in the worker process
+###########################################
+def _process_batch(runner, batch):
+    """Run a batch of jobs one after the other.
+
+    Inputs:
+    runner    = function that runs one job and returns True if it succeeded
+    batch     = list of jobs
+
+    Returns:
+    successes = list of True/False for each job
+    elapsed   = time spent processing the batch (seconds)
+
+    :param runner: function
+    :param batch: list
+    :return successes: list
+    :return elapsed: float
+    """
+    start = time.perf_counter()
+    successes = []
+    for job in batch:
+        try:
+            successes.append(bool(runner(job)))
+        except Exception:
+            traceback.print_exc()
+            successes.append(False)
+    return successes, time.perf_counter() - start
+
+
+# Size of the next batch of jobs
+###########################################
+def _batch_size(latency, remaining, n_threads):
+    """Choose the number of jobs in a batch from the measured time per job.
+
+    Batches are sized to take about _BATCH_TIME seconds, but are kept small enough to spread the remaining jobs over
+    every worker thread. Until a first batch finishes (no latency measured yet) batches have one job.
+
+    Inputs:
+    latency   = measured processing time per job (seconds), or None
+    remaining = number of jobs not submitted yet
+    n_threads = number of worker threads
+
+    Returns:
+    size      = number of jobs in the batch
+
+    :param latency: float
+    :param remaining: int
+    :param n_threads: int
+    :return size: int
+    """
+    if latency is None:
+        return 1
+    by_time = int(_BATCH_TIME / max(latency, 1e-3))
+    by_threads = math.ceil(remaining / (_BATCHES_PER_THREAD * n_threads))
+    return max(1, min(by_time, by_threads))
+
+
+# Print a progress bar that counts images
+###########################################
+def _draw_progress(done, total, start, width=40):
+    """Print a text progress bar of the number of processed jobs (images).
+
+    Inputs:
+    done  = number of processed jobs
+    total = total number of jobs
+    start = start time (time.time())
+    width = width of the bar (characters)
+
+    :param done: int
+    :param total: int
+    :param start: float
+    :param width: int
+    """
+    frac = done / total if total else 1.0
+    bar = "#" * int(width * frac)
+    sys.stdout.write(f"\r[{bar:<{width}}] | {done}/{total} images | {int(100 * frac)}% Completed | "
+                     f"{format_time(time.time() - start)}")
+    sys.stdout.flush()
 
 
 # Create a dask local or distributed cluster
@@ -45,23 +213,74 @@ def create_dask_cluster(cluster, cluster_config):
 
 # Process jobs using a dask cluster
 ###########################################
-def multiprocess(jobs, client):
+def multiprocess(jobs, client, inprocess=False, callback=None, batch_size=None):
     """Process jobs using a dask cluster.
+
+    Jobs are submitted in batches that each run sequentially on one worker, and only a few batches per worker thread
+    are submitted at a time, so the scheduler tracks a small number of tasks however many images there are. By default
+    the batch size adapts to the measured processing time per image.
+
     Inputs:
-    jobs   = list of jobs where each job is a list of workflow scripts and parameters
-    client = dask cluster client object
+    jobs       = list of jobs where each job is a list of workflow scripts and parameters
+    client     = dask cluster client object
+    inprocess  = if True, workers import the workflow once and run each job in-process instead of starting a new
+                 Python subprocess per image (default: False)
+    callback   = optional function called with each job and True (or False if the job failed) as soon as the job
+                 finishes, e.g. to checkpoint the progress of a run (default: None)
+    batch_size = number of jobs per batch, or None to size batches from the measured time per job (default: None)
 
     :param jobs: list
     :param client: distributed.client.Client
+    :param inprocess: bool
+    :param callback: function
+    :param batch_size: int
     """
-    # Keep a list of job futures
-    processed = []
-    # Submit the jobs to the scheduler
-    for job in jobs:
-        # Submit individual job
-        processed.append(client.submit(_process_images_multiproc, job))
+    # Select the job runner
+    runner = _process_images_multiproc
+    if inprocess:
+        runner = _process_images_inprocess
+    n_jobs = len(jobs)
+    # Index of the next job to submit
+    submitted = 0
+    # Measured processing time per job
+    latency = None
+    # Jobs of each submitted batch, keyed by batch future
+    batches = {}
+    running = as_completed()
+
+    def submit_batches():
+        nonlocal submitted
+        workers = client.scheduler_info().get("workers", {}).values()
+        n_threads = max(sum([worker.get("nthreads", 1) for worker in workers]), 1)
+        while submitted < n_jobs and len(batches) < _BATCHES_PER_THREAD * n_threads:
+            size = batch_size or _batch_size(latency=latency, remaining=n_jobs - submitted, n_threads=n_threads)
+            batch = jobs[submitted:submitted + size]
+            submitted += len(batch)
+            future = client.submit(_process_batch, runner, batch, pure=False)
+            batches[future] = batch
+            running.add(future)
+
+    start = time.time()
+    done = 0
+    submit_batches()
     # Watch job progress and print a progress bar
-    progress(processed)
+    for future in running:
+        batch = batches.pop(future)
+        try:
+            successes, elapsed = future.result()
+            # Update the time per job (moving average)
+            batch_latency = elapsed / len(batch)
+            latency = batch_latency if latency is None else (latency + batch_latency) / 2
+        except Exception:
+            # The batch did not run (e.g. its worker was lost)
+            traceback.print_exc()
+            successes = [False] * len(batch)
+        done += len(batch)
+        _draw_progress(done=done, total=n_jobs, start=start)
+        if callback is not None:
+            for job, success in zip(batch, successes):
+                callback(job, success)
+        submit_batches()
+    print()
     # Each job outputs results to disk so we do not need to gather results here
     client.shutdown()
-###########################################
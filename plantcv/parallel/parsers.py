@@ -1,7 +1,9 @@
 import os
 import re
 import sys
+import json
 import datetime
+from plantcv.parallel.metadata_index import MetadataIndex
 
 
 # Parse metadata from filenames in a directory
@@ -49,6 +51,11 @@ def metadata_parser(config):
     # Compile regex (even if it's only a delimiter character)
     regex = re.compile(config.delimiter)
 
+    # Open the persistent metadata index, if one is configured
+    index = None
+    if config.metadata_index is not None:
+        index = MetadataIndex(config.metadata_index)
+
     # Check whether there is a snapshot metadata file or not
     if os.path.exists(os.path.join(config.input_dir, "SnapshotInfo.csv")):
         # Open the SnapshotInfo.csv file
@@ -79,7 +86,12 @@ def metadata_parser(config):
                 if len(img) != 0:
                     dirpath = os.path.join(config.input_dir, 'snapshot' + data[colnames['id']])
                     filename = img + '.' + config.imgformat
-                    if not os.path.exists(os.path.join(dirpath, filename)):
+                    if index is not None:
+                        # Check the (cached) directory listing of the snapshot instead of each file
+                        img_exists = index.exists(os.path.join(dirpath, filename))
+                    else:
+                        img_exists = os.path.exists(os.path.join(dirpath, filename))
+                    if not img_exists:
                         print(f"Something is wrong, file {dirpath}/{filename} does not exist", file=sys.stderr)
                         continue
                         # raise IOError("Something is wrong, file {0}/{1} does not exist".format(dirpath, filename))
@@ -159,6 +171,9 @@ def metadata_parser(config):
                             meta[filename] = img_meta
                         elif coimg_store == 1:
                             meta[filename] = img_meta
+    elif index is not None:
+        meta = _indexed_image_metadata(config=config, index=index, regex=regex, metadata_index=metadata_index,
+                                       start_date=start_date_unixtime, end_date=end_date_unixtime)
     else:
         # Compile regular expression to remove image file extensions
         pattern = re.escape('.') + config.imgformat + '$'
@@ -219,6 +234,93 @@ def metadata_parser(config):
                     if img_pass == 1:
                         meta[filename] = img_meta
 
+    if index is not None:
+        index.close()
+
+    return meta
+###########################################
+
+
+# Parse metadata from image filenames using the persistent metadata index
+###########################################
+def _indexed_image_metadata(config, index, regex, metadata_index, start_date, end_date):
+    """Image metadata parser backed by a persistent metadata index.
+
+    Only new or changed directories are listed and parsed, and metadata filters and the date range are applied as
+    index queries.
+
+    Inputs:
+    config         = plantcv.parallel.WorkflowConfig object
+    index          = plantcv.parallel.metadata_index.MetadataIndex object
+    regex          = compiled filename delimiter regular expression
+    metadata_index = dictionary of filename metadata terms and their position in the filename
+    start_date     = start of the date range (Unix time)
+    end_date       = end of the date range (Unix time)
+
+    Outputs:
+    meta           = image metadata dictionary
+
+    :param config: plantcv.parallel.WorkflowConfig
+    :param index: plantcv.parallel.metadata_index.MetadataIndex
+    :param regex: re.Pattern
+    :param metadata_index: dict
+    :param start_date: int
+    :param end_date: int
+    :return meta: dict
+    """
+    meta = {}
+    meta_count = len(config.filename_metadata)
+
+    # Compile regular expression to remove image file extensions
+    pattern = re.escape('.') + config.imgformat + '$'
+    ext = re.compile(pattern, re.IGNORECASE)
+
+    def parser(filename):
+        # Is filename an image?
+        if ext.search(filename) is None:
+            return None
+        # Remove the file extension and parse the metadata
+        metadata = _parse_filename(filename=ext.sub('', filename), delimiter=config.delimiter, regex=regex)
+        # Not all images in a directory may have the same metadata structure only keep those that do
+        if len(metadata) != meta_count:
+            return None
+        unixtime = None
+        if "timestamp" in metadata_index and metadata[metadata_index["timestamp"]] is not None:
+            unixtime = convert_datetime_to_unixtime(timestamp_str=metadata[metadata_index["timestamp"]],
+                                                    date_format=config.timestampformat)
+        return metadata, unixtime
+
+    # Images are parsed once per parsing configuration
+    signature = json.dumps([config.filename_metadata, config.delimiter, config.imgformat, config.timestampformat])
+    table = index.update_images(signature=signature, n_terms=meta_count, top=config.input_dir,
+                                recursive=config.include_all_subdirs is True, parser=parser)
+
+    # A default timestamp (not from the filename) applies to every image
+    if "timestamp" not in metadata_index and config.metadata_terms["timestamp"]["value"] is not None:
+        if check_date_range(start_date, end_date, config.metadata_terms["timestamp"]["value"],
+                            config.timestampformat) is False:
+            return meta
+
+    # Metadata filters on filename metadata terms
+    filters = {}
+    for term in config.metadata_filters:
+        if term in metadata_index:
+            filters[metadata_index[term]] = config.metadata_filters[term]
+
+    for dirpath, filename, metadata in index.query_images(table=table, top=config.input_dir,
+                                                          recursive=config.include_all_subdirs is True,
+                                                          filters=filters, start_date=start_date, end_date=end_date):
+        img_meta = {'path': os.path.join(dirpath, filename)}
+        # For each of the type of metadata PlantCV keeps track of
+        for term in config.metadata_terms:
+            # If the same metadata is found in the image filename, store the value
+            if term in metadata_index:
+                img_meta[term] = metadata[metadata_index[term]]
+            # Or use the default value
+            else:
+                img_meta[term] = config.metadata_terms[term]["value"]
+        meta[filename] = img_meta
+
     return meta
 ###########################################
 
@@ -1,52 +1,438 @@
 import os
 import mimetypes
 import json
+from itertools import chain, islice
+from concurrent.futures import ProcessPoolExecutor
+import pyarrow as pa
+import pyarrow.parquet as pq
 from plantcv.plantcv import fatal_error
+from plantcv.plantcv.classes import _PROFILE_SUFFIX
+from plantcv.plantcv._results_table import _entity_table, _conform_table, _results_schema
+
+# Number of rows per Parquet row group written by process_results
+_ROW_GROUP_ROWS = 128 * 1024
 
 
 # Process results. Parse individual image output files.
 ###########################################
-def process_results(job_dir, json_file):
+def process_results(job_dir, json_file, workers=1):
     """Get results from individual files and combine into final JSON file.
 
+    Results files are parsed by a pool of worker processes and each entity is written to the output file as soon as it
+    is parsed, so memory use does not grow with the number of results files.
+
+    If json_file has a .parquet extension the results are combined into a long-format Parquet table instead (one row
+    per image, sample, and trait). In this case the results files can be JSON or Parquet (Outputs.save_results with
+    outformat="parquet") files.
+
+    If the workflow profiled its PlantCV function calls (params.profile = True), the profiles saved next to the results
+    files are combined into a report of the time and memory used by each workflow step (<json_file name>_profile.csv).
+
     Args:
         job_dir:              Intermediate file output directory.
-        json_file:            Json data table filehandle object.
+        json_file:            Json (or Parquet) data table filehandle object.
+        workers:              Number of worker processes used to parse results files (default = 1).
 
     :param job_dir: str
     :param json_file: obj
+    :param workers: int
     """
+    _aggregate_profiles(job_dir=job_dir, report_file=os.path.splitext(json_file)[0] + "_profile.csv")
+    if os.path.splitext(json_file)[1].lower() == ".parquet":
+        _process_results_parquet(job_dir=job_dir, parquet_file=json_file, workers=workers)
+        return
 
-    if os.path.exists(json_file):
-        with open(json_file, 'r') as datafile:
-            try:
-                data = json.load(datafile)
-                if "variables" not in data or "entities" not in data:
-                    fatal_error("Invalid JSON file")
-            except:
+    # Write to a temporary file so that an existing JSON file is only replaced once all results are combined
+    tmp_file = json_file + ".tmp"
+    try:
+        with open(tmp_file, 'w') as datafile:
+            datafile.write('{"entities": [')
+            variables = {}
+            first = True
+            # Copy any existing entities one at a time
+            if os.path.exists(json_file):
+                variables, copied = _copy_entities(json_file=json_file, datafile=datafile)
+                first = copied == 0
+            # Stream the entities parsed from each results file
+            for entity, entity_vars in _parse_results_files(job_dir=job_dir, workers=workers):
+                if not first:
+                    datafile.write(", ")
+                datafile.write(entity)
+                first = False
+                # Keep track of all metadata and observations variables stored
+                variables.update(entity_vars)
+            # Write out the variables table
+            datafile.write('], "variables": ')
+            json.dump(variables, datafile)
+            datafile.write("}")
+    except BaseException:
+        os.remove(tmp_file)
+        raise
+    os.replace(tmp_file, json_file)
+
+
+def _copy_entities(json_file, datafile):
+    """Copy the entities of an existing JSON data file to the output file, one entity at a time.
+
+    The file is read in chunks and only one entity at a time is decoded, so memory use does not grow with the size of
+    the existing file. Only the variables table is kept.
+
+    Args:
+        json_file:            Existing JSON data file.
+        datafile:             Output file, positioned inside the entities array.
+
+    Returns:
+        variables:            Variables table of the existing file.
+        copied:               Number of entities copied.
+
+    :param json_file: str
+    :param datafile: file object
+    :return variables: dict
+    :return copied: int
+    """
+    variables = None
+    copied = 0
+    found_entities = False
+    try:
+        with open(json_file, 'r') as fp:
+            reader = _JSONReader(fp)
+            if reader.next_char() != "{":
                 fatal_error("Invalid JSON file")
-    else:
-        # Data dictionary
-        data = {"variables": {}, "entities": []}
+            while reader.peek() != "}":
+                key, _ = reader.value()
+                if reader.next_char() != ":":
+                    fatal_error("Invalid JSON file")
+                if key == "entities":
+                    found_entities = True
+                    if reader.next_char() != "[":
+                        fatal_error("Invalid JSON file")
+                    if reader.peek() == "]":
+                        reader.next_char()
+                    else:
+                        while True:
+                            _, entity = reader.value()
+                            if copied > 0:
+                                datafile.write(", ")
+                            datafile.write(entity)
+                            copied += 1
+                            sep = reader.next_char()
+                            if sep == "]":
+                                break
+                            if sep != ",":
+                                fatal_error("Invalid JSON file")
+                elif key == "variables":
+                    variables, _ = reader.value()
+                else:
+                    reader.value()
+                sep = reader.peek()
+                if sep == ",":
+                    reader.next_char()
+                elif sep != "}":
+                    fatal_error("Invalid JSON file")
+    except ValueError:
+        fatal_error("Invalid JSON file")
+    if not found_entities or not isinstance(variables, dict):
+        fatal_error("Invalid JSON file")
+    return variables, copied
+
+
+class _JSONReader:
+    """Read JSON values from a file in chunks, without loading the whole file."""
+
+    def __init__(self, fp, chunk_size=1 << 20):
+        """Start reading a file.
+
+        Args:
+            fp:               File object.
+            chunk_size:       Number of characters read at a time.
+
+        :param fp: file object
+        :param chunk_size: int
+        """
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """Read the next chunk of the file, dropping the part of the buffer that was already read.
+
+        Returns:
+            filled:           False at the end of the file.
+
+        :return filled: bool
+        """
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character ("" at the end of the file)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def next_char(self):
+        """Read the next non-whitespace character ("" at the end of the file)."""
+        char = self.peek()
+        self.pos += len(char)
+        return char
+
+    def value(self):
+        """Read the next JSON value.
+
+        Returns:
+            value:            Decoded value.
+            text:             JSON text of the value.
+
+        :return value: object
+        :return text: str
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # The value may continue in the next chunk
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and isinstance(value, (int, float)) and self._fill():
+                continue
+            text = self.buffer[self.pos:end]
+            self.pos = end
+            return value, text
+
+
+def _find_results_files(job_dir):
+    """Walk through the image processing job directory and find the results files.
+
+    Args:
+        job_dir:              Intermediate file output directory.
+
+    Returns:
+        results_file:         Path to a results file (generator).
+
+    :param job_dir: str
+    :return results_file: str
+    """
+    for (dirpath, dirnames, filenames) in os.walk(job_dir):
+        for filename in filenames:
+            # Skip function call profiles
+            if filename.endswith(_PROFILE_SUFFIX):
+                continue
+            # Make sure file is a text, json, or parquet file
+            if 'text/plain' in mimetypes.guess_type(filename) or 'application/json' in mimetypes.guess_type(filename) \
+                    or os.path.splitext(filename)[1].lower() == ".parquet":
+                yield os.path.join(dirpath, filename)
+
+
+def _aggregate_profiles(job_dir, report_file):
+    """Combine the function call profiles of each image into a report of the workflow steps.
+
+    Calls are grouped by function and device (step) number. The report has one row per step, sorted by the total
+    wall time of the step, with the number of calls and images, the total and mean wall and CPU times (seconds), and
+    the mean and maximum peak memory (bytes). No report is written if there are no profiles.
+
+    Args:
+        job_dir:              Intermediate file output directory.
+        report_file:          Output CSV file.
 
-    # Walk through the image processing job directory and process data from each file
+    :param job_dir: str
+    :param report_file: str
+    """
+    steps = {}
     for (dirpath, dirnames, filenames) in os.walk(job_dir):
         for filename in filenames:
-            # Make sure file is a text or json file
-            if 'text/plain' in mimetypes.guess_type(filename) or 'application/json' in mimetypes.guess_type(filename):
-                # Open results file
-                with open(os.path.join(dirpath, filename)) as results:
-                    obs = json.load(results)
-                    data["entities"].append(obs)
-                    # Keep track of all metadata variables stored
-                    for var in obs["metadata"]:
-                        data["variables"][var] = {"category": "metadata", "datatype": "<class 'str'>"}
-                    # Keep track of all observations variables stored
-                    for sample in obs["observations"]:
-                        for othervars in obs["observations"][sample]:
-                            data["variables"][othervars] = {"category": "observations",
-                                                            "datatype": obs["observations"][sample][othervars]["datatype"]}
-
-    # Write out json file with info from all images
-    with open(json_file, 'w') as datafile:
-        json.dump(data, datafile)
+            if not filename.endswith(_PROFILE_SUFFIX):
+                continue
+            with open(os.path.join(dirpath, filename)) as fp:
+                profile = json.load(fp)
+            for call in profile:
+                step = steps.setdefault((call["function"], call["device"]),
+                                        {"calls": 0, "images": set(), "wall_time": 0, "cpu_time": 0,
+                                         "peak_memory": 0, "max_peak_memory": 0})
+                step["calls"] += 1
+                step["images"].add(filename)
+                step["wall_time"] += call["wall_time"]
+                step["cpu_time"] += call["cpu_time"]
+                step["peak_memory"] += call["peak_memory"]
+                step["max_peak_memory"] = max(step["max_peak_memory"], call["peak_memory"])
+    if not steps:
+        return
+    total_time = sum([step["wall_time"] for step in steps.values()])
+    with open(report_file, "w") as report:
+        report.write(",".join(["function", "device", "calls", "images", "wall_time_total", "wall_time_mean",
+                               "wall_time_percent", "cpu_time_total", "cpu_time_mean", "peak_memory_mean",
+                               "peak_memory_max"]) + "\n")
+        for (function, device), step in sorted(steps.items(), key=lambda item: -item[1]["wall_time"]):
+            calls = step["calls"]
+            percent = 100 * step["wall_time"] / total_time if total_time > 0 else 0
+            row = [function, device, calls, len(step["images"]), step["wall_time"], step["wall_time"] / calls,
+                   percent, step["cpu_time"], step["cpu_time"] / calls, step["peak_memory"] / calls,
+                   step["max_peak_memory"]]
+            report.write(",".join(map(str, row)) + "\n")
+
+
+def _parse_results_files(job_dir, workers=1, parser=None):
+    """Parse each results file in the job directory, in order, using a pool of worker processes.
+
+    Files are submitted to the pool in batches so that only a limited number of parsed results are held in memory.
+
+    Args:
+        job_dir:              Intermediate file output directory.
+        workers:              Number of worker processes.
+        parser:               Function used to parse each results file (default = _parse_results_file).
+
+    Returns:
+        entity:               Parsed results, e.g. the serialized entity and its variables (generator).
+
+    :param job_dir: str
+    :param workers: int
+    :param parser: function
+    :return entity: tuple
+    """
+    if parser is None:
+        parser = _parse_results_file
+    results_files = _find_results_files(job_dir)
+    if workers <= 1:
+        for results_file in results_files:
+            yield parser(results_file)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            batch = list(islice(results_files, workers * 64))
+            while batch:
+                for entity in executor.map(parser, batch, chunksize=16):
+                    yield entity
+                batch = list(islice(results_files, workers * 64))
+
+
+def _parse_results_file(results_file):
+    """Parse a single results file.
+
+    Args:
+        results_file:         Path to a results file.
+
+    Returns:
+        entity:               Entity data serialized as a JSON string.
+        variables:            Dictionary of the metadata and observations variables in the entity.
+
+    :param results_file: str
+    :return entity: str
+    :return variables: dict
+    """
+    if _is_parquet(results_file):
+        fatal_error(f"{results_file} is a Parquet results file, use an output file with a .parquet extension")
+    with open(results_file) as results:
+        obs = json.load(results)
+    variables = {}
+    # Keep track of all metadata variables stored
+    for var in obs["metadata"]:
+        variables[var] = {"category": "metadata", "datatype": "<class 'str'>"}
+    # Keep track of all observations variables stored
+    for sample in obs["observations"]:
+        for othervars in obs["observations"][sample]:
+            variables[othervars] = {"category": "observations",
+                                    "datatype": obs["observations"][sample][othervars]["datatype"]}
+    return json.dumps(obs), variables
+
+
+def _process_results_parquet(job_dir, parquet_file, workers=1):
+    """Combine results files into a long-format Parquet table.
+
+    The schema (metadata columns) is set by the existing Parquet file or else the first results file. The existing
+    results and the parsed results files are buffered and written in row groups of about _ROW_GROUP_ROWS rows, so the
+    number of row groups (and the size of the file footer) does not grow with the number of results files.
+
+    Args:
+        job_dir:              Intermediate file output directory.
+        parquet_file:         Parquet data table file.
+        workers:              Number of worker processes used to parse results files (default = 1).
+
+    :param job_dir: str
+    :param parquet_file: str
+    :param workers: int
+    """
+    existing = None
+    if os.path.exists(parquet_file):
+        try:
+            existing = pq.ParquetFile(parquet_file)
+        except (pa.ArrowInvalid, OSError):
+            fatal_error("Invalid Parquet file")
+
+    # Write to a temporary file so that an existing Parquet file is only replaced once all results are combined
+    tmp_file = parquet_file + ".tmp"
+    writer = None
+    buffer = []
+    buffered_rows = 0
+    try:
+        tables = _parse_results_files(job_dir=job_dir, workers=workers, parser=_parse_results_table)
+        if existing is not None:
+            writer = pq.ParquetWriter(tmp_file, existing.schema_arrow)
+            # Read the existing results one row group at a time, ahead of the new results
+            tables = chain((existing.read_row_group(i) for i in range(existing.num_row_groups)), tables)
+        for table in tables:
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_file, table.schema)
+            buffer.append(_conform_table(table=table, schema=writer.schema))
+            buffered_rows += table.num_rows
+            if buffered_rows >= _ROW_GROUP_ROWS:
+                writer.write_table(pa.concat_tables(buffer), row_group_size=_ROW_GROUP_ROWS)
+                buffer = []
+                buffered_rows = 0
+        if writer is None:
+            # No results, write an empty table
+            writer = pq.ParquetWriter(tmp_file, _results_schema(metadata_vars=[]))
+        if buffer:
+            writer.write_table(pa.concat_tables(buffer), row_group_size=_ROW_GROUP_ROWS)
+        writer.close()
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    os.replace(tmp_file, parquet_file)
+
+
+def _parse_results_table(results_file):
+    """Parse a single results file (JSON or Parquet) into a long-format table.
+
+    Args:
+        results_file:         Path to a results file.
+
+    Returns:
+        table:                Results table.
+
+    :param results_file: str
+    :return table: pyarrow.Table
+    """
+    if _is_parquet(results_file):
+        return pq.read_table(results_file)
+    with open(results_file) as results:
+        return _entity_table(json.load(results))
+
+
+def _is_parquet(filename):
+    """Test whether a file is a Parquet file.
+
+    Args:
+        filename:             Path to a file.
+
+    Returns:
+        is_parquet:           True if the file starts with the Parquet magic number.
+
+    :param filename: str
+    :return is_parquet: bool
+    """
+    with open(filename, "rb") as fp:
+        return fp.read(4) == b"PAR1"
@@ -0,0 +1,187 @@
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import hashlib
+
+
+class RunManifest:
+    """Persistent (SQLite) manifest of a resumable workflow run.
+
+    A resumable run keeps its job directory (results files) and a manifest of the images that were processed
+    successfully, keyed by image path and content hash. The manifest also stores a hash of the workflow (the workflow
+    script and the options that change its results). When the run is restarted with the same workflow, only images that
+    are new, changed, or failed are processed again. If the workflow changed, the run starts over.
+
+    The run directory is <tmp_dir>/<output file name>.run (tmp_dir defaults to the directory of the output file) and
+    contains the manifest, the job directory, and a copy of the output file as it was when the run started (if results
+    are appended to it), so that the output file can be rebuilt from the results of every attempt of the run. Delete
+    the run directory to start a new run.
+    """
+
+    def __init__(self, config):
+        """Open (or start) the run of a workflow configuration.
+
+        Inputs:
+        config = plantcv.parallel.WorkflowConfig object
+
+        :param config: plantcv.parallel.WorkflowConfig
+        """
+        parent = config.tmp_dir
+        if parent is None:
+            parent = os.path.dirname(os.path.abspath(config.json))
+        self.run_dir = os.path.join(parent, os.path.basename(config.json) + ".run")
+        self.job_dir = os.path.join(self.run_dir, "jobs")
+        self.base_file = os.path.join(self.run_dir, "base" + os.path.splitext(config.json)[1])
+        os.makedirs(self.run_dir, exist_ok=True)
+
+        # The manifest is updated from the thread that collects finished jobs
+        self.conn = sqlite3.connect(os.path.join(self.run_dir, "manifest.db"), check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS run (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS images "
+                          "(path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, hash TEXT, success INTEGER)")
+        workflow_hash = _workflow_hash(config=config)
+        row = self.conn.execute("SELECT value FROM run WHERE key = 'workflow_hash'").fetchone()
+        self.new_run = row is None or row[0] != workflow_hash
+        if self.new_run:
+            if row is not None:
+                print("The workflow changed since the last run, all images will be processed again.", file=sys.stderr)
+            self.conn.execute("DELETE FROM images")
+            self.conn.execute("INSERT OR REPLACE INTO run (key, value) VALUES ('workflow_hash', ?)", (workflow_hash,))
+            shutil.rmtree(self.job_dir, ignore_errors=True)
+            # Keep the results the run appends to
+            if config.append and os.path.exists(config.json):
+                shutil.copyfile(config.json, self.base_file)
+            elif os.path.exists(self.base_file):
+                os.remove(self.base_file)
+            self.conn.commit()
+        os.makedirs(self.job_dir, exist_ok=True)
+        # Co-processed image of each image
+        self.coimages = {}
+        self.last_commit = time.time()
+
+    def close(self):
+        """Commit changes and close the manifest."""
+        self.conn.commit()
+        self.conn.close()
+
+    def pending(self, meta, coprocess=None):
+        """Remove the images that were already processed successfully from the image metadata.
+
+        Inputs:
+        meta      = dictionary of image metadata (output from metadata_parser)
+        coprocess = coprocessed image type (co-processed images are kept for the images that are processed)
+
+        Returns:
+        meta      = dictionary of the metadata of the images to process
+
+        :param meta: dict
+        :param coprocess: str
+        :return meta: dict
+        """
+        pending = {}
+        done = 0
+        for img, img_meta in meta.items():
+            if coprocess is not None and img_meta["imgtype"] == coprocess:
+                pending[img] = img_meta
+                continue
+            paths = [img_meta["path"]]
+            if coprocess is not None and "coimg" in img_meta:
+                paths.append(meta[img_meta["coimg"]]["path"])
+                self.coimages[img_meta["path"]] = paths[1]
+            if self._completed(paths):
+                done += 1
+            else:
+                pending[img] = img_meta
+        print(f"Skipping {done} images that were already processed", file=sys.stderr)
+        return pending
+
+    def record(self, job, success):
+        """Record a finished job (used as the multiprocess callback).
+
+        Inputs:
+        job     = a job built by job_builder
+        success = True if the job finished without errors
+
+        :param job: list
+        :param success: bool
+        """
+        path = job[job.index("--image") + 1]
+        size, mtime, content_hash = None, None, None
+        if success:
+            paths = [path] + ([self.coimages[path]] if path in self.coimages else [])
+            size, mtime = _file_stats(paths)
+            content_hash = _content_hash(paths)
+        self.conn.execute("INSERT OR REPLACE INTO images (path, size, mtime, hash, success) VALUES (?, ?, ?, ?, ?)",
+                          (path, size, mtime, content_hash, int(success)))
+        # Checkpoint every few seconds
+        if time.time() - self.last_commit > 5:
+            self.conn.commit()
+            self.last_commit = time.time()
+
+    def restore_base(self, json_file):
+        """Reset the output file to its state at the start of the run, before the results of the run are added.
+
+        Inputs:
+        json_file = output file
+
+        :param json_file: str
+        """
+        if os.path.exists(self.base_file):
+            shutil.copyfile(self.base_file, json_file)
+        elif os.path.exists(json_file):
+            os.remove(json_file)
+
+    def _completed(self, paths):
+        """Check whether an image (and its co-processed image) was processed successfully and is unchanged.
+
+        Inputs:
+        paths     = image path and optional co-processed image path
+
+        Returns:
+        completed = True if the image was processed and its content did not change
+
+        :param paths: list
+        :return completed: bool
+        """
+        row = self.conn.execute("SELECT size, mtime, hash FROM images WHERE path = ? AND success = 1",
+                                (paths[0],)).fetchone()
+        if row is None:
+            return False
+        try:
+            size, mtime = _file_stats(paths)
+        except OSError:
+            return False
+        # Only read the files again if their size or modification time changed
+        if (size, mtime) == (row[0], row[1]):
+            return True
+        if _content_hash(paths) != row[2]:
+            return False
+        self.conn.execute("UPDATE images SET size = ?, mtime = ? WHERE path = ?", (size, mtime, paths[0]))
+        return True
+
+
+def _file_stats(paths):
+    """Total size and latest modification time (ns) of one or more files."""
+    stats = [os.stat(path) for path in paths]
+    return sum([stat.st_size for stat in stats]), max([stat.st_mtime_ns for stat in stats])
+
+
+def _content_hash(paths):
+    """SHA-1 hash of the contents of one or more files."""
+    sha = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as fp:
+            for chunk in iter(lambda: fp.read(1 << 20), b""):
+                sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _workflow_hash(config):
+    """SHA-1 hash of a workflow script and of the configuration options that change its results."""
+    options = [config.other_args, config.writeimg, os.path.abspath(config.img_outdir), config.coprocess,
+               config.filename_metadata, config.delimiter]
+    return hashlib.sha1(_content_hash([config.workflow]).encode("utf-8") +
+                        json.dumps(options).encode("utf-8")).hexdigest()
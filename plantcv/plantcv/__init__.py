@@ -1,4 +1,5 @@
 import os
+import sys
 import matplotlib
 from plantcv.plantcv.fatal_error import fatal_error
 from plantcv.plantcv.classes import Params
@@ -46,6 +47,7 @@ from plantcv.plantcv.roi_objects import roi_objects
 from plantcv.plantcv.object_composition import object_composition
 from plantcv.plantcv.within_frame import within_frame
 from plantcv.plantcv.analyze_object import analyze_object
+from plantcv.plantcv.analyze_tray import analyze_tray
 from plantcv.plantcv.analyze_bound_horizontal import analyze_bound_horizontal
 from plantcv.plantcv.analyze_bound_vertical import analyze_bound_vertical
 from plantcv.plantcv.analyze_color import analyze_color
@@ -86,8 +88,16 @@ from plantcv.plantcv.crop import crop
 from plantcv.plantcv.stdev_filter import stdev_filter
 from plantcv.plantcv.spatial_clustering import spatial_clustering
 from plantcv.plantcv import photosynthesis
+from plantcv.plantcv.window_filter import window_filter
+from plantcv.plantcv.debug_sinks import DebugCollector
+from plantcv.plantcv.debug_sinks import DebugWriter
+from plantcv.plantcv.flush_images import flush_images
 # add new functions to end of lists
 
+# Profile the public functions when params.profile is True
+from plantcv.plantcv._profile import _profile_namespace
+_profile_namespace(sys.modules[__name__])
+
 # Auto versioning
 from ._version import get_versions
 __version__ = get_versions()['version']
@@ -98,8 +108,8 @@ __all__ = ['fatal_error', 'Params', 'Outputs', 'Spectral_data', 'deprecation_war
            'laplace_filter', 'sobel_filter', 'scharr_filter', 'hist_equalization', 'erode', 'image_add',
            'image_fusion', 'image_subtract', 'dilate', 'watershed', 'rectangle_mask', 'rgb2gray_hsv', 'rgb2gray_lab',
            'rgb2gray_cmyk', 'rgb2gray', 'median_blur', 'fill', 'invert', 'logical_and', 'logical_or', 'logical_xor',
-           'find_objects', 'roi_objects', 'object_composition', 'analyze_object', 'morphology',
-           'analyze_bound_horizontal', 'analyze_bound_vertical', 'analyze_color', 'analyze_nir_intensity',
+           'find_objects', 'roi_objects', 'object_composition', 'analyze_object', 'analyze_tray',
+           'morphology', 'analyze_bound_horizontal', 'analyze_bound_vertical', 'analyze_color', 'analyze_nir_intensity',
            'print_results', 'flip', 'crop_position_mask', 'get_nir', 'report_size_marker_area',
            'white_balance', 'acute_vertex', 'scale_features', 'landmark_reference_pt_dist', 'outputs',
            'x_axis_pseudolandmarks', 'y_axis_pseudolandmarks', 'cluster_contours', 'visualize',
@@ -107,4 +117,5 @@ __all__ = ['fatal_error', 'Params', 'Outputs', 'Spectral_data', 'deprecation_war
            'background_subtraction', 'naive_bayes_classifier', 'acute', 'distance_transform', 'params',
            'cluster_contour_mask', 'analyze_thermal_values', 'opening',
            'closing', 'within_frame', 'fill_holes', 'get_kernel',  'crop', 'stdev_filter',
-           'spatial_clustering', 'photosynthesis']
+           'spatial_clustering', 'photosynthesis', 'window_filter', 'DebugCollector', 'DebugWriter',
+           'flush_images']
@@ -0,0 +1,110 @@
+# Connected components of a binary mask with lazily traced contours
+
+import cv2
+import numpy as np
+from plantcv.plantcv import fatal_error
+
+
+class _ConnectedComponents:
+    """Connected components of a binary mask.
+
+    The components are labeled in a single pass (cv2.connectedComponentsWithStats) that also measures the area,
+    bounding box, and centroid of every component. Contours are only traced for the components they are requested for,
+    on an image cropped to the components, and are kept for later use. Labels start at 1 (0 is the background).
+    """
+
+    def __init__(self, mask, connectivity=8):
+        """Label the connected components of a mask.
+
+        Inputs:
+        mask         = Binary image (0 and nonzero values)
+        connectivity = 4 or 8 connected pixels (default = 8)
+
+        :param mask: numpy.ndarray
+        :param connectivity: int
+        """
+        if len(np.shape(mask)) != 2:
+            fatal_error("Mask should be a binary image of 0 and nonzero values.")
+        n_labels, self.labels, self.stats, self.centroids = cv2.connectedComponentsWithStats(
+            np.where(mask > 0, 255, 0).astype(np.uint8), connectivity=connectivity, ltype=cv2.CV_32S)
+        # Number of components (not counting the background)
+        self.n = n_labels - 1
+        self._contours = {}
+
+    @property
+    def areas(self):
+        """Area (number of pixels) of each component, indexed by label (index 0 is the background)."""
+        return self.stats[:, cv2.CC_STAT_AREA]
+
+    @property
+    def bboxes(self):
+        """Bounding box (x, y, width, height) of each component, indexed by label (index 0 is the background)."""
+        return self.stats[:, :4]
+
+    def component_mask(self, labels):
+        """Mask of one or more components, cropped to their bounding box.
+
+        Inputs:
+        labels = Component label or list of component labels
+
+        Returns:
+        mask   = Binary image of the bounding box of the components
+        offset = (x, y) coordinates of the top left corner of the bounding box
+
+        :param labels: int or list
+        :return mask: numpy.ndarray
+        :return offset: tuple
+        """
+        labels = np.atleast_1d(labels)
+        boxes = self.bboxes[labels]
+        x0, y0 = boxes[:, :2].min(axis=0)
+        x1, y1 = (boxes[:, :2] + boxes[:, 2:]).max(axis=0)
+        keep = np.zeros(self.n + 1, dtype=np.uint8)
+        keep[labels] = 255
+        keep[0] = 0
+        return keep[self.labels[y0:y1, x0:x1]], (int(x0), int(y0))
+
+    def contours(self, labels):
+        """Contours of one or more components (outer contours and the contours of holes), in image coordinates.
+
+        The contours are the same as the contours traced on the full-size mask of the components.
+
+        Inputs:
+        labels    = Component label or list of component labels
+
+        Returns:
+        contours  = list of contours
+        hierarchy = contour hierarchy
+
+        :param labels: int or list
+        :return contours: list
+        :return hierarchy: numpy.ndarray
+        """
+        key = tuple(sorted(int(label) for label in np.atleast_1d(labels)))
+        if key not in self._contours:
+            mask, offset = self.component_mask(list(key))
+            contours, hierarchy = _trace_contours(mask=mask, offset=offset)
+            self._contours[key] = (list(contours), hierarchy)
+        return self._contours[key]
+
+
+def _trace_contours(mask, offset=(0, 0)):
+    """Contours of a window of a mask, in image coordinates.
+
+    The window is padded so that objects touching its border are traced as they would be on the full-size mask.
+
+    Inputs:
+    mask      = Binary image of the window
+    offset    = (x, y) coordinates of the top left corner of the window
+
+    Returns:
+    contours  = tuple of contours (as returned by cv2.findContours)
+    hierarchy = contour hierarchy
+
+    :param mask: numpy.ndarray
+    :param offset: tuple
+    :return contours: tuple
+    :return hierarchy: numpy.ndarray
+    """
+    return cv2.findContours(np.pad(mask, 1), cv2.RETR_TREE, cv2.CHAIN_APPROX_NONE,
+                            offset=(int(offset[0]) - 1, int(offset[1]) - 1))[-2:]
@@ -8,19 +8,52 @@ from plantcv.plantcv import plot_image
 def _debug(visual, filename=None, **kwargs):
     """Save or display a visual for debugging.
 
+    The visual can be a function that makes the visual (with no arguments). It is only called if debugging is on, so
+    images that are only made for debugging are not made otherwise.
+
     Inputs:
-    visual   - An image or plot to display for debugging
+    visual   - An image or plot to display for debugging, or a function that returns one
     filename - An optional filename to save the visual to (default: None)
 
-    :param visual: numpy.ndarray
+    :param visual: numpy.ndarray or function
     :param filename: str
     """
     # Auto-increment the device counter
     params.device += 1
-    
+
+    sink = _debug_sink()
+    if sink is None:
+        return
+    if callable(visual):
+        visual = visual()
+    sink(visual, filename=filename, **kwargs)
+
+
+def _debug_sink():
+    """The active debug sink.
+
+    Returns:
+    sink     - A function that takes a visual and a filename, or None if debugging is off
+
+    :return sink: function
+    """
     if params.debug == "print":
         # If debug is print, save the image to a file
-        print_image(img=visual, filename=filename)
+        return _print_sink
     elif params.debug == "plot":
         # If debug is plot, print to the plotting device
-        plot_image(img=visual, **kwargs)
+        return _plot_sink
+    elif callable(params.debug):
+        # A debug sink object (e.g. plantcv.DebugCollector or plantcv.DebugWriter)
+        return params.debug
+    return None
+
+
+def _print_sink(visual, filename=None, **kwargs):
+    """Save a visual to a file."""
+    print_image(img=visual, filename=filename)
+
+
+def _plot_sink(visual, filename=None, **kwargs):
+    """Display a visual on the plotting device."""
+    plot_image(img=visual, **kwargs)
@@ -0,0 +1,120 @@
+# Shape geometry of objects computed from their contour coordinates
+
+import cv2
+import numpy as np
+
+
+def _caliper(hulls, centers):
+    """Longest path of each object: the chord of its convex hull along the line through the center of mass and the
+    convex hull vertex furthest from it.
+
+    The chords are found by clipping the lines against the convex hulls (Cyrus-Beck), for all objects at once.
+
+    Inputs:
+    hulls     = list of convex hulls (output from cv2.convexHull)
+    centers   = list of (x, y) centers of mass
+
+    Returns:
+    lengths   = length of each chord
+    endpoints = start and end (x, y) points of each chord
+
+    :param hulls: list
+    :param centers: list
+    :return lengths: numpy.ndarray
+    :return endpoints: numpy.ndarray
+    """
+    n = len(hulls)
+    if n == 0:
+        return np.zeros(0), np.zeros((0, 2, 2))
+    sizes = np.array([len(hull) for hull in hulls])
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    group = np.repeat(np.arange(n), sizes)
+    vertices = np.vstack([np.reshape(hull, (-1, 2)) for hull in hulls]).astype(np.float64)
+    centers = np.asarray(centers, dtype=np.float64).reshape(n, 2)
+
+    # Convex hull vertex furthest from the center of mass (the first one if there are ties)
+    dist = np.hypot(vertices[:, 0] - centers[group, 0], vertices[:, 1] - centers[group, 1])
+    order = np.lexsort((-dist, group))
+    furthest = vertices[order[starts]]
+    direction = furthest - centers
+
+    # Edges of each hull (the last vertex is joined to the first one)
+    following = np.arange(len(vertices)) + 1
+    following[starts + sizes - 1] = starts
+    edges = vertices[following] - vertices
+    # Orientation of each hull from its signed area, to point the edge normals outwards
+    cross = vertices[:, 0] * vertices[following, 1] - vertices[following, 0] * vertices[:, 1]
+    orientation = np.sign(np.add.reduceat(cross, starts))
+    normals = np.column_stack((edges[:, 1], -edges[:, 0])) * orientation[group, None]
+
+    # The line center + t * direction is inside the half-plane of an edge where num + t * den <= 0
+    num = np.sum(normals * (centers[group] - vertices), axis=1)
+    den = np.sum(normals * direction[group], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = -num / den
+    t_min = np.maximum.reduceat(np.where(den < 0, t, -np.inf), starts)
+    t_max = np.minimum.reduceat(np.where(den > 0, t, np.inf), starts)
+    # Lines parallel to an edge and outside of it do not cross the hull
+    outside = np.maximum.reduceat(((den == 0) & (num > 0)).astype(int), starts) > 0
+
+    # Flat hulls (points or line segments) have no area. If the line runs along the hull the chord is the extent of
+    # the vertices along the line, otherwise the line only touches the hull at the furthest vertex
+    flat = orientation == 0
+    if np.any(flat):
+        offsets = vertices - centers[group]
+        norm = np.sum(direction ** 2, axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            proj = np.sum(offsets * direction[group], axis=1) / norm[group]
+        cross = offsets[:, 0] * direction[group, 1] - offsets[:, 1] * direction[group, 0]
+        off_line = np.abs(cross) > 1e-9 * norm[group]
+        along = flat & (np.maximum.reduceat(off_line.astype(int), starts) == 0)
+        t_min[flat] = 1
+        t_max[flat] = 1
+        t_min[along] = np.minimum.reduceat(proj, starts)[along]
+        t_max[along] = np.maximum.reduceat(proj, starts)[along]
+        outside[flat] = False
+
+    # Lines that miss the hull (or hulls with all of their vertices at the center of mass) have a chord of length 0
+    empty = outside | (t_min > t_max) | ~np.isfinite(t_min) | ~np.isfinite(t_max)
+    t_min[empty] = 0
+    t_max[empty] = 0
+    endpoints = np.stack((centers + t_min[:, None] * direction, centers + t_max[:, None] * direction), axis=1)
+    lengths = (t_max - t_min) * np.hypot(direction[:, 0], direction[:, 1])
+    return lengths, endpoints
+
+
+def _shape_properties(objects, areas, centers):
+    """Shape properties of objects (single or grouped contours) from their contour coordinates.
+
+    Inputs:
+    objects    = list of single or grouped contour objects
+    areas      = list of object areas (number of pixels)
+    centers    = list of (x, y) centers of mass
+
+    Returns:
+    properties = list of dictionaries (one per object) of the convex hull ('hull', 'hull_area', 'solidity'),
+                 'perimeter', 'ellipse' (center, axes, and angle from cv2.fitEllipse, or None if the object has
+                 less than 5 points), and longest path ('longest_path', 'caliper' start and end points)
+
+    :param objects: list
+    :param areas: list
+    :param centers: list
+    :return properties: list
+    """
+    properties = []
+    for obj, area in zip(objects, areas):
+        hull = cv2.convexHull(obj)
+        hull_area = cv2.contourArea(hull)
+        solidity = 1
+        if int(hull_area) != 0:
+            solidity = area / hull_area
+        ellipse = None
+        if len(obj) >= 5:
+            ellipse = cv2.fitEllipse(obj)
+        properties.append({"hull": hull, "hull_area": hull_area, "solidity": solidity,
+                           "perimeter": cv2.arcLength(obj, closed=True), "ellipse": ellipse})
+    lengths, endpoints = _caliper(hulls=[prop["hull"] for prop in properties], centers=centers)
+    for prop, length, caliper in zip(properties, lengths, endpoints):
+        prop["longest_path"] = float(length)
+        prop["caliper"] = caliper
+    return properties
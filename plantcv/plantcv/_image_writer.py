@@ -0,0 +1,181 @@
+# Write images to files from a pool of background threads
+
+import os
+import sys
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+import cv2
+import numpy as np
+from plantcv.plantcv import params
+from plantcv.plantcv import fatal_error
+
+# Image file formats that can be set with params.image_format (file extension: OpenCV quality flag)
+_IMAGE_FORMATS = {"png": None, "jpg": cv2.IMWRITE_JPEG_QUALITY, "jpeg": cv2.IMWRITE_JPEG_QUALITY,
+                  "webp": cv2.IMWRITE_WEBP_QUALITY}
+
+
+class _ImageWriter:
+    """Pool of threads that encode and write images.
+
+    At most two images per thread are queued, after which the caller waits for a thread to be free, so the memory used
+    by queued images stays bounded. OpenCV releases the GIL while it encodes images, so the threads write images in
+    parallel with the workflow.
+    """
+
+    def __init__(self, threads):
+        """Start the pool.
+
+        Inputs:
+        threads = Number of writer threads
+
+        :param threads: int
+        """
+        self.threads = threads
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="plantcv-image-writer")
+        self.slots = threading.BoundedSemaphore(2 * threads)
+        self.futures = set()
+        self.errors = []
+        self.lock = threading.Lock()
+
+    def submit(self, img, filename, flags):
+        """Queue an image to be written.
+
+        Inputs:
+        img      = Image (numpy.ndarray)
+        filename = Name of the image file
+        flags    = cv2.imwrite parameters
+
+        :param img: numpy.ndarray
+        :param filename: str
+        :param flags: list
+        """
+        self.slots.acquire()
+        # Copy the image in case the caller keeps changing it
+        future = self.executor.submit(self._write, np.copy(img), filename, flags)
+        with self.lock:
+            self.futures.add(future)
+        future.add_done_callback(self._done)
+
+    def flush(self):
+        """Wait until all queued images are written.
+
+        Returns:
+        errors   = list of error messages of images that could not be written
+
+        :return errors: list
+        """
+        with self.lock:
+            futures = list(self.futures)
+        wait(futures)
+        with self.lock:
+            errors, self.errors = self.errors, []
+        return errors
+
+    def _write(self, img, filename, flags):
+        """Write an image (writer thread)."""
+        try:
+            if not cv2.imwrite(filename, img, flags):
+                raise IOError("the image could not be written")
+        except Exception as err:
+            with self.lock:
+                self.errors.append(f"{filename}: {err}")
+
+    def _done(self, future):
+        """Release the queue slot of a written image."""
+        with self.lock:
+            self.futures.discard(future)
+        self.slots.release()
+
+
+_writer = None
+# Reentrant since the images of the old pool are flushed while the pool is replaced
+_writer_lock = threading.RLock()
+
+
+def _image_file(filename):
+    """Image file name and cv2.imwrite parameters from the image output settings in params.
+
+    Inputs:
+    filename = Name of the image file
+
+    Returns:
+    filename = Name of the image file, with the extension of params.image_format if it is set
+    flags    = cv2.imwrite parameters (PNG compression level or JPEG/WebP quality)
+
+    :param filename: str
+    :return filename: str
+    :return flags: list
+    """
+    if params.image_format is not None:
+        image_format = params.image_format.lower().lstrip(".")
+        if image_format not in _IMAGE_FORMATS:
+            fatal_error(f"Image format {params.image_format} is not supported, must be one of the following: "
+                        f"{', '.join(_IMAGE_FORMATS.keys())}")
+        filename = os.path.splitext(filename)[0] + "." + image_format
+    image_format = os.path.splitext(filename)[1].lower().lstrip(".")
+    flags = []
+    if image_format == "png" and params.png_compression is not None:
+        flags = [cv2.IMWRITE_PNG_COMPRESSION, int(params.png_compression)]
+    elif _IMAGE_FORMATS.get(image_format) is not None and params.image_quality is not None:
+        flags = [_IMAGE_FORMATS[image_format], int(params.image_quality)]
+    return filename, flags
+
+
+def _write_image(img, filename):
+    """Write an image to a file, from a writer thread if params.image_writers is greater than 0.
+
+    Inputs:
+    img      = Image (numpy.ndarray)
+    filename = Name of the image file
+
+    :param img: numpy.ndarray
+    :param filename: str
+    """
+    global _writer
+    filename, flags = _image_file(filename)
+    if params.image_writers > 0:
+        with _writer_lock:
+            if _writer is None or _writer.threads != params.image_writers:
+                # Start a pool with the new number of threads once the images of the old pool are written
+                if _writer is not None:
+                    _flush_images()
+                    _writer.executor.shutdown()
+                _writer = _ImageWriter(threads=params.image_writers)
+            writer = _writer
+        writer.submit(img=img, filename=filename, flags=flags)
+    else:
+        cv2.imwrite(filename, img, flags)
+
+
+def _flush_images():
+    """Wait until all images queued by print_image are written."""
+    with _writer_lock:
+        writer = _writer
+    if writer is not None:
+        errors = writer.flush()
+        if errors:
+            fatal_error("Error writing images: " + "; ".join(errors))
+
+
+def _flush_at_exit(flush=_flush_images):
+    """Write the queued images before the Python interpreter exits.
+
+    If an image cannot be written the process exits with an error, so a workflow does not report success without its
+    images.
+
+    Inputs:
+    flush    = Function that waits for the queued images and raises a RuntimeError if any could not be written
+
+    :param flush: function
+    """
+    try:
+        flush()
+    except RuntimeError as err:
+        print(err, file=sys.stderr)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(1)
+
+
+atexit.register(_flush_at_exit)
@@ -0,0 +1,90 @@
+# Profile the wall time, CPU time, and peak memory of PlantCV function calls
+
+import sys
+import time
+import types
+import inspect
+import functools
+import threading
+import tracemalloc
+from plantcv.plantcv import params
+from plantcv.plantcv import outputs
+
+# Nesting depth of profiled calls (only the outermost call, the one made by the workflow, is recorded)
+_state = threading.local()
+
+
+def _profiled(func, name):
+    """Wrap a public PlantCV function so that its calls are profiled when params.profile is True.
+
+    Inputs:
+    func    = PlantCV function
+    name    = Public name of the function (e.g. "morphology.skeletonize")
+
+    Returns:
+    wrapper = Profiled function
+
+    :param func: function
+    :param name: str
+    :return wrapper: function
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not params.profile or getattr(_state, "depth", 0) > 0:
+            return func(*args, **kwargs)
+        _state.depth = 1
+        # Trace memory allocations for the duration of the call
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        elif hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        memory = tracemalloc.get_traced_memory()[0]
+        wall_time = time.perf_counter()
+        cpu_time = time.process_time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            cpu_time = time.process_time() - cpu_time
+            wall_time = time.perf_counter() - wall_time
+            peak_memory = max(tracemalloc.get_traced_memory()[1] - memory, 0)
+            if started:
+                tracemalloc.stop()
+            _state.depth = 0
+            # The device is the step number of the call (the number of its debug image)
+            outputs.add_profile(function=name, device=params.device, wall_time=wall_time, cpu_time=cpu_time,
+                                peak_memory=peak_memory)
+    wrapper._profiled = True
+    return wrapper
+
+
+def _profile_namespace(module, prefix=""):
+    """Replace the public functions of a PlantCV (sub)package with profiled functions.
+
+    The functions are also replaced in the modules they are defined in, so that the profiled functions keep the
+    qualified names of the functions they wrap (e.g. for pickling).
+
+    Inputs:
+    module = PlantCV (sub)package
+    prefix = Prefix of the public names of the functions of the package (e.g. "morphology.")
+
+    :param module: module
+    :param prefix: str
+    """
+    for name, obj in list(vars(module).items()):
+        if name.startswith("_"):
+            continue
+        if isinstance(obj, types.ModuleType) and hasattr(obj, "__path__") and \
+                obj.__name__ == f"{module.__name__}.{name}":
+            # Subpackage
+            _profile_namespace(module=obj, prefix=f"{prefix}{name}.")
+        elif inspect.isfunction(obj) and obj.__module__.startswith("plantcv.plantcv") and \
+                not getattr(obj, "_profiled", False):
+            source = sys.modules.get(obj.__module__)
+            wrapper = getattr(source, obj.__name__, None)
+            # Reuse the profiled function if the function was already replaced in its module
+            if getattr(wrapper, "__wrapped__", None) is not obj:
+                wrapper = _profiled(func=obj, name=prefix + name)
+                if source is not None and getattr(source, obj.__name__, None) is obj:
+                    setattr(source, obj.__name__, wrapper)
+            setattr(module, name, wrapper)
@@ -0,0 +1,117 @@
+# Columnar (Apache Arrow/Parquet) results tables
+
+import json
+import numbers
+import pyarrow as pa
+from plantcv.plantcv import fatal_error
+
+
+# Observation columns of a results table. Metadata columns (strings) precede these columns
+_observation_fields = [
+    pa.field("sample", pa.string()),
+    pa.field("trait", pa.string()),
+    pa.field("datatype", pa.string()),
+    pa.field("value", pa.float64()),
+    pa.field("value_text", pa.string()),
+    pa.field("label", pa.string()),
+    pa.field("value_list", pa.list_(pa.float64())),
+    pa.field("label_list", pa.list_(pa.string()))
+]
+
+
+def _results_schema(metadata_vars):
+    """Build the schema of a results table.
+
+    Inputs:
+    metadata_vars = list of metadata variable names
+
+    Returns:
+    schema        = pyarrow schema
+
+    :param metadata_vars: list
+    :return schema: pyarrow.Schema
+    """
+    return pa.schema([pa.field(var, pa.string()) for var in metadata_vars] + _observation_fields)
+
+
+def _entity_table(entity):
+    """Convert the results of one image into a long-format table with one row per sample and trait.
+
+    Numeric and boolean values are stored in the "value" column, strings and other values in the "value_text" column
+    (other values are JSON-encoded). Numeric multi-value traits (e.g. histograms) are stored as lists in the "value_list"
+    and "label_list" columns.
+
+    Inputs:
+    entity = dictionary of "metadata" and "observations" (the format written by Outputs.save_results)
+
+    Returns:
+    table  = pyarrow Table
+
+    :param entity: dict
+    :return table: pyarrow.Table
+    """
+    columns = {field.name: [] for field in _observation_fields}
+    for sample in entity["observations"]:
+        for var, obs in entity["observations"][sample].items():
+            value = obs["value"]
+            label = obs["label"]
+            row = {"sample": sample, "trait": var, "datatype": obs.get("datatype"), "value": None, "value_text": None,
+                   "label": None, "value_list": None, "label_list": None}
+            if isinstance(value, (list, tuple)) and all(isinstance(v, numbers.Number) for v in value):
+                # Multi-value traits
+                row["value_list"] = [float(v) for v in value]
+                if isinstance(label, (list, tuple)):
+                    row["label_list"] = [str(lbl) for lbl in label]
+                else:
+                    row["label"] = str(label)
+            else:
+                if isinstance(value, numbers.Number):
+                    row["value"] = float(value)
+                elif isinstance(value, str):
+                    row["value_text"] = value
+                elif value is not None:
+                    row["value_text"] = json.dumps(value, default=str)
+                if isinstance(label, (list, tuple)):
+                    row["label_list"] = [str(lbl) for lbl in label]
+                elif label is not None:
+                    row["label"] = str(label)
+            for name in columns:
+                columns[name].append(row[name])
+
+    metadata = entity.get("metadata", {})
+    n_rows = len(columns["sample"])
+    arrays = []
+    for var in metadata:
+        value = metadata[var]["value"]
+        arrays.append(pa.array([None if value is None else str(value)] * n_rows, type=pa.string()))
+    for field in _observation_fields:
+        arrays.append(pa.array(columns[field.name], type=field.type))
+    return pa.Table.from_arrays(arrays, schema=_results_schema(list(metadata.keys())))
+
+
+def _conform_table(table, schema):
+    """Conform a results table to a schema, filling any missing metadata columns with nulls.
+
+    Columns that are not in the schema are not allowed.
+
+    Inputs:
+    table  = pyarrow Table
+    schema = pyarrow schema
+
+    Returns:
+    table  = pyarrow Table with the columns of schema
+
+    :param table: pyarrow.Table
+    :param schema: pyarrow.Schema
+    :return table: pyarrow.Table
+    """
+    extra = set(table.column_names) - set(schema.names)
+    if extra:
+        fatal_error(f"Results contain columns that are not in the output table: {', '.join(sorted(extra))}")
+    arrays = []
+    for field in schema:
+        if field.name in table.column_names:
+            arrays.append(table.column(field.name).cast(field.type))
+        else:
+            arrays.append(pa.nulls(table.num_rows, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
@@ -9,7 +9,7 @@ def acute(obj, mask, win, thresh):
     """acute: identify landmark positions within a contour for morphometric analysis
 
     Inputs:
-    obj         = An opencv contour array of interest to be scanned for landmarks
+    obj         = An opencv contour array of interest to be scanned for landmarks, or a list of contours
     mask        = binary mask used to generate contour array (necessary for ptvals)
     win         = maximum cumulative pixel distance window for calculating angle
                   score; 1 cm in pixels often works well
@@ -29,58 +29,151 @@ def acute(obj, mask, win, thresh):
                   landmark cluster edges, and angle score for entire contour.  Used
                   in troubleshooting.
 
-    :param obj: ndarray
+    If obj is a list of contours, the angle scores of all contours are calculated together and each output is a list
+    with one element per contour.
+
+    :param obj: ndarray or list
     :param mask: ndarray
     :param win: int
     :param thresh: int
     :return homolog_pts:
     """
-    chain = []                                         # Create empty chain to store angle scores
-    for k in list(range(len(obj))):                    # Coordinate-by-coordinate 3-point assignments
-        vert = obj[k]
-        dist_1 = 0
-        for r in range(len(obj)):                      # Reverse can to obtain point A
-            rev = k - r
-            pos = obj[rev]
-            dist_2 = np.sqrt(np.square(pos[0][0]-vert[0][0])+np.square(pos[0][1]-vert[0][1]))
-            if r >= 2:
-                if (dist_2 > dist_1) & (dist_2 <= win):  # Further from vertex than current pt A while within window?
-                    dist_1 = dist_2
-                    ptA = pos                              # Load best fit within window as point A
-                elif dist_2 > win:
-                    break
-            else:
-                ptA = pos
-        dist_1 = 0
-        for f in range(len(obj)):                      # Forward scan to obtain point B
-            fwd = k + f
-            if fwd >= len(obj):
-                fwd -= len(obj)
-            pos = obj[fwd]
-            dist_2 = np.sqrt(np.square(pos[0][0]-vert[0][0])+np.square(pos[0][1]-vert[0][1]))
-            if f >= 2:
-                if (dist_2 > dist_1) & (dist_2 <= win):  # Further from vertex than current pt B while within window?
-                    dist_1 = dist_2
-                    ptB = pos                              # Load best fit within window as point B
-                elif dist_2 > win:
-                    break
-            else:
-                ptB = pos
-
-        # Angle in radians derived from Law of Cosines, converted to degrees
-        P12 = np.sqrt((vert[0][0]-ptA[0][0])*(vert[0][0]-ptA[0][0])+(vert[0][1]-ptA[0][1])*(vert[0][1]-ptA[0][1]))
-        P13 = np.sqrt((vert[0][0]-ptB[0][0])*(vert[0][0]-ptB[0][0])+(vert[0][1]-ptB[0][1])*(vert[0][1]-ptB[0][1]))
-        P23 = np.sqrt((ptA[0][0]-ptB[0][0])*(ptA[0][0]-ptB[0][0])+(ptA[0][1]-ptB[0][1])*(ptA[0][1]-ptB[0][1]))
-        dot = (P12*P12 + P13*P13 - P23*P23)/(2*P12*P13)
-
-        # Used a random number generator to test if either of these cases were possible but neither is possible
-        # if dot > 1:              # If float exceeds 1 prevent arcos error and force to equal 1
-        #     dot = 1
-        # elif dot < -1:           # If float exceeds -1 prevent arcos error and force to equal -1
-        #     dot = -1
-        ang = math.degrees(math.acos(dot))
-        chain.append(ang)
+    if isinstance(obj, list):
+        chains = _angle_scores(objects=obj, win=win)
+        results = [_landmarks(obj=cnt, mask=mask, win=win, thresh=thresh, chain=chain)
+                   for cnt, chain in zip(obj, chains)]
+        return tuple([list(result) for result in zip(*results)]) if results else ([], [], [], [], [], [])
+    chain = _angle_scores(objects=[obj], win=win)[0]
+    return _landmarks(obj=obj, mask=mask, win=win, thresh=thresh, chain=chain)
+
+
+def _angle_scores(objects, win):
+    """Calculate the angle score of every point of one or more contours.
+
+    For each contour point (vertex), point A is the point before the vertex (scanning backward along the contour) and
+    point B is the point after the vertex (scanning forward) that is furthest from the vertex within the window,
+    skipping the adjacent point and stopping at the first point further than win from the vertex. The angle score is
+    the angle (in degrees) between A, the vertex, and B.
+
+    The points of all contours are scanned together, a block of positions along the contour at a time.
+
+    Inputs:
+    objects = list of contours
+    win     = maximum pixel distance window for calculating angle score
 
+    Returns:
+    chains  = list of angle scores (one list per contour)
+
+    :param objects: list
+    :param win: int
+    :return chains: list
+    """
+    lengths = np.array([len(cnt) for cnt in objects], dtype=np.int64)
+    if lengths.sum() == 0:
+        return [[] for _ in objects]
+    points = np.concatenate([np.asarray(cnt).reshape(-1, 2) for cnt in objects if len(cnt) > 0]).astype(np.int64)
+    # Contour start position and length, and position within the contour, of every point
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    sizes = np.repeat(lengths, lengths)
+    positions = np.arange(len(points)) - starts
+
+    pt_a = _window_points(points, starts, sizes, positions, win, direction=-1)
+    pt_b = _window_points(points, starts, sizes, positions, win, direction=1)
+
+    # Angle in radians derived from Law of Cosines, converted to degrees
+    p12 = _distance(points, points[pt_a])
+    p13 = _distance(points, points[pt_b])
+    p23 = _distance(points[pt_a], points[pt_b])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dot = (p12 * p12 + p13 * p13 - p23 * p23) / (2 * p12 * p13)
+    angles = [math.degrees(math.acos(d)) for d in dot]
+    bounds = np.cumsum(lengths)
+    return [angles[bounds[i] - lengths[i]:bounds[i]] for i in range(len(objects))]
+
+
+def _window_points(points, starts, sizes, positions, win, direction):
+    """For every contour point, find the furthest point within the window scanning in one direction along the contour.
+
+    Inputs:
+    points    = (x, y) coordinates of the points of all contours
+    starts    = start index of the contour of each point
+    sizes     = length of the contour of each point
+    positions = position of each point in its contour
+    win       = maximum pixel distance window
+    direction = -1 to scan backward, 1 to scan forward
+
+    Returns:
+    best      = index of the selected point for every point
+
+    :param points: numpy.ndarray
+    :param starts: numpy.ndarray
+    :param sizes: numpy.ndarray
+    :param positions: numpy.ndarray
+    :param win: int
+    :param direction: int
+    :return best: numpy.ndarray
+    """
+    # The adjacent point is used unless a point further from the vertex is found
+    steps = np.minimum(sizes - 1, 1)
+    best = starts + (positions + direction * steps) % sizes
+    best_dist = np.zeros(len(points))
+    pending = np.flatnonzero(sizes > 2)
+    # Each block checks up to block_size positions along the contour for up to max_cells points at a time
+    block_size = int(2 * max(win, 1)) + 8
+    max_cells = 1 << 22
+    step = 2
+    while len(pending) > 0:
+        offsets = np.arange(step, step + block_size)
+        still_pending = []
+        for chunk in np.array_split(pending, max(1, len(pending) * block_size // max_cells)):
+            vert = points[chunk]
+            valid = offsets[None, :] < sizes[chunk, None]
+            idx = starts[chunk, None] + (positions[chunk, None] + direction * offsets[None, :]) % sizes[chunk, None]
+            dist = np.sqrt(np.square(points[idx, 0] - vert[:, None, 0]) + np.square(points[idx, 1] - vert[:, None, 1]))
+            # The scan stops at the first point outside of the window
+            outside = (dist > win) & valid
+            stopped = outside.any(axis=1)
+            stop = np.where(stopped, outside.argmax(axis=1), block_size)
+            dist[(np.arange(block_size)[None, :] >= stop[:, None]) | ~valid] = -1
+            # The first point furthest from the vertex replaces the current point if it is further
+            col = dist.argmax(axis=1)
+            col_dist = dist[np.arange(len(chunk)), col]
+            better = col_dist > best_dist[chunk]
+            best[chunk[better]] = idx[np.arange(len(chunk)), col][better]
+            best_dist[chunk[better]] = col_dist[better]
+            done = stopped | (step + block_size >= sizes[chunk])
+            still_pending.append(chunk[~done])
+        pending = np.concatenate(still_pending)
+        step += block_size
+    return best
+
+
+def _distance(pts1, pts2):
+    """Euclidean distance between two arrays of points."""
+    return np.sqrt((pts1[:, 0] - pts2[:, 0]) * (pts1[:, 0] - pts2[:, 0]) +
+                   (pts1[:, 1] - pts2[:, 1]) * (pts1[:, 1] - pts2[:, 1]))
+
+
+def _landmarks(obj, mask, win, thresh, chain):
+    """Identify landmark clusters from the angle scores of a contour.
+
+    Inputs:
+    obj    = An opencv contour array
+    mask   = binary mask used to generate contour array
+    win    = maximum pixel distance window used for calculating angle scores
+    thresh = angle score threshold
+    chain  = angle scores of the contour
+
+    Returns:
+    homolog_pts, start_pts, stop_pts, ptvals, chain, verbose_out (see acute)
+
+    :param obj: ndarray
+    :param mask: ndarray
+    :param win: int
+    :param thresh: int
+    :param chain: list
+    :return homolog_pts:
+    """
     index = []                      # Index chain to find clusters below angle threshold
 
     for c in range(len(chain)):     # Identify links in chain with acute angles
@@ -171,8 +264,8 @@ def acute(obj, mask, win, thresh):
                 # print pt
             else:                           # If landmark is multiple points (distance scan for position)
                 # print 'route C'
-                SS = obj[[isle[x]]][0]          # Store isle "x" start site
-                TS = obj[[isle[x]]][-1]         # Store isle "x" termination site
+                SS = obj[isle[x]][0]          # Store isle "x" start site
+                TS = obj[isle[x]][-1]         # Store isle "x" termination site
                 dist_1 = 0
                 for d in range(len(isle[x])):   # Scan from SS to TS within isle "x"
                     site = obj[[isle[x][d]]]
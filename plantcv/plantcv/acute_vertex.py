@@ -39,30 +39,25 @@ def acute_vertex(img, obj, win, thresh, sep, label="default"):
     :return img2: ndarray
     """
     params.device += 1
-    chain = []
     if not np.any(obj):
         acute = ('NA', 'NA')
         return acute
-    for i in range(len(obj) - win):
-        x, y = obj[i].ravel()
-        pre_x, pre_y = obj[i - win].ravel()
-        post_x, post_y = obj[i + win].ravel()
-
-        # Angle in radians derived from Law of Cosines, converted to degrees
-        P12 = np.sqrt((x - pre_x) * (x - pre_x) + (y - pre_y) * (y - pre_y))
-        P13 = np.sqrt((x - post_x) * (x - post_x) + (y - post_y) *
-                      (y - post_y))
-        P23 = np.sqrt((pre_x - post_x) * (pre_x - post_x) + (pre_y - post_y) *
-                      (pre_y - post_y))
-        if (2 * P12 * P13) > 0.001:
-            dot = (P12 * P12 + P13 * P13 - P23 * P23) / (2 * P12 * P13)
-        elif (2 * P12 * P13) < 0.001:
-            dot = (P12 * P12 + P13 * P13 - P23 * P23) / 0.001
-
-        if dot < -1:  # If float exceeds -1 prevent arcos error and force to equal -1
-            dot = -1
-        ang = math.degrees(math.acos(dot))
-        chain.append(ang)
+    # Each point and the points win positions before (pre) and after (post) it
+    pts = obj.reshape(-1, 2)
+    i = np.arange(max(len(obj) - win, 0))
+    x, y = pts[i, 0], pts[i, 1]
+    pre_x, pre_y = pts[i - win, 0], pts[i - win, 1]
+    post_x, post_y = pts[i + win, 0], pts[i + win, 1]
+
+    # Angle in radians derived from Law of Cosines, converted to degrees
+    P12 = np.sqrt((x - pre_x) * (x - pre_x) + (y - pre_y) * (y - pre_y))
+    P13 = np.sqrt((x - post_x) * (x - post_x) + (y - post_y) * (y - post_y))
+    P23 = np.sqrt((pre_x - post_x) * (pre_x - post_x) + (pre_y - post_y) * (pre_y - post_y))
+    denominator = np.where((2 * P12 * P13) > 0.001, 2 * P12 * P13, 0.001)
+    dot = (P12 * P12 + P13 * P13 - P23 * P23) / denominator
+    # If float exceeds -1 prevent arcos error and force to equal -1
+    dot[dot < -1] = -1
+    chain = [math.degrees(math.acos(d)) for d in dot]
 
     # Select points in contour that have an angle more acute than thresh
     index = []
@@ -89,7 +84,7 @@ def acute_vertex(img, obj, win, thresh, sep, label="default"):
             tester = []
 
     # Store the points in the variable acute
-    acute = obj[[out]]
+    acute = obj[out]
     acute_points = []
     for pt in acute:
         acute_points.append(pt[0].tolist())
@@ -9,7 +9,6 @@ from plantcv.plantcv import deprecation_warning
 from plantcv.plantcv import params
 from plantcv.plantcv._debug import _debug
 from plantcv.plantcv import outputs
-from plantcv.plantcv.visualize import histogram
 
 
 def analyze_color(rgb_img, mask, hist_plot_type=None, colorspaces="all", label="default"):
@@ -31,8 +30,6 @@ def analyze_color(rgb_img, mask, hist_plot_type=None, colorspaces="all", label="
     :param label: str
     :return analysis_images: list
     """
-    # Save user debug setting
-    debug = params.debug
     if hist_plot_type is not None:
         deprecation_warning("'hist_plot_type' will be deprecated in a future version of PlantCV. "
                             "Please use 'colorspaces' instead.")
@@ -41,22 +38,6 @@ def analyze_color(rgb_img, mask, hist_plot_type=None, colorspaces="all", label="
     if len(np.shape(rgb_img)) < 3:
         fatal_error("rgb_img must be an RGB image")
 
-    # Mask the input image
-    masked = cv2.bitwise_and(rgb_img, rgb_img, mask=mask)
-    # Extract the blue, green, and red channels
-    b, g, r = cv2.split(masked)
-    # Convert the BGR image to LAB
-    lab = cv2.cvtColor(masked, cv2.COLOR_BGR2LAB)
-    # Extract the lightness, green-magenta, and blue-yellow channels
-    l, m, y = cv2.split(lab)
-    # Convert the BGR image to HSV
-    hsv = cv2.cvtColor(masked, cv2.COLOR_BGR2HSV)
-    # Extract the hue, saturation, and value channels
-    h, s, v = cv2.split(hsv)
-
-    # Color channel dictionary
-    channels = {"b": b, "g": g, "r": r, "l": l, "m": m, "y": y, "h": h, "s": s, "v": v}
-
     # Histogram plot types
     hist_types = {"all": ("b", "g", "r", "l", "m", "y", "h", "s", "v"),
                   "rgb": ("b", "g", "r"),
@@ -67,40 +48,34 @@ def analyze_color(rgb_img, mask, hist_plot_type=None, colorspaces="all", label="
         fatal_error(f"Colorspace '{colorspaces}' is not supported, must be be one of the following: " 
                     f"{', '.join(map(str, hist_types.keys()))}")
 
-    # Calculate histogram
-    params.debug = None
-    histograms = {
-        "b": {"label": "blue", "graph_color": "blue",
-              "hist": histogram(channels["b"], mask, 256, 0, 255,
-                                hist_data=True)[1]['proportion of pixels (%)'].tolist()},
-        "g": {"label": "green", "graph_color": "forestgreen",
-              "hist": histogram(channels["g"], mask, 256, 0, 255,
-                                hist_data=True)[1]['proportion of pixels (%)'].tolist()},
-        "r": {"label": "red", "graph_color": "red",
-              "hist": histogram(channels["r"], mask, 256, 0, 255,
-                                hist_data=True)[1]['proportion of pixels (%)'].tolist()},
-        "l": {"label": "lightness", "graph_color": "dimgray",
-              "hist": histogram(channels["l"], mask, 256, 0, 255,
-                                hist_data=True)[1]['proportion of pixels (%)'].tolist()},
-        "m": {"label": "green-magenta", "graph_color": "magenta",
-              "hist": histogram(channels["m"], mask, 256, 0, 255,
-                                hist_data=True)[1]['proportion of pixels (%)'].tolist()},
-        "y": {"label": "blue-yellow", "graph_color": "yellow",
-              "hist": histogram(channels["y"], mask, 256, 0, 255,
-                                hist_data=True)[1]['proportion of pixels (%)'].tolist()},
-        "h": {"label": "hue", "graph_color": "blueviolet",
-              "hist": histogram(channels["h"], mask, 256, 0, 255,
-                                hist_data=True)[1]['proportion of pixels (%)'].tolist()},
-        "s": {"label": "saturation", "graph_color": "cyan",
-              "hist": histogram(channels["s"], mask, 256, 0, 255,
-                                hist_data=True)[1]['proportion of pixels (%)'].tolist()},
-        "v": {"label": "value", "graph_color": "orange",
-              "hist": histogram(channels["v"], mask, 256, 0, 255,
-                                hist_data=True)[1]['proportion of pixels (%)'].tolist()}
-    }
-
-    # Restore user debug setting
-    params.debug = debug
+    # Extract the masked pixels as a single column image so that the colorspace conversions only process the object
+    bgr = np.reshape(rgb_img[np.where(mask > 0)], (-1, 1, 3))
+    if len(bgr) > 0:
+        # Convert the BGR pixels to LAB and HSV
+        lab = cv2.cvtColor(bgr, cv2.COLOR_BGR2LAB)
+        hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+    else:
+        lab = bgr
+        hsv = bgr
+    # Stack the blue, green, red, lightness, green-magenta, blue-yellow, hue, saturation, and value channels
+    channels = np.concatenate((bgr, lab, hsv), axis=2)[:, 0, :]
+    # Hue channel
+    h = channels[:, 6]
+
+    # Calculate the 256-bin histogram of all nine channels at once by offsetting each channel into its own bin range
+    offsets = np.arange(0, 9 * 256, 256, dtype=np.int64)
+    counts = np.bincount((channels + offsets).ravel(), minlength=9 * 256).reshape((9, 256))
+    hist_percent = (counts / float(len(channels))) * 100
+    # Count the steps of the nine masked histogram calls this replaces (four each) to keep the debug file numbering
+    params.device += 9 * 4
+
+    histograms = {}
+    for i, (channel, name, color) in enumerate([("b", "blue", "blue"), ("g", "green", "forestgreen"),
+                                                ("r", "red", "red"), ("l", "lightness", "dimgray"),
+                                                ("m", "green-magenta", "magenta"), ("y", "blue-yellow", "yellow"),
+                                                ("h", "hue", "blueviolet"), ("s", "saturation", "cyan"),
+                                                ("v", "value", "orange")]):
+        histograms[channel] = {"label": name, "graph_color": color, "hist": hist_percent[i].tolist()}
 
     # Create list of bin labels for 8-bit data
     binval = np.arange(0, 256)
@@ -158,13 +133,14 @@ def analyze_color(rgb_img, mask, hist_plot_type=None, colorspaces="all", label="
 
     # Hue values of zero are red but are also the value for pixels where hue is undefined. The hue value of a pixel will
     # be undef. when the color values are saturated. Therefore, hue values of 0 are excluded from the calculations below
+    hue = h[np.where(h > 0)]
     # Calculate the median hue value (median is rescaled from the encoded 0-179 range to the 0-359 degree range)
-    hue_median = np.median(h[np.where(h > 0)]) * 2
+    hue_median = np.median(hue) * 2
 
     # Calculate the circular mean and standard deviation of the encoded hue values
     # The mean and standard-deviation are rescaled from the encoded 0-179 range to the 0-359 degree range
-    hue_circular_mean = stats.circmean(h[np.where(h > 0)], high=179, low=0) * 2
-    hue_circular_std = stats.circstd(h[np.where(h > 0)], high=179, low=0) * 2
+    hue_circular_mean = stats.circmean(hue, high=179, low=0) * 2
+    hue_circular_std = stats.circstd(hue, high=179, low=0) * 2
 
     # Plot or print the histogram
     analysis_image = hist_fig
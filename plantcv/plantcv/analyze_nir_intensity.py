@@ -48,9 +48,6 @@ def analyze_nir_intensity(gray_img, mask, bins=256, histplot=None, label="defaul
     masked_nir_median = np.median(masked_array)
     masked_nir_std = np.std(masked_array)
 
-    # Make a pseudo-RGB image
-    rgbimg = cv2.cvtColor(gray_img, cv2.COLOR_GRAY2BGR)
-
     # Calculate histogram
     params.debug = None
     fig_hist, hist_data = histogram(gray_img, mask=mask, bins=bins, lower_bound=0, upper_bound=maxval, title=None,
@@ -58,13 +55,12 @@ def analyze_nir_intensity(gray_img, mask, bins=256, histplot=None, label="defaul
 
     bin_labels, hist_nir = hist_data["pixel intensity"].tolist(), hist_data['hist_count'].tolist()
 
-    masked1 = cv2.bitwise_and(rgbimg, rgbimg, mask=mask)
-
     # Restore user debug setting
     params.debug = debug
 
-    # Print or plot masked image
-    _debug(visual=masked1, filename=os.path.join(params.debug_outdir, str(params.device) + "_masked_nir_plant.png"))
+    # Print or plot masked image (a pseudo-RGB image of the masked plant)
+    _debug(visual=lambda: cv2.cvtColor(cv2.bitwise_and(gray_img, gray_img, mask=mask), cv2.COLOR_GRAY2BGR),
+           filename=os.path.join(params.debug_outdir, str(params.device) + "_masked_nir_plant.png"))
 
 
     fig_hist = fig_hist + labs(x="Grayscale pixel intensity (0-{})".format(maxval), y="Proportion of pixels (%)")
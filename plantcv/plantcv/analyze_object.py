@@ -7,6 +7,7 @@ from plantcv.plantcv import params
 from plantcv.plantcv import outputs
 from plantcv.plantcv import within_frame
 from plantcv.plantcv._debug import _debug
+from plantcv.plantcv._geometry import _shape_properties
 
 
 def analyze_object(img, obj, mask, label="default"):
@@ -36,22 +37,9 @@ def analyze_object(img, obj, mask, label="default"):
     if len(np.shape(ori_img)) == 2:
         ori_img = cv2.cvtColor(ori_img, cv2.COLOR_GRAY2BGR)
 
-    if len(np.shape(img)) == 3:
-        ix, iy, iz = np.shape(img)
-    else:
-        ix, iy = np.shape(img)
-    size = ix, iy, 3
-    size1 = ix, iy
-    background = np.zeros(size, dtype=np.uint8)
-    background1 = np.zeros(size1, dtype=np.uint8)
-    background2 = np.zeros(size1, dtype=np.uint8)
-
     # Check is object is touching image boundaries (QC)
     in_bounds = within_frame(mask=mask, label=label)
 
-    # Convex Hull
-    hull = cv2.convexHull(obj)
-    hull_vertices = len(hull)
     # Moments
     #  m = cv2.moments(obj)
     m = cv2.moments(mask, binaryImage=True)
@@ -60,83 +48,26 @@ def analyze_object(img, obj, mask, label="default"):
     area = m['m00']
 
     if area:
-        # Convex Hull area
-        hull_area = cv2.contourArea(hull)
-        # Solidity
-        solidity = 1
-        if int(hull_area) != 0:
-            solidity = area / hull_area
-        # Perimeter
-        perimeter = cv2.arcLength(obj, closed=True)
         # x and y position (bottom left?) and extent x (width) and extent y (height)
         x, y, width, height = cv2.boundingRect(obj)
         # Centroid (center of mass x, center of mass y)
         cmx, cmy = (float(m['m10'] / m['m00']), float(m['m01'] / m['m00']))
-        # Ellipse
-        center, axes, angle = cv2.fitEllipse(obj)
+        # Convex hull, solidity, perimeter, ellipse, and longest path (line through the center of mass and the point on
+        # the convex hull that is furthest away, clipped to the convex hull)
+        shape = _shape_properties(objects=[obj], areas=[area], centers=[(cmx, cmy)])[0]
+        hull = shape["hull"]
+        hull_vertices = len(hull)
+        hull_area = shape["hull_area"]
+        solidity = shape["solidity"]
+        perimeter = shape["perimeter"]
+        center, axes, angle = shape["ellipse"]
         major_axis = np.argmax(axes)
         minor_axis = 1 - major_axis
         major_axis_length = float(axes[major_axis])
         minor_axis_length = float(axes[minor_axis])
         eccentricity = float(np.sqrt(1 - (axes[minor_axis] / axes[major_axis]) ** 2))
-
-        # Longest Axis: line through center of mass and point on the convex hull that is furthest away
-        cv2.circle(background, (int(cmx), int(cmy)), 4, (255, 255, 255), -1)
-        center_p = cv2.cvtColor(background, cv2.COLOR_BGR2GRAY)
-        ret, centerp_binary = cv2.threshold(center_p, 0, 255, cv2.THRESH_BINARY)
-        centerpoint, cpoint_h = cv2.findContours(centerp_binary, cv2.RETR_TREE, cv2.CHAIN_APPROX_NONE)[-2:]
-
-        dist = []
-        vhull = np.vstack(hull)
-
-        for i, c in enumerate(vhull):
-            xy = tuple([int(ci) for ci in c])
-            pptest = cv2.pointPolygonTest(centerpoint[0], xy, measureDist=True)
-            dist.append(pptest)
-
-        abs_dist = np.absolute(dist)
-        max_i = np.argmax(abs_dist)
-
-        caliper_max_x, caliper_max_y = list(tuple(vhull[max_i]))
-        caliper_mid_x, caliper_mid_y = [int(cmx), int(cmy)]
-
-        xdiff = float(caliper_max_x - caliper_mid_x)
-        ydiff = float(caliper_max_y - caliper_mid_y)
-
-        # Set default values
-        slope = 1
-
-        if xdiff != 0:
-            slope = (float(ydiff / xdiff))
-        b_line = caliper_mid_y - (slope * caliper_mid_x)
-
-        if slope != 0:
-            xintercept = int(-b_line / slope)
-            xintercept1 = int((ix - b_line) / slope)
-            if 0 <= xintercept <= iy and 0 <= xintercept1 <= iy:
-                cv2.line(background1, (xintercept1, ix), (xintercept, 0), (255), params.line_thickness)
-            elif xintercept < 0 or xintercept > iy or xintercept1 < 0 or xintercept1 > iy:
-                yintercept = int(b_line)
-                yintercept1 = int((slope * iy) + b_line)
-                cv2.line(background1, (0, yintercept), (iy, yintercept1), (255), 5)
-        else:
-            cv2.line(background1, (iy, caliper_mid_y), (0, caliper_mid_y), (255), params.line_thickness)
-
-        ret1, line_binary = cv2.threshold(background1, 0, 255, cv2.THRESH_BINARY)
-
-        cv2.drawContours(background2, [hull], -1, (255), -1)
-        ret2, hullp_binary = cv2.threshold(background2, 0, 255, cv2.THRESH_BINARY)
-
-        caliper = cv2.multiply(line_binary, hullp_binary)
-
-        caliper_y, caliper_x = np.array(caliper.nonzero())
-        caliper_matrix = np.vstack((caliper_x, caliper_y))
-        caliper_transpose = np.transpose(caliper_matrix)
-        caliper_length = len(caliper_transpose)
-
-        caliper_transpose1 = np.lexsort((caliper_y, caliper_x))
-        caliper_transpose2 = [(caliper_x[i], caliper_y[i]) for i in caliper_transpose1]
-        caliper_transpose = np.array(caliper_transpose2)
+        caliper_length = shape["longest_path"]
+        caliper_start, caliper_end = [tuple(int(round(v)) for v in point) for point in shape["caliper"]]
 
     analysis_images = []
 
@@ -146,8 +77,7 @@ def analyze_object(img, obj, mask, label="default"):
         cv2.drawContours(ori_img, [hull], -1, (255, 0, 255), params.line_thickness)
         cv2.line(ori_img, (x, y), (x + width, y), (255, 0, 255), params.line_thickness)
         cv2.line(ori_img, (int(cmx), y), (int(cmx), y + height), (255, 0, 255), params.line_thickness)
-        cv2.line(ori_img, (tuple(caliper_transpose[caliper_length - 1])), (tuple(caliper_transpose[0])), (255, 0, 255),
-                 params.line_thickness)
+        cv2.line(ori_img, caliper_start, caliper_end, (255, 0, 255), params.line_thickness)
         cv2.circle(ori_img, (int(cmx), int(cmy)), 10, (255, 0, 255), params.line_thickness)
 
         analysis_images.append(ori_img)
@@ -176,7 +106,7 @@ def analyze_object(img, obj, mask, label="default"):
                             method='plantcv.plantcv.analyze_object', scale='pixels', datatype=int,
                             value=height, label='pixels')
     outputs.add_observation(sample=label, variable='longest_path', trait='longest path',
-                            method='plantcv.plantcv.analyze_object', scale='pixels', datatype=int,
+                            method='plantcv.plantcv.analyze_object', scale='pixels', datatype=float,
                             value=caliper_length, label='pixels')
     outputs.add_observation(sample=label, variable='center_of_mass', trait='center of mass',
                             method='plantcv.plantcv.analyze_object', scale='none', datatype=tuple,
@@ -210,8 +140,7 @@ def analyze_object(img, obj, mask, label="default"):
     cv2.line(ori_img, (x, y), (x + width, y), (255, 0, 255), params.line_thickness)
     cv2.line(ori_img, (int(cmx), y), (int(cmx), y + height), (255, 0, 255), params.line_thickness)
     cv2.circle(ori_img, (int(cmx), int(cmy)), 10, (255, 0, 255), params.line_thickness)
-    cv2.line(ori_img, (tuple(caliper_transpose[caliper_length - 1])), (tuple(caliper_transpose[0])), (255, 0, 255),
-             params.line_thickness)
+    cv2.line(ori_img, caliper_start, caliper_end, (255, 0, 255), params.line_thickness)
     _debug(visual=ori_img, filename=os.path.join(params.debug_outdir, str(params.device) + '_shapes.png'))
 
     # Store images
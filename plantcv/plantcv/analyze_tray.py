@@ -0,0 +1,165 @@
+# Analyze the plants in a tray (one plant per ROI)
+
+import os
+import cv2
+import numpy as np
+from plantcv.plantcv import params
+from plantcv.plantcv import outputs
+from plantcv.plantcv import fatal_error
+from plantcv.plantcv._debug import _debug
+from plantcv.plantcv._geometry import _shape_properties
+from plantcv.plantcv._connected_components import _ConnectedComponents
+
+
+def analyze_tray(img, mask, roi_contour, roi_hierarchy, label="plant"):
+    """Outputs shape and color properties of the plant in each ROI of a tray.
+
+    The connected components of the mask are labeled once. Each component is assigned to the ROI it overlaps the most
+    (components that do not overlap any ROI are dropped), and the plant in each ROI is the group of components assigned
+    to it. Shape properties are measured as analyze_object does for the composed object of the plant.
+
+    Inputs:
+    img             = RGB or grayscale image data
+    mask            = Binary image of the plants
+    roi_contour     = list of roi contours, output from roi.multi
+    roi_hierarchy   = list of roi hierarchies, output from roi.multi
+    label           = optional label parameter, the sample label of the plant in ROI i is label_i (starting at 1)
+
+    Returns:
+    analysis_image  = image with the plant outlines and convex hulls
+    plant_labels    = labeled image of the plants (0 = background, i = plant in ROI i)
+
+    :param img: numpy.ndarray
+    :param mask: numpy.ndarray
+    :param roi_contour: list
+    :param roi_hierarchy: list
+    :param label: str
+    :return analysis_image: numpy.ndarray
+    :return plant_labels: numpy.ndarray
+    """
+    if len(np.shape(mask)) > 2 or len(np.unique(mask)) > 2:
+        fatal_error("Mask should be a binary image of 0 and nonzero values.")
+    height, width = np.shape(mask)
+    n_rois = len(roi_contour)
+
+    # Label the ROIs (where ROIs overlap the later ROI is used)
+    roi_labels = np.zeros((height, width), dtype=np.int32)
+    for i, rc in enumerate(roi_contour):
+        cv2.drawContours(roi_labels, rc, -1, i + 1, -1, lineType=8, hierarchy=roi_hierarchy[i])
+
+    # Label the connected components of the mask
+    components = _ConnectedComponents(mask)
+    comp_labels, stats, centroids = components.labels, components.stats, components.centroids
+    n_comps = components.n + 1
+
+    # Count the pixels of each component in each ROI and assign components to the ROI with the most pixels
+    overlap = (comp_labels > 0) & (roi_labels > 0)
+    pairs, counts = np.unique(comp_labels[overlap].astype(np.int64) * (n_rois + 1) + roi_labels[overlap],
+                              return_counts=True)
+    comps, rois = np.divmod(pairs, n_rois + 1)
+    order = np.lexsort((-counts, comps))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = comps[order][1:] != comps[order][:-1]
+    comp_plant = np.zeros(n_comps, dtype=np.int32)
+    comp_plant[comps[order][first]] = rois[order][first]
+    plant_labels = comp_plant[comp_labels]
+
+    # Area, center of mass, and bounding box of each plant from the statistics of its components
+    comp_areas = components.areas.astype(np.float64)
+    areas = np.bincount(comp_plant, weights=comp_areas, minlength=n_rois + 1).astype(np.int64)
+    sum_x = np.bincount(comp_plant, weights=comp_areas * centroids[:, 0], minlength=n_rois + 1)
+    sum_y = np.bincount(comp_plant, weights=comp_areas * centroids[:, 1], minlength=n_rois + 1)
+    x_min = np.full(n_rois + 1, width)
+    y_min = np.full(n_rois + 1, height)
+    x_max = np.full(n_rois + 1, -1)
+    y_max = np.full(n_rois + 1, -1)
+    np.minimum.at(x_min, comp_plant, stats[:, cv2.CC_STAT_LEFT])
+    np.minimum.at(y_min, comp_plant, stats[:, cv2.CC_STAT_TOP])
+    np.maximum.at(x_max, comp_plant, stats[:, cv2.CC_STAT_LEFT] + stats[:, cv2.CC_STAT_WIDTH] - 1)
+    np.maximum.at(y_max, comp_plant, stats[:, cv2.CC_STAT_TOP] + stats[:, cv2.CC_STAT_HEIGHT] - 1)
+
+    # Mean color of each plant
+    ys, xs = np.nonzero(plant_labels)
+    plants = plant_labels[ys, xs]
+    if len(np.shape(img)) == 3:
+        channels = {"blue": img[ys, xs, 0], "green": img[ys, xs, 1], "red": img[ys, xs, 2]}
+    else:
+        channels = {"gray": img[ys, xs]}
+    color_sums = {name: np.bincount(plants, weights=values, minlength=n_rois + 1) for name, values in channels.items()}
+
+    analysis_image = np.copy(img)
+    # Convert grayscale images to color
+    if len(np.shape(analysis_image)) == 2:
+        analysis_image = cv2.cvtColor(analysis_image, cv2.COLOR_GRAY2BGR)
+
+    # Contours of each plant (traced on a canvas cropped to its components), composed as object_composition does
+    plants = [i for i in range(1, n_rois + 1) if areas[i] > 0]
+    comp_order = np.argsort(comp_plant, kind="stable")
+    comp_starts = np.searchsorted(comp_plant[comp_order], np.arange(0, n_rois + 2))
+    plant_contours = {}
+    objects = []
+    for i in plants:
+        contours, hierarchy = components.contours(labels=comp_order[comp_starts[i]:comp_starts[i + 1]])
+        plant_contours[i] = contours
+        objects.append(np.vstack([cnt for c, cnt in enumerate(contours)
+                                  if not (hierarchy[0][c][2] == -1 and hierarchy[0][c][3] > -1)]))
+    centers = [(float(sum_x[i] / areas[i]), float(sum_y[i] / areas[i])) for i in plants]
+    shapes = _shape_properties(objects=objects, areas=[int(areas[i]) for i in plants], centers=centers)
+    shapes = dict(zip(plants, shapes))
+
+    for i in range(1, n_rois + 1):
+        sample = f"{label}_{i}"
+        area = int(areas[i])
+        outputs.add_observation(sample=sample, variable='area', trait='area',
+                                method='plantcv.plantcv.analyze_tray', scale='pixels', datatype=int,
+                                value=area, label='pixels')
+        cv2.drawContours(analysis_image, roi_contour[i - 1], -1, (255, 0, 0), params.line_thickness)
+        if area == 0:
+            continue
+
+        shape = shapes[i]
+        hull = shape["hull"]
+        cmx, cmy = float(sum_x[i] / area), float(sum_y[i] / area)
+        in_bounds = bool(x_min[i] > 0 and y_min[i] > 0 and x_max[i] < width - 1 and y_max[i] < height - 1)
+
+        outputs.add_observation(sample=sample, variable='convex_hull_area', trait='convex hull area',
+                                method='plantcv.plantcv.analyze_tray', scale='pixels', datatype=int,
+                                value=shape["hull_area"], label='pixels')
+        outputs.add_observation(sample=sample, variable='solidity', trait='solidity',
+                                method='plantcv.plantcv.analyze_tray', scale='none', datatype=float,
+                                value=shape["solidity"], label='none')
+        outputs.add_observation(sample=sample, variable='perimeter', trait='perimeter',
+                                method='plantcv.plantcv.analyze_tray', scale='pixels', datatype=int,
+                                value=shape["perimeter"], label='pixels')
+        outputs.add_observation(sample=sample, variable='width', trait='width',
+                                method='plantcv.plantcv.analyze_tray', scale='pixels', datatype=int,
+                                value=int(x_max[i] - x_min[i] + 1), label='pixels')
+        outputs.add_observation(sample=sample, variable='height', trait='height',
+                                method='plantcv.plantcv.analyze_tray', scale='pixels', datatype=int,
+                                value=int(y_max[i] - y_min[i] + 1), label='pixels')
+        outputs.add_observation(sample=sample, variable='longest_path', trait='longest path',
+                                method='plantcv.plantcv.analyze_tray', scale='pixels', datatype=float,
+                                value=shape["longest_path"], label='pixels')
+        outputs.add_observation(sample=sample, variable='center_of_mass', trait='center of mass',
+                                method='plantcv.plantcv.analyze_tray', scale='none', datatype=tuple,
+                                value=(cmx, cmy), label=("x", "y"))
+        outputs.add_observation(sample=sample, variable='convex_hull_vertices', trait='convex hull vertices',
+                                method='plantcv.plantcv.analyze_tray', scale='none', datatype=int,
+                                value=len(hull), label='none')
+        outputs.add_observation(sample=sample, variable='object_in_frame', trait='object in frame',
+                                method='plantcv.plantcv.analyze_tray', scale='none', datatype=bool,
+                                value=in_bounds, label='none')
+        for name, sums in color_sums.items():
+            outputs.add_observation(sample=sample, variable=f'{name}_mean', trait=f'{name} mean',
+                                    method='plantcv.plantcv.analyze_tray', scale='none', datatype=float,
+                                    value=float(sums[i] / area), label='none')
+
+        caliper_start, caliper_end = [tuple(int(round(v)) for v in point) for point in shape["caliper"]]
+        cv2.drawContours(analysis_image, plant_contours[i], -1, (0, 255, 0), params.line_thickness)
+        cv2.drawContours(analysis_image, [hull], -1, (255, 0, 255), params.line_thickness)
+        cv2.line(analysis_image, caliper_start, caliper_end, (255, 0, 255), params.line_thickness)
+
+    params.device += 1
+    _debug(visual=analysis_image, filename=os.path.join(params.debug_outdir, str(params.device) + '_tray.png'))
+
+    return analysis_image, plant_labels
@@ -40,20 +40,37 @@ def apply_mask(img, mask, mask_color):
 
     # Check the array data format
     if len(np.shape(array_data)) > 2 and np.shape(array_data)[-1] > 3:
-        # Replace this part with _make_pseudo_rgb
-        num_bands = np.shape(array_data)[2]
-        med_band = int(num_bands / 2)
-        debug = params.debug
-        params.debug = None
-        pseudo_rgb = cv2.merge((rescale(array_data[:, :, 0]),
-                                rescale(array_data[:, :, med_band]),
-                                rescale(array_data[:, :, num_bands - 1])))
-        params.debug = debug
-
-        _debug(visual=pseudo_rgb,
+        # Count the three rescale steps of the debug image even if the image is not made
+        params.device += 3
+        _debug(visual=lambda: _masked_pseudo_rgb(array_data),
                filename=os.path.join(params.debug_outdir, str(params.device) + '_masked.png'))
     else:
         _debug(visual=array_data,
                filename=os.path.join(params.debug_outdir, str(params.device) + '_masked.png'))
 
     return array_data
+
+
+def _masked_pseudo_rgb(array_data):
+    """Pseudo-RGB image of masked hyperspectral data (first, middle, and last bands).
+
+    Inputs:
+    array_data = Masked hyperspectral data
+
+    Returns:
+    pseudo_rgb = Pseudo-RGB image
+
+    :param array_data: numpy.ndarray
+    :return pseudo_rgb: numpy.ndarray
+    """
+    # Replace this part with _make_pseudo_rgb
+    num_bands = np.shape(array_data)[2]
+    med_band = int(num_bands / 2)
+    # The caller counts these steps in params.device
+    debug, device = params.debug, params.device
+    params.debug = None
+    pseudo_rgb = cv2.merge((rescale(array_data[:, :, 0]),
+                            rescale(array_data[:, :, med_band]),
+                            rescale(array_data[:, :, num_bands - 1])))
+    params.debug, params.device = debug, device
+    return pseudo_rgb
@@ -31,14 +31,12 @@ def auto_crop(img, obj, padding_x=0, padding_y=0, color='black'):
     """
 
     params.device += 1
-    img_copy = np.copy(img)
     img_copy2 = np.copy(img)
 
     # Get the height and width of the reference image
     height, width = np.shape(img)[:2]
 
     x, y, w, h = cv2.boundingRect(obj)
-    cv2.rectangle(img_copy, (x, y), (x + w, y + h), (0, 255, 0), 5)
 
     crop_img = img[y:y + h, x:x + w]
 
@@ -75,12 +73,12 @@ def auto_crop(img, obj, padding_x=0, padding_y=0, color='black'):
     else:
         fatal_error('Color was provided but ' + str(color) + ' is not "white", "black", or "image"!')
 
-    if len(np.shape(img_copy)) == 3:
+    if len(np.shape(img)) == 3:
         cmap = None
     else:
         cmap = 'gray'
 
-    _debug(visual=img_copy,
+    _debug(visual=lambda: cv2.rectangle(np.copy(img), (x, y), (x + w, y + h), (0, 255, 0), 5),
            filename=os.path.join(params.debug_outdir, str(params.device) + "_crop_area.png"),
            cmap=cmap)
     _debug(visual=cropped,
@@ -3,13 +3,17 @@ import os
 import json
 from plantcv.plantcv import fatal_error
 
+# Suffix of the profile file saved next to a results file
+_PROFILE_SUFFIX = ".profile.json"
+
 
 class Params:
     """PlantCV parameters class."""
 
     def __init__(self, device=0, debug=None, debug_outdir=".", line_thickness=5, dpi=100, text_size=0.55,
                  text_thickness=2, marker_size=60, color_scale="gist_rainbow", color_sequence="sequential",
-                 saved_color_scale=None, verbose=True):
+                 saved_color_scale=None, verbose=True, profile=False, image_writers=0, image_format=None,
+                 png_compression=None, image_quality=None):
         """Initialize parameters.
 
         Keyword arguments/parameters:
@@ -25,6 +29,13 @@ class Params:
         color_sequence    = Build color scales in "sequential" or "random" order. (default: sequential)
         saved_color_scale = Saved color scale that will be applied next time color_palette is called. (default: None)
         verbose           = Whether or not in verbose mode. (default: True)
+        profile           = Record the wall time, CPU time, and peak memory of PlantCV function calls. (default: False)
+        image_writers     = Number of threads that write images in the background, 0 = write images right away.
+                            (default: 0)
+        image_format      = File format of images written by print_image ("png", "jpg", or "webp"), None = the format of
+                            the file extension. (default: None)
+        png_compression   = PNG compression level, 0-9, None = OpenCV default. (default: None)
+        image_quality     = JPEG or WebP quality, 0-100, None = OpenCV default. (default: None)
 
         :param device: int
         :param debug: str
@@ -38,6 +49,11 @@ class Params:
         :param color_sequence: str
         :param saved_color_scale: list
         :param verbose: bool
+        :param profile: bool
+        :param image_writers: int
+        :param image_format: str
+        :param png_compression: int
+        :param image_quality: int
         """
         self.device = device
         self.debug = debug
@@ -51,6 +67,11 @@ class Params:
         self.color_sequence = color_sequence
         self.saved_color_scale = saved_color_scale
         self.verbose = verbose
+        self.profile = profile
+        self.image_writers = image_writers
+        self.image_format = image_format
+        self.png_compression = png_compression
+        self.image_quality = image_quality
 
 
 class Outputs:
@@ -62,12 +83,14 @@ class Outputs:
         self.measurements = {}
         self.images = []
         self.observations = {}
+        self.profile = []
 
         # Add a method to clear measurements
     def clear(self):
         self.measurements = {}
         self.images = []
         self.observations = {}
+        self.profile = []
 
     # Method to add observation to outputs
     def add_observation(self, sample, variable, trait, method, scale, datatype, value, label):
@@ -123,17 +146,46 @@ class Outputs:
             "label": label
         }
 
+    # Method to add a profiled function call to outputs
+    def add_profile(self, function, device, wall_time, cpu_time, peak_memory):
+        """
+        Keyword arguments/parameters:
+        function     = Name of the PlantCV function
+        device       = Device (step) number after the function call
+        wall_time    = Elapsed (wall clock) time of the call, in seconds
+        cpu_time     = CPU time of the call, in seconds
+        peak_memory  = Peak memory allocated during the call, in bytes
+
+        :param function: str
+        :param device: int
+        :param wall_time: float
+        :param cpu_time: float
+        :param peak_memory: int
+        """
+        self.profile.append({
+            "function": function,
+            "device": device,
+            "wall_time": wall_time,
+            "cpu_time": cpu_time,
+            "peak_memory": peak_memory
+        })
+
     # Method to save observations to a file
     def save_results(self, filename, outformat="json"):
         """Save results to a file.
 
+        If function calls were profiled (params.profile = True) the profile is saved to filename + ".profile.json".
+
         Keyword arguments/parameters:
         filename       = Output filename
-        outformat      = Output file format ("json" or "csv"). Default = "json"
+        outformat      = Output file format ("json", "csv", or "parquet"). Default = "json"
 
         :param filename: str
         :param outformat: str
         """
+        if self.profile:
+            with open(filename + _PROFILE_SUFFIX, mode='w') as f:
+                json.dump(self.profile, f)
         if outformat.upper() == "JSON":
             if os.path.isfile(filename):
                 with open(filename, 'r') as f:
@@ -180,6 +232,20 @@ class Outputs:
                                self.observations[sample][var]["label"]
                                ]
                         csv_table.write(",".join(map(str, row)) + "\n")
+        elif outformat.upper() == "PARQUET":
+            # pyarrow is slow to import, so it is only imported to save Parquet files
+            import pyarrow.parquet as pq
+            from plantcv.plantcv._results_table import _entity_table
+            metadata = {}
+            # Keep the metadata of an existing JSON results file (e.g. one created by plantcv-workflow.py)
+            if os.path.isfile(filename):
+                try:
+                    with open(filename, 'r') as f:
+                        metadata = json.load(f).get("metadata", {})
+                except ValueError:
+                    metadata = {}
+            table = _entity_table({"metadata": metadata, "observations": self.observations})
+            pq.write_table(table, filename)
 
 
 class Spectral_data:
@@ -7,6 +7,7 @@ from plantcv.plantcv import print_image
 from plantcv.plantcv import apply_mask
 from plantcv.plantcv import params
 from plantcv.plantcv._debug import _debug
+from plantcv.plantcv.roi_objects import _bounding_boxes, _children, _subtree
 
 
 def cluster_contour_splitimg(img, grouped_contour_indexes, contours, hierarchy, outdir=None, file=None,
@@ -112,6 +113,11 @@ def cluster_contour_splitimg(img, grouped_contour_indexes, contours, hierarchy,
     output_imgs = []
     output_masks = []
 
+    # Bounding boxes and children of the contours are computed once for all groups
+    boxes = _bounding_boxes(contours)
+    children = _children(contours, hierarchy)
+    iy, ix = np.shape(img)[:2]
+
     for y, x in enumerate(corrected_contour_indexes):
         if outdir is not None:
             savename = os.path.join(str(outdir), group_names[y])
@@ -119,22 +125,22 @@ def cluster_contour_splitimg(img, grouped_contour_indexes, contours, hierarchy,
         else:
             savename = os.path.join(".", group_names[y])
             savename1 = os.path.join(".", group_names1[y])
-        iy, ix = np.shape(img)[:2]
-        mask = np.zeros((iy, ix, 3), dtype=np.uint8)
-        masked_img = np.copy(img)
-        for a in x:
-            if hierarchy[0][a][3] > -1:
-                cv2.drawContours(mask, contours, a, (0, 0, 0), -1, lineType=8, hierarchy=hierarchy)
-            else:
-                cv2.drawContours(mask, contours, a, (255, 255, 255), -1, lineType=8, hierarchy=hierarchy)
-
-        mask_binary = mask[:, :, 0]
-
-        if np.sum(mask_binary) == 0:
+        mask_binary = np.zeros((iy, ix), dtype=np.uint8)
+        if len(x) > 0 and len(contours) > 0:
+            # Each contour is drawn (filled together with its descendants, like cv2.drawContours with the hierarchy)
+            # on the window of the image that contains the group
+            x0, y0 = np.maximum(boxes[x, :2].min(axis=0), 0)
+            x1, y1 = np.minimum(boxes[x, 2:].max(axis=0), (ix, iy))
+            window = mask_binary[y0:max(y1, y0), x0:max(x1, x0)]
+            for a in x if window.size > 0 else []:
+                color = 0 if hierarchy[0][a][3] > -1 else 255
+                cv2.drawContours(window, [contours[i] for i in _subtree(children, a)], -1, color, -1, lineType=8,
+                                 offset=(-int(x0), -int(y0)))
+
+        if cv2.countNonZero(mask_binary) == 0:
             pass
         else:
-            retval, mask_binary = cv2.threshold(mask_binary, 254, 255, cv2.THRESH_BINARY)
-            masked1 = apply_mask(masked_img, mask_binary, 'white')
+            masked1 = apply_mask(img, mask_binary, 'white')
             output_imgs.append(masked1)
             output_masks.append(mask_binary)
             if outdir is not None:
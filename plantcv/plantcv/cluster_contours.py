@@ -54,63 +54,37 @@ def cluster_contours(img, roi_objects, roi_obj_hierarchy, nrow=1, ncol=1, show_g
         cstep1 = int(cstep)
         cbreaks = range(0, ix, cstep1)
 
-    # categorize what bin the center of mass of each contour
-    def digitize(a, step):
-        # The way cbreaks and rbreaks are calculated, step will never be an integer
-        # if isinstance(step, int):
-        #     i = step
-        # else:
-        num_bins = len(step)
-        for x in range(0, num_bins):
-            if x == 0:
-                if a >= 0 and a < step[1]:
-                    return 1
-            else:
-                if a >= step[x - 1] and a < step[x]:
-                    return x
-                elif a >= np.max(step):
-                    return num_bins
-
-    dtype = [('cx', int), ('cy', int), ('rowbin', int), ('colbin', int), ('index', int)]
-    coord = []
+    # Center of mass of each contour (contours with zero area are not clustered)
+    index = []
+    centers = []
     for i in range(0, len(roi_objects)):
         m = cv2.moments(roi_objects[i])
-        if m['m00'] == 0:
-            pass
-        else:
-            cx = int(m['m10'] / m['m00'])
-            cy = int(m['m01'] / m['m00'])
-            colbin = digitize(cx, cbreaks)
-            rowbin = digitize(cy, rbreaks)
-            a = (cx, cy, colbin, rowbin, i)
-            coord.append(a)
-    coord1 = np.array(coord, dtype=dtype)
-    coord2 = np.sort(coord1, order=('colbin', 'rowbin'))
-
-    # get the list of unique coordinates and group the contours with the same bin coordinates
-    groups = []
-    for i, y in enumerate(coord2):
-        col = y[3]
-        row = y[2]
-        location = str(row) + ',' + str(col)
-        groups.append(location)
-
-    unigroup = np.unique(groups)
-    coordgroups = []
-
-    for i, y in enumerate(unigroup):
-        col_row = y.split(',')
-        col = int(col_row[0])
-        row = int(col_row[1])
-        for a, b in enumerate(coord2):
-            if b[2] == col and b[3] == row:
-                grp = i
-                contour = b[4]
-                coordgroups.append((grp, contour))
-            else:
-                pass
-
-    coordlist = [[y[1] for y in coordgroups if y[0] == x] for x in range(0, (len(unigroup)))]
+        if m['m00'] != 0:
+            index.append(i)
+            centers.append((int(m['m10'] / m['m00']), int(m['m01'] / m['m00'])))
+    index = np.array(index, dtype=int)
+    centers = np.array(centers, dtype=int).reshape(-1, 2)
+    cx, cy = centers[:, 0], centers[:, 1]
+
+    # Categorize what bin the center of mass of each contour is in (bin x contains centers >= breaks[x - 1] and
+    # < breaks[x], the last bin contains centers >= the last break)
+    colbin = np.searchsorted(np.array(cbreaks), cx, side='right')
+    rowbin = np.searchsorted(np.array(rbreaks), cy, side='right')
+
+    # Sort the contours by row bin, column bin, and center of mass
+    order = np.lexsort((index, cy, cx, colbin, rowbin))
+
+    # Group the contours with the same bin coordinates. Groups are sorted by their "column,row" name
+    bins, group_of_contour = np.unique(np.stack([colbin, rowbin], axis=1), axis=0, return_inverse=True)
+    group_of_contour = group_of_contour.reshape(-1)
+    names = np.array([str(col) + ',' + str(row) for col, row in bins])
+    group_order = np.argsort(np.argsort(names, kind='stable'), kind='stable')
+    group_of_contour = group_order[group_of_contour]
+
+    # Contours of each group in sorted order
+    order = order[np.argsort(group_of_contour[order], kind='stable')]
+    splits = np.flatnonzero(np.diff(group_of_contour[order])) + 1
+    coordlist = [group.tolist() for group in np.split(index[order], splits)] if len(order) > 0 else []
 
     contours = roi_objects
     grouped_contour_indexes = coordlist
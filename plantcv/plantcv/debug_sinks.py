@@ -0,0 +1,79 @@
+# Debug sinks: alternative destinations for debug visuals (params.debug = sink)
+
+import atexit
+import numpy as np
+from plantcv.plantcv import fatal_error
+from plantcv.plantcv import print_image
+from plantcv.plantcv._image_writer import _ImageWriter, _image_file, _flush_at_exit
+
+
+class DebugCollector:
+    """Debug sink that keeps debug visuals in memory.
+
+    Set params.debug to a DebugCollector to collect the debug visuals of the following steps, e.g. to inspect or
+    display them in a notebook. Visuals are stored as (filename, visual) tuples in the order they were made.
+    """
+
+    def __init__(self):
+        """Initialize an empty collection of visuals."""
+        self.visuals = []
+
+    def __call__(self, visual, filename=None, **kwargs):
+        """Collect a debug visual.
+
+        Inputs:
+        visual   = An image or plot
+        filename = The filename the visual would be saved to with debug = "print"
+
+        :param visual: numpy.ndarray
+        :param filename: str
+        """
+        self.visuals.append((filename, visual))
+
+    def clear(self):
+        """Remove the collected visuals."""
+        self.visuals = []
+
+
+class DebugWriter:
+    """Debug sink that saves debug visuals to files from background threads.
+
+    Images (numpy arrays) are encoded and written by a pool of writer threads (the same kind of pool print_image uses
+    when params.image_writers is greater than 0) so that the workflow does not wait for them. At most two images per
+    thread are queued, after which the workflow waits for a thread to be free. Plots (matplotlib and plotnine figures)
+    are saved right away since they can only be drawn safely from the main thread. Queued images are written before the
+    Python interpreter exits, or when flush is called.
+    """
+
+    def __init__(self, threads=1):
+        """Start the writer threads.
+
+        Inputs:
+        threads = Number of writer threads (default = 1)
+
+        :param threads: int
+        """
+        self.writer = _ImageWriter(threads=threads)
+        atexit.register(_flush_at_exit, self.flush)
+
+    def __call__(self, visual, filename=None, **kwargs):
+        """Save a debug visual.
+
+        Inputs:
+        visual   = An image or plot
+        filename = Name of the file to save the visual to
+
+        :param visual: numpy.ndarray
+        :param filename: str
+        """
+        if isinstance(visual, np.ndarray):
+            filename, flags = _image_file(filename)
+            self.writer.submit(img=visual, filename=filename, flags=flags)
+        else:
+            print_image(img=visual, filename=filename)
+
+    def flush(self):
+        """Wait until all queued images are written."""
+        errors = self.writer.flush()
+        if errors:
+            fatal_error("Error writing debug images: " + "; ".join(errors))
@@ -27,17 +27,37 @@ def find_objects(img, mask):
     """
 
     mask1 = np.copy(mask)
-    ori_img = np.copy(img)
-    # If the reference image is grayscale convert it to color
-    if len(np.shape(ori_img)) == 2:
-        ori_img = cv2.cvtColor(ori_img, cv2.COLOR_GRAY2BGR)
     objects, hierarchy = cv2.findContours(mask1, cv2.RETR_TREE, cv2.CHAIN_APPROX_NONE)[-2:]
     # Cast tuple objects as a list
     objects = list(objects)
-    for i, cnt in enumerate(objects):
-        cv2.drawContours(ori_img, objects, i, (255, 102, 255), -1, lineType=8, hierarchy=hierarchy)
 
-    _debug(visual=ori_img,
+    _debug(visual=lambda: _objects_plot(img=img, objects=objects, hierarchy=hierarchy),
            filename=os.path.join(params.debug_outdir, str(params.device) + '_id_objects.png'))
 
     return objects, hierarchy
+
+
+def _objects_plot(img, objects, hierarchy):
+    """Color the objects on a copy of the image for debugging.
+
+    Inputs:
+    img       = RGB or grayscale image data
+    objects   = list of contours
+    hierarchy = contour hierarchy list
+
+    Returns:
+    ori_img   = Debug image
+
+    :param img: numpy.ndarray
+    :param objects: list
+    :param hierarchy: numpy.ndarray
+    :return ori_img: numpy.ndarray
+    """
+    ori_img = np.copy(img)
+    # If the reference image is grayscale convert it to color
+    if len(np.shape(ori_img)) == 2:
+        ori_img = cv2.cvtColor(ori_img, cv2.COLOR_GRAY2BGR)
+    # Filling the outer contours (holes included) colors the same pixels as filling every contour one by one
+    outer = [cnt for i, cnt in enumerate(objects) if hierarchy[0][i][3] < 0]
+    cv2.drawContours(ori_img, outer, -1, (255, 102, 255), -1, lineType=8)
+    return ori_img
@@ -0,0 +1,12 @@
+# Wait for images written in the background
+
+from plantcv.plantcv._image_writer import _flush_images
+
+
+def flush_images():
+    """Wait until all images that print_image writes in the background (params.image_writers > 0) are written.
+
+    Images are also written before the Python interpreter exits, so this is only needed to use the image files from
+    the same workflow or notebook.
+    """
+    _flush_images()
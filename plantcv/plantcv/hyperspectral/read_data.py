@@ -91,15 +91,19 @@ def _make_pseudo_rgb(spectral_array):
     return pseudo_rgb
 
 
-def read_data(filename):
+def read_data(filename, memmap=False):
     """Read hyperspectral image data from file.
     Inputs:
     filename          = Name of image file
+    memmap            = If True, memory-map the data file instead of reading it into memory. Data are only read
+                        from disk when bands or pixels are accessed, and the min/max values are estimated from a
+                        sample of lines (default: False)
 
     Returns:
     spectral_array    = Hyperspectral data instance
 
     :param filename: str
+    :param memmap: bool
     :return spectral_array: __main__.Spectral_data
         """
 
@@ -149,9 +153,6 @@ def read_data(filename):
                   "9": np.complex128, "12": np.uint16, "13": np.uint32, "14": np.uint64, "15": np.uint64}
     header_dict["data type"] = dtype_dict[header_dict["data type"]]
 
-    # Read in the data from the file
-    raw_data = np.fromfile(filename, header_dict["data type"], -1)
-
     # Reshape the raw data into a datacube array
     data_format = {
         # Band Interleaved by Line (BIL)
@@ -167,15 +168,32 @@ def read_data(filename):
             # Then reorder into a cube in Y, X, Z order
             "reshape": (int(header_dict["bands"]), int(header_dict["lines"]), int(header_dict["samples"])),
             "transpose": (1, 2, 0)
+        },
+        # Band Interleaved by Pixel (BIP)
+        "BIP": {
+            # Divide the raw data by Y (lines), X (samples), and Z (spectral bands)
+            # The data are already in Y, X, Z order
+            "reshape": (int(header_dict["lines"]), int(header_dict["samples"]), int(header_dict["bands"])),
+            "transpose": (0, 1, 2)
         }
     }
     interleave_type = header_dict.get("interleave").upper()
     if interleave_type not in data_format:
         fatal_error(f"Interleave type {interleave_type} is not supported.")
 
-    # Reshape raw data into a data cube
-    array_data = raw_data.reshape(data_format[interleave_type]["reshape"]
-                                  ).transpose(data_format[interleave_type]["transpose"])
+    # Number of bytes before the data starts
+    header_offset = int(header_dict.get("header offset", 0))
+    if memmap:
+        # Map the data file directly into the datacube shape, nothing is read until the data are accessed
+        raw_data = np.memmap(filename, dtype=header_dict["data type"], mode="r", offset=header_offset,
+                             shape=data_format[interleave_type]["reshape"])
+    else:
+        # Read in the data from the file
+        raw_data = np.fromfile(filename, header_dict["data type"], -1, offset=header_offset)
+        raw_data = raw_data.reshape(data_format[interleave_type]["reshape"])
+
+    # Reorder the raw data into a data cube (a view of the raw data)
+    array_data = raw_data.transpose(data_format[interleave_type]["transpose"])
 
     # Check for default bands (that get used to make pseudo_rgb image)
     default_bands = None
@@ -185,8 +203,13 @@ def read_data(filename):
         default_bands = header_dict["default bands"].split(",")
 
     # Find array min and max values
-    max_pixel = float(np.amax(array_data))
-    min_pixel = float(np.amin(array_data))
+    if memmap:
+        # Estimate the min and max values from a sample of about 100 evenly spaced lines
+        sample = array_data[::max(1, int(header_dict["lines"]) // 100)]
+    else:
+        sample = array_data
+    max_pixel = float(np.amax(sample))
+    min_pixel = float(np.amin(sample))
 
     wavelength_units = header_dict.get("wavelength units")
     if wavelength_units is None:
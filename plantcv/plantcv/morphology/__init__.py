@@ -1,3 +1,4 @@
+from plantcv.plantcv.morphology.skeleton_graph import SkeletonGraph
 from plantcv.plantcv.morphology.find_branch_pts import find_branch_pts
 from plantcv.plantcv.morphology.find_tips import find_tips
 from plantcv.plantcv.morphology._iterative_prune import _iterative_prune
@@ -19,4 +20,5 @@ from plantcv.plantcv.morphology.fill_segments import fill_segments
 
 __all__ = ["find_branch_pts", "find_tips", "prune", "skeletonize", "check_cycles", "segment_skeleton", "segment_angle",
            "segment_path_length", "segment_euclidean_length", "segment_curvature", "segment_sort", "segment_id",
-           "segment_tangent_angle", "segment_insertion_angle", "segment_combine", "_iterative_prune", "analyze_stem", "fill_segments"]
+           "segment_tangent_angle", "segment_insertion_angle", "segment_combine", "_iterative_prune", "analyze_stem", "fill_segments",
+           "SkeletonGraph"]
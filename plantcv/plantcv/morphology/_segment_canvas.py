@@ -0,0 +1,74 @@
+# Draw and measure skeleton segments on canvases cropped to their bounding boxes
+
+import cv2
+import numpy as np
+
+
+def _segment_canvas(contour, shape, margin=1):
+    """Draw one segment contour (1 pixel wide) on a canvas cropped to the bounding box of the contour.
+
+    The canvas has the same pixels as drawing the contour on a full-size image and cropping it. The margin keeps the
+    canvas border away from the segment (except where the segment touches the image border), so that tips, pruning,
+    and dilation give the same results on the canvas as on the full-size image.
+
+    Inputs:
+    contour = Segment contour
+    shape   = Shape of the full-size image
+    margin  = Number of pixels around the bounding box of the contour
+
+    Returns:
+    canvas  = Cropped image of the segment
+    offset  = (x, y) coordinates of the top left corner of the canvas in the full-size image
+
+    :param contour: numpy.ndarray
+    :param shape: tuple
+    :param margin: int
+    :return canvas: numpy.ndarray
+    :return offset: tuple
+    """
+    x, y, w, h = cv2.boundingRect(contour)
+    x0, y0 = max(x - margin, 0), max(y - margin, 0)
+    x1, y1 = min(x + w + margin, shape[1]), min(y + h + margin, shape[0])
+    canvas = np.zeros((y1 - y0, x1 - x0), np.uint8)
+    cv2.drawContours(canvas, [contour], -1, 255, 1, lineType=8, offset=(-x0, -y0))
+    return canvas, (x0, y0)
+
+
+def _crop(img, canvas, offset):
+    """Crop a full-size image to the region of a segment canvas.
+
+    Inputs:
+    img    = Full-size image
+    canvas = Cropped image from _segment_canvas
+    offset = (x, y) offset of the canvas
+
+    Returns:
+    cropped_img = Region of img under the canvas
+
+    :param img: numpy.ndarray
+    :param canvas: numpy.ndarray
+    :param offset: tuple
+    :return cropped_img: numpy.ndarray
+    """
+    x0, y0 = offset
+    return img[y0:y0 + canvas.shape[0], x0:x0 + canvas.shape[1]]
+
+
+def _canvas_objects(canvas, offset):
+    """Find the contours of the objects on a segment canvas, in full-size image coordinates.
+
+    Inputs:
+    canvas    = Cropped binary image
+    offset    = (x, y) offset of the canvas
+
+    Returns:
+    objects   = list of contours
+    hierarchy = contour hierarchy list
+
+    :param canvas: numpy.ndarray
+    :param offset: tuple
+    :return objects: list
+    :return hierarchy: numpy.ndarray
+    """
+    objects, hierarchy = cv2.findContours(canvas, cv2.RETR_TREE, cv2.CHAIN_APPROX_NONE, offset=offset)[-2:]
+    return list(objects), hierarchy
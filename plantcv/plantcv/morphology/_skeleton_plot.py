@@ -0,0 +1,36 @@
+# Debug image of points (e.g. tips or branch points) on a skeleton
+
+import cv2
+import numpy as np
+from plantcv.plantcv import params
+
+
+def _skeleton_plot(skel_img, mask, points, color):
+    """Draw points on a skeleton, or on a mask with the skeleton outlined.
+
+    Inputs:
+    skel_img = Skeletonized image
+    mask     = Binary mask to draw on, or None to draw on the (dilated) skeleton
+    points   = list of (x, y) point coordinates
+    color    = Point color (BGR)
+
+    Returns:
+    plot_img = Debug image
+
+    :param skel_img: numpy.ndarray
+    :param mask: numpy.ndarray
+    :param points: list
+    :param color: tuple
+    :return plot_img: numpy.ndarray
+    """
+    if mask is None:
+        kernel = np.ones((int(params.line_thickness), int(params.line_thickness)), np.uint8)
+        plot_img = cv2.cvtColor(cv2.dilate(src=skel_img, kernel=kernel, iterations=1), cv2.COLOR_GRAY2RGB)
+    else:
+        plot_img = cv2.cvtColor(mask, cv2.COLOR_GRAY2RGB)
+        skel_obj, skel_hier = cv2.findContours(np.copy(skel_img), cv2.RETR_TREE, cv2.CHAIN_APPROX_NONE)[-2:]
+        cv2.drawContours(plot_img, skel_obj, -1, (150, 150, 150), params.line_thickness, lineType=8,
+                         hierarchy=skel_hier)
+    for point in points:
+        cv2.circle(plot_img, point, params.line_thickness, color, -1)
+    return plot_img
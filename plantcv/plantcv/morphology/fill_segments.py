@@ -69,11 +69,29 @@ def fill_segments(mask, objects, stem_objects=None, label="default"):
     #     for ch in range(3):
     #         filled_img[:, :, ch][filled_mask == l] = rgb_vals[l - 1][ch]
 
-    debug = params.debug
-    params.debug = None
-    filled_img = colorize_label_img(filled_mask)
-    params.debug = debug
-    _debug(visual=filled_img, filename=os.path.join(params.debug_outdir,
-                                                    str(params.device) + "_filled_segments_img.png"))
+    # Count the colorize_label_img step of the debug image even if the image is not made
+    params.device += 1
+    _debug(visual=lambda: _filled_segments_plot(filled_mask),
+           filename=os.path.join(params.debug_outdir, str(params.device) + "_filled_segments_img.png"))
 
     return filled_mask
+
+
+def _filled_segments_plot(filled_mask):
+    """Colorize the filled segments for debugging.
+
+    Inputs:
+    filled_mask = Labeled mask
+
+    Returns:
+    filled_img  = Colorized labeled mask
+
+    :param filled_mask: numpy.ndarray
+    :return filled_img: numpy.ndarray
+    """
+    # The caller counts this step in params.device
+    debug, device = params.debug, params.device
+    params.debug = None
+    filled_img = colorize_label_img(filled_mask)
+    params.debug, params.device = debug, device
+    return filled_img
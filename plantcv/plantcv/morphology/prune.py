@@ -8,7 +8,8 @@ from plantcv.plantcv import find_objects
 from plantcv.plantcv import image_subtract
 from plantcv.plantcv.morphology import segment_sort
 from plantcv.plantcv.morphology import segment_skeleton
-from plantcv.plantcv.morphology import _iterative_prune
+from plantcv.plantcv.morphology import find_tips
+from plantcv.plantcv.morphology.skeleton_graph import _skeleton_graph
 from plantcv.plantcv._debug import _debug
 
 
@@ -20,7 +21,7 @@ def prune(skel_img, size=0, mask=None):
     pruned skeleton.
 
     Inputs:
-    skel_img    = Skeletonized image
+    skel_img    = Skeletonized image (or SkeletonGraph)
     size        = Size to get pruned off each branch
     mask        = (Optional) binary mask for debugging. If provided, debug image will be overlaid on the mask.
 
@@ -29,7 +30,7 @@ def prune(skel_img, size=0, mask=None):
     segmented_img   = Segmented debugging image
     segment_objects = List of contours
 
-    :param skel_img: numpy.ndarray
+    :param skel_img: numpy.ndarray or plantcv.plantcv.morphology.SkeletonGraph
     :param size: int
     :param mask: numpy.ndarray
     :return pruned_img: numpy.ndarray
@@ -41,12 +42,14 @@ def prune(skel_img, size=0, mask=None):
     debug = params.debug
     params.debug = None
 
+    graph = _skeleton_graph(skel_img)
+    skel_img = graph.skel_img
     pruned_img = skel_img.copy()
 
     # Check to see if the skeleton has multiple objects
     skel_objects, _ = find_objects(skel_img, skel_img)
 
-    _, objects = segment_skeleton(skel_img)
+    _, objects = segment_skeleton(graph)
     kept_segments = []
     removed_segments = []
 
@@ -54,7 +57,7 @@ def prune(skel_img, size=0, mask=None):
         # If size>0 then check for segments that are smaller than size pixels long
 
         # Sort through segments since we don't want to remove primary segments
-        secondary_objects, primary_objects = segment_sort(skel_img, objects)
+        secondary_objects, primary_objects = segment_sort(graph, objects)
 
         # Keep segments longer than specified size
         for i in range(0, len(secondary_objects)):
@@ -70,7 +73,9 @@ def prune(skel_img, size=0, mask=None):
 
         # Subtract all short segments from the skeleton image
         pruned_img = image_subtract(pruned_img, removed_barbs)
-        pruned_img = _iterative_prune(pruned_img, 1)
+
+        # Remove the remaining tips (this also records the tips of the pruned skeleton)
+        pruned_img = image_subtract(pruned_img, find_tips(pruned_img))
 
     # Reset debug mode
     params.debug = debug
@@ -2,12 +2,11 @@
 
 import os
 import cv2
-import numpy as np
 from plantcv.plantcv import params
 from plantcv.plantcv import outputs
-from plantcv.plantcv import find_objects
 from plantcv.plantcv import color_palette
-from plantcv.plantcv.morphology import find_tips
+from plantcv.plantcv.morphology import SkeletonGraph
+from plantcv.plantcv.morphology._segment_canvas import _segment_canvas, _canvas_objects
 from plantcv.plantcv.morphology import segment_path_length
 from plantcv.plantcv.morphology import segment_euclidean_length
 from plantcv.plantcv._debug import _debug
@@ -52,11 +51,10 @@ def segment_curvature(segmented_img, objects, label="default"):
         label_coord_x.append(objects[i][0][0][0])
         label_coord_y.append(objects[i][0][0][1])
 
-        # Draw segments one by one to group segment tips together
-        finding_tips_img = np.zeros(segmented_img.shape[:2], np.uint8)
-        cv2.drawContours(finding_tips_img, objects, i, (255, 255, 255), 1, lineType=8)
-        segment_tips = find_tips(finding_tips_img)
-        tip_objects, tip_hierarchies = find_objects(segment_tips, segment_tips)
+        # Draw segments one by one (on canvases cropped to each segment) to group segment tips together
+        finding_tips_img, offset = _segment_canvas(cnt, segmented_img.shape)
+        segment_tips = SkeletonGraph(finding_tips_img).tip_img
+        tip_objects, tip_hierarchies = _canvas_objects(segment_tips, offset)
         points = []
 
         for t in tip_objects:
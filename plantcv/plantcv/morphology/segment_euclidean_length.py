@@ -2,14 +2,13 @@
 
 import os
 import cv2
-import numpy as np
 from plantcv.plantcv import params
 from plantcv.plantcv import outputs
 from plantcv.plantcv import fatal_error
-from plantcv.plantcv import find_objects
 from plantcv.plantcv import color_palette
 from scipy.spatial.distance import euclidean
-from plantcv.plantcv.morphology import find_tips
+from plantcv.plantcv.morphology import SkeletonGraph
+from plantcv.plantcv.morphology._segment_canvas import _segment_canvas, _canvas_objects
 from plantcv.plantcv._debug import _debug
 
 
@@ -45,11 +44,10 @@ def segment_euclidean_length(segmented_img, objects, label="default"):
         x_list.append(objects[i][0][0][0])
         y_list.append(objects[i][0][0][1])
 
-        # Draw segments one by one to group segment tips together
-        finding_tips_img = np.zeros(segmented_img.shape[:2], np.uint8)
-        cv2.drawContours(finding_tips_img, objects, i, (255, 255, 255), 1, lineType=8)
-        segment_tips = find_tips(finding_tips_img)
-        tip_objects, tip_hierarchies = find_objects(segment_tips, segment_tips)
+        # Draw segments one by one (on canvases cropped to each segment) to group segment tips together
+        finding_tips_img, offset = _segment_canvas(cnt, segmented_img.shape)
+        segment_tips = SkeletonGraph(finding_tips_img).tip_img
+        tip_objects, tip_hierarchies = _canvas_objects(segment_tips, offset)
         points = []
         if not len(tip_objects) == 2:
             fatal_error("Too many tips found per segment, try pruning again")
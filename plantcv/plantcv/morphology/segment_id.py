@@ -4,6 +4,7 @@ import os
 import cv2
 from plantcv.plantcv import color_palette
 from plantcv.plantcv import params
+from plantcv.plantcv.morphology.skeleton_graph import _skeleton_img
 from plantcv.plantcv._debug import _debug
 
 
@@ -11,7 +12,7 @@ def segment_id(skel_img, objects, mask=None):
     """ Plot segment ID's
 
     Inputs:
-    skel_img      = Skeletonized image
+    skel_img      = Skeletonized image (or SkeletonGraph)
     objects       = List of contours
     mask          = (Optional) binary mask for debugging. If provided, debug image will be overlaid on the mask.
 
@@ -19,12 +20,13 @@ def segment_id(skel_img, objects, mask=None):
     segmented_img = Segmented image
     labeled_img   = Labeled image
 
-    :param skel_img: numpy.ndarray
+    :param skel_img: numpy.ndarray or plantcv.plantcv.morphology.SkeletonGraph
     :param objects: list
     :param mask: numpy.ndarray
     :return segmented_img: numpy.ndarray
     :return labeled_img: numpy.ndarray
     """
+    skel_img = _skeleton_img(skel_img)
     label_coord_x = []
     label_coord_y = []
 
@@ -15,6 +15,8 @@ from plantcv.plantcv.morphology import _iterative_prune
 from plantcv.plantcv.morphology import find_tips
 # from plantcv.plantcv.morphology import find_branch_pts
 from plantcv.plantcv.morphology.segment_tangent_angle import _slope_to_intesect_angle
+from plantcv.plantcv.morphology.skeleton_graph import _skeleton_graph
+from plantcv.plantcv.morphology._segment_canvas import _segment_canvas, _crop, _canvas_objects
 from plantcv.plantcv._debug import _debug
 
 
@@ -23,7 +25,7 @@ def segment_insertion_angle(skel_img, segmented_img, leaf_objects, stem_objects,
         Use `size` pixels on  the portion of leaf next to the stem find a linear regression line,
         and calculate angle between the two lines per leaf object.
     Inputs:
-    skel_img         = Skeletonized image
+    skel_img         = Skeletonized image (or SkeletonGraph)
     segmented_img    = Segmented image to plot slope lines and intersection angles on
     leaf_objects     = List of leaf segments
     stem_objects     = List of stem segments
@@ -33,7 +35,7 @@ def segment_insertion_angle(skel_img, segmented_img, leaf_objects, stem_objects,
     Returns:
     labeled_img      = Debugging image with angles labeled
 
-    :param skel_img: numpy.ndarray
+    :param skel_img: numpy.ndarray or plantcv.plantcv.morphology.SkeletonGraph
     :param segmented_img: numpy.ndarray
     :param leaf_objects: list
     :param stem_objects: list
@@ -58,7 +60,7 @@ def segment_insertion_angle(skel_img, segmented_img, leaf_objects, stem_objects,
     pruned_away = []
 
     # Create a list of tip tuples to use for sorting
-    tips = find_tips(skel_img)
+    tips = find_tips(_skeleton_graph(skel_img))
     tips = dilate(tips, 3, 1)
     tip_objects, tip_hierarchies = find_objects(tips, tips)
     tip_tuples = []
@@ -68,16 +70,15 @@ def segment_insertion_angle(skel_img, segmented_img, leaf_objects, stem_objects,
     # rand_color = color_palette(len(leaf_objects))
 
     for i, cnt in enumerate(leaf_objects):
-        # Draw leaf objects
-        find_segment_tangents = np.zeros(segmented_img.shape[:2], np.uint8)
-        cv2.drawContours(find_segment_tangents, leaf_objects, i, 255, 1, lineType=8)
+        # Draw leaf objects (on a canvas cropped to the leaf)
+        find_segment_tangents, offset = _segment_canvas(cnt, segmented_img.shape)
 
         # Prune back ends of leaves
         pruned_segment = _iterative_prune(find_segment_tangents, size)
 
         # Segment ends are the portions pruned off
         segment_ends = find_segment_tangents - pruned_segment
-        segment_end_obj, segment_end_hierarchy = find_objects(segment_ends, segment_ends)
+        segment_end_obj, segment_end_hierarchy = _canvas_objects(segment_ends, offset)
         # is_insertion_segment = []
 
         if not len(segment_end_obj) == 2:
@@ -91,11 +92,11 @@ def segment_insertion_angle(skel_img, segmented_img, leaf_objects, stem_objects,
             # Determine if a segment is leaf end or leaf insertion segment
             for j, obj in enumerate(segment_end_obj):
 
-                segment_plot = np.zeros(segmented_img.shape[:2], np.uint8)
-                cv2.drawContours(segment_plot, obj, -1, 255, 1, lineType=8)
+                segment_plot = np.zeros(find_segment_tangents.shape, np.uint8)
+                cv2.drawContours(segment_plot, obj, -1, 255, 1, lineType=8, offset=(-offset[0], -offset[1]))
                 segment_plot = dilate(segment_plot, 3, 1)
                 # tips = dilate(tips, 3, 1)
-                overlap_img = logical_and(segment_plot, tips)
+                overlap_img = logical_and(segment_plot, _crop(tips, segment_plot, offset))
 
                 # If none of the tips are within a segment_end then it's an insertion segment
                 if np.sum(overlap_img) == 0:
@@ -2,12 +2,10 @@
 
 import os
 import cv2
-from plantcv.plantcv import dilate
 from plantcv.plantcv import params
-from plantcv.plantcv import find_objects
 from plantcv.plantcv import color_palette
-from plantcv.plantcv import image_subtract
 from plantcv.plantcv.morphology import find_branch_pts
+from plantcv.plantcv.morphology.skeleton_graph import _skeleton_graph
 from plantcv.plantcv._debug import _debug
 
 
@@ -15,31 +13,31 @@ def segment_skeleton(skel_img, mask=None):
     """ Segment a skeleton image into pieces
 
     Inputs:
-    skel_img         = Skeletonized image
+    skel_img         = Skeletonized image (or SkeletonGraph)
     mask             = (Optional) binary mask for debugging. If provided, debug image will be overlaid on the mask.
 
     Returns:
     segmented_img       = Segmented debugging image
     segment_objects     = list of contours
 
-    :param skel_img: numpy.ndarray
+    :param skel_img: numpy.ndarray or plantcv.plantcv.morphology.SkeletonGraph
     :param mask: numpy.ndarray
     :return segmented_img: numpy.ndarray
     :return segment_objects: list
     """
+    graph = _skeleton_graph(skel_img)
+    skel_img = graph.skel_img
+
     # Store debug
     debug = params.debug
     params.debug = None
 
-    # Find branch points
-    bp = find_branch_pts(skel_img)
-    bp = dilate(bp, 3, 1)
-
-    # Subtract from the skeleton so that leaves are no longer connected
-    segments = image_subtract(skel_img, bp)
+    # Find branch points (records the branch point coordinates)
+    _ = find_branch_pts(graph)
 
-    # Gather contours of leaves
-    segment_objects, _ = find_objects(segments, segments)
+    # Gather contours of leaves, the segments are the skeleton with the branch points (and their neighbors) removed so
+    # that leaves are no longer connected
+    segment_objects = list(graph.segment_objects)
 
     # Reset debug mode
     params.debug = debug
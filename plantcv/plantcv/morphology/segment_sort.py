@@ -7,6 +7,8 @@ from plantcv.plantcv import dilate
 from plantcv.plantcv import params
 from plantcv.plantcv import logical_and
 from plantcv.plantcv.morphology import find_tips
+from plantcv.plantcv.morphology.skeleton_graph import _skeleton_graph
+from plantcv.plantcv.morphology._segment_canvas import _segment_canvas, _crop
 from plantcv.plantcv._debug import _debug
 
 
@@ -14,7 +16,7 @@ def segment_sort(skel_img, objects, mask=None, first_stem=True):
     """ Calculate segment curvature as defined by the ratio between geodesic and euclidean distance
 
     Inputs:
-    skel_img          = Skeletonized image
+    skel_img          = Skeletonized image (or SkeletonGraph)
     objects           = List of contours
     mask              = (Optional) binary mask for debugging. If provided, debug image will be overlaid on the mask.
     first_stem        = (Optional) if True, then the first (bottom) segment always gets classified as stem
@@ -24,13 +26,16 @@ def segment_sort(skel_img, objects, mask=None, first_stem=True):
     secondary_objects = List of secondary segments (leaf)
     primary_objects   = List of primary objects (stem)
 
-    :param skel_img: numpy.ndarray
+    :param skel_img: numpy.ndarray or plantcv.plantcv.morphology.SkeletonGraph
     :param objects: list
     :param mask: numpy.ndarray
     :param first_stem: bool
     :return secondary_objects: list
     :return other_objects: list
     """
+    graph = _skeleton_graph(skel_img)
+    skel_img = graph.skel_img
+
     # Store debug
     debug = params.debug
     params.debug = None
@@ -38,20 +43,15 @@ def segment_sort(skel_img, objects, mask=None, first_stem=True):
     secondary_objects = []
     primary_objects = []
 
-    if mask is None:
-        labeled_img = np.zeros(skel_img.shape[:2], np.uint8)
-    else:
-        labeled_img = mask.copy()
-
-    tips_img = find_tips(skel_img)
+    tips_img = find_tips(graph)
     tips_img = dilate(tips_img, 3, 1)
 
     # Loop through segment contours
     for i, cnt in enumerate(objects):
-        segment_plot = np.zeros(skel_img.shape[:2], np.uint8)
-        cv2.drawContours(segment_plot, objects, i, 255, 1, lineType=8)
+        # Draw the segment on a canvas cropped to the segment
+        segment_plot, offset = _segment_canvas(cnt, skel_img.shape)
         # is_leaf = False
-        overlap_img = logical_and(segment_plot, tips_img)
+        overlap_img = logical_and(segment_plot, _crop(tips_img, segment_plot, offset))
 
         # The first contour is the base, and while it contains a tip, it isn't a leaf
         if i == 0 and first_stem:
@@ -69,13 +69,39 @@ def segment_sort(skel_img, objects, mask=None, first_stem=True):
     # Reset debug mode
     params.debug = debug
 
-    # Plot segments where green segments are leaf objects and fuschia are other objects
+    _debug(visual=lambda: _sorted_segments_plot(skel_img=skel_img, mask=mask, primary_objects=primary_objects,
+                                                secondary_objects=secondary_objects),
+           filename=os.path.join(params.debug_outdir, f"{params.device}_sorted_segments.png"))
+
+    return secondary_objects, primary_objects
+
+
+def _sorted_segments_plot(skel_img, mask, primary_objects, secondary_objects):
+    """Plot segments where green segments are leaf objects and fuschia are other objects.
+
+    Inputs:
+    skel_img          = Skeletonized image
+    mask              = Binary mask to draw on, or None to draw on a blank image
+    primary_objects   = List of primary objects (stem)
+    secondary_objects = List of secondary segments (leaf)
+
+    Returns:
+    labeled_img       = Debug image
+
+    :param skel_img: numpy.ndarray
+    :param mask: numpy.ndarray
+    :param primary_objects: list
+    :param secondary_objects: list
+    :return labeled_img: numpy.ndarray
+    """
+    if mask is None:
+        labeled_img = np.zeros(skel_img.shape[:2], np.uint8)
+    else:
+        labeled_img = mask.copy()
     labeled_img = cv2.cvtColor(labeled_img, cv2.COLOR_GRAY2RGB)
+
     for i, cnt in enumerate(primary_objects):
         cv2.drawContours(labeled_img, primary_objects, i, (255, 0, 255), params.line_thickness, lineType=8)
     for i, cnt in enumerate(secondary_objects):
         cv2.drawContours(labeled_img, secondary_objects, i, (0, 255, 0), params.line_thickness, lineType=8)
-
-    _debug(visual=labeled_img, filename=os.path.join(params.debug_outdir, f"{params.device}_sorted_segments.png"))
-
-    return secondary_objects, primary_objects
+    return labeled_img
@@ -6,9 +6,9 @@ import numpy as np
 import pandas as pd
 from plantcv.plantcv import params
 from plantcv.plantcv import outputs
-from plantcv.plantcv import find_objects
 from plantcv.plantcv import color_palette
 from plantcv.plantcv.morphology import _iterative_prune
+from plantcv.plantcv.morphology._segment_canvas import _segment_canvas, _canvas_objects
 from plantcv.plantcv._debug import _debug
 
 
@@ -63,12 +63,12 @@ def segment_tangent_angle(segmented_img, objects, size, label="default"):
     rand_color = color_palette(num=len(objects), saved=True)
 
     for i, cnt in enumerate(objects):
-        find_tangents = np.zeros(segmented_img.shape[:2], np.uint8)
-        cv2.drawContours(find_tangents, objects, i, 255, 1, lineType=8)
+        # Draw the segment on a canvas cropped to the segment
+        find_tangents, offset = _segment_canvas(cnt, segmented_img.shape)
         cv2.drawContours(labeled_img, objects, i, rand_color[i], params.line_thickness, lineType=8)
         pruned_segment = _iterative_prune(find_tangents, size)
         segment_ends = find_tangents - pruned_segment
-        segment_end_obj, segment_end_hierarchy = find_objects(segment_ends, segment_ends)
+        segment_end_obj, segment_end_hierarchy = _canvas_objects(segment_ends, offset)
         slopes = []
         for j, obj in enumerate(segment_end_obj):
             # Find bounds for regression lines to get drawn
@@ -0,0 +1,337 @@
+# Skeleton graph (tips, branch points, and segments) built from a skeleton image
+
+import cv2
+import numpy as np
+
+# Offsets (row, column) of the 8 neighbors of a pixel. Neighbor i sets bit i of the neighborhood code of a pixel
+_neighbor_offsets = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+# In a kernel: 1 values line up with 255s, -1s line up with 0s, and 0s correspond to don't care
+# Tips (endpoints)
+_endpoint1 = np.array([[-1, -1, -1],
+                       [-1, 1, -1],
+                       [0, 1, 0]])
+_endpoint2 = np.array([[-1, -1, -1],
+                       [-1, 1, 0],
+                       [-1, 0, 1]])
+_tip_kernels = [np.rot90(_endpoint1, k) for k in range(4)] + [np.rot90(_endpoint2, k) for k in range(4)]
+
+# T like branch points
+_t1 = np.array([[-1, 1, -1],
+                [1, 1, 1],
+                [-1, -1, -1]])
+_t2 = np.array([[1, -1, 1],
+                [-1, 1, -1],
+                [1, -1, -1]])
+# Y like branch points
+_y1 = np.array([[1, -1, 1],
+                [0, 1, 0],
+                [0, 1, 0]])
+_y2 = np.array([[-1, 1, -1],
+                [1, 1, 0],
+                [-1, 0, 1]])
+_branch_kernels = [np.rot90(kernel, k) for kernel in (_t1, _t2) for k in range(4)] + \
+                  [np.rot90(kernel, k) for kernel in (_y1, _y2) for k in range(4)]
+
+
+def _kernel_lut(kernels):
+    """Build a lookup table of the neighborhood codes (0-255) of a skeleton pixel that match any hit-or-miss kernel.
+
+    Inputs:
+    kernels = list of 3x3 hit-or-miss kernels
+
+    Returns:
+    lut     = boolean array of length 256
+
+    :param kernels: list
+    :return lut: numpy.ndarray
+    """
+    codes = np.arange(256)
+    lut = np.zeros(256, dtype=bool)
+    for kernel in kernels:
+        match = np.ones(256, dtype=bool)
+        for bit, (dy, dx) in enumerate(_neighbor_offsets):
+            neighbor = (codes >> bit) & 1
+            if kernel[dy + 1, dx + 1] == 1:
+                match &= neighbor == 1
+            elif kernel[dy + 1, dx + 1] == -1:
+                match &= neighbor == 0
+        lut |= match
+    return lut
+
+
+_tip_lut = _kernel_lut(_tip_kernels)
+_branch_lut = _kernel_lut(_branch_kernels)
+# Number of neighbors of each neighborhood code
+_degree_lut = np.array([bin(code).count("1") for code in range(256)], dtype=np.uint8)
+
+
+class SkeletonGraph:
+    """Graph representation of a skeleton.
+
+    The graph is built in a single pass over the skeleton pixels that records the 8-neighborhood of each pixel. Tips
+    and branch points are the pixels whose neighborhood matches the tip and branch point kernels (the same definitions
+    used by morphology.find_tips and morphology.find_branch_pts). Junctions are the clusters of skeleton pixels within
+    one pixel of a branch point and edges are the pixel chains (segments) that remain when junctions are removed (the
+    same segments as morphology.segment_skeleton). Edges, junctions, and their adjacency are computed when first used.
+
+    The morphology functions accept a SkeletonGraph in place of a skeleton image, so that a skeleton only needs to be
+    analyzed once.
+    """
+
+    def __init__(self, skel_img):
+        """Build the graph of a skeleton.
+
+        Inputs:
+        skel_img = Skeletonized image
+
+        :param skel_img: numpy.ndarray
+        """
+        self.skel_img = skel_img
+        self.shape = skel_img.shape[:2]
+        padded = np.pad(skel_img > 0, 1)
+        rows, cols = np.nonzero(padded)
+        codes = np.zeros(len(rows), dtype=np.uint8)
+        for bit, (dy, dx) in enumerate(_neighbor_offsets):
+            codes |= padded[rows + dy, cols + dx].astype(np.uint8) << bit
+        # Skeleton pixel coordinates (row, column) and neighborhood codes
+        self.rows = rows - 1
+        self.cols = cols - 1
+        self.codes = codes
+        # Tip and branch point coordinates (x, y). Like the OpenCV hit-or-miss transform with a constant (0) border,
+        # pixels on the image border are never matched
+        inner = (self.rows > 0) & (self.rows < self.shape[0] - 1) & (self.cols > 0) & (self.cols < self.shape[1] - 1)
+        is_tip = _tip_lut[codes] & inner
+        is_branch = _branch_lut[codes] & inner
+        self.tips = np.column_stack((self.cols[is_tip], self.rows[is_tip]))
+        self.branch_pts = np.column_stack((self.cols[is_branch], self.rows[is_branch]))
+        self._segments = None
+
+    @property
+    def degree(self):
+        """Number of neighbors of each skeleton pixel (in the order of rows and cols)."""
+        return _degree_lut[self.codes]
+
+    @property
+    def tip_img(self):
+        """Image with just tips (255), rest 0."""
+        return self._points_img(self.tips)
+
+    @property
+    def branch_pts_img(self):
+        """Image with just branch points (255), rest 0."""
+        return self._points_img(self.branch_pts)
+
+    @property
+    def segments_img(self):
+        """Skeleton image with the junctions removed (255), rest 0."""
+        return (self.edge_labels > 0).astype(np.uint8) * 255
+
+    @property
+    def edge_labels(self):
+        """Label image (int32) of the edges, 0 is background and edge i is labeled i + 1."""
+        return self._build_segments()["edge_labels"]
+
+    @property
+    def junction_labels(self):
+        """Label image (int32) of the junctions, 0 is background and junction j is labeled j + 1."""
+        return self._build_segments()["junction_labels"]
+
+    @property
+    def edges(self):
+        """List of the (x, y) pixel coordinates of each edge (pixel chains in row-major order)."""
+        return self._build_segments()["edges"]
+
+    @property
+    def junctions(self):
+        """List of the (x, y) pixel coordinates of each junction."""
+        return self._build_segments()["junctions"]
+
+    @property
+    def edge_junctions(self):
+        """List of the junction indices adjacent to each edge."""
+        return self._build_segments()["edge_junctions"]
+
+    @property
+    def edge_tips(self):
+        """List of the tip indices (rows of tips) that lie on each edge."""
+        return self._build_segments()["edge_tips"]
+
+    @property
+    def adjacency(self):
+        """Dictionary of the edge indices adjacent to each junction index."""
+        return self._build_segments()["adjacency"]
+
+    @property
+    def segment_objects(self):
+        """List of segment contours, identical to the segment objects of morphology.segment_skeleton."""
+        segments = self._build_segments()
+        if segments["objects"] is None:
+            segments_img = self.segments_img
+            segments["objects"] = list(cv2.findContours(segments_img, cv2.RETR_TREE, cv2.CHAIN_APPROX_NONE)[-2])
+        return segments["objects"]
+
+    def _points_img(self, points):
+        """Draw points (x, y) on an empty image."""
+        img = np.zeros(self.shape, dtype=np.uint8)
+        img[points[:, 1], points[:, 0]] = 255
+        return img
+
+    def _build_segments(self):
+        """Split the skeleton into junctions and edges and compute their adjacency."""
+        if self._segments is not None:
+            return self._segments
+        # Junctions are the skeleton pixels within one pixel of a branch point
+        near_branch = cv2.dilate(self.branch_pts_img, np.ones((3, 3), np.uint8), iterations=1)
+        on_junction = near_branch[self.rows, self.cols] > 0
+        junction_img = np.zeros(self.shape, dtype=np.uint8)
+        junction_img[self.rows[on_junction], self.cols[on_junction]] = 255
+        edge_img = np.zeros(self.shape, dtype=np.uint8)
+        edge_img[self.rows[~on_junction], self.cols[~on_junction]] = 255
+        n_edges, edge_labels = cv2.connectedComponents(edge_img, connectivity=8, ltype=cv2.CV_32S)
+        n_junctions, junction_labels = cv2.connectedComponents(junction_img, connectivity=8, ltype=cv2.CV_32S)
+
+        # Pairs of edge and junction labels of neighboring pixels
+        padded_junctions = np.pad(junction_labels, 1)
+        edge_rows = self.rows[~on_junction]
+        edge_cols = self.cols[~on_junction]
+        pixel_edges = edge_labels[edge_rows, edge_cols]
+        pairs = []
+        for dy, dx in _neighbor_offsets:
+            neighbor = padded_junctions[edge_rows + 1 + dy, edge_cols + 1 + dx]
+            found = neighbor > 0
+            pairs.append(np.column_stack((pixel_edges[found], neighbor[found])))
+        pairs = np.unique(np.concatenate(pairs), axis=0) - 1
+        edge_junctions = [[] for _ in range(n_edges - 1)]
+        adjacency = {junction: [] for junction in range(n_junctions - 1)}
+        for edge, junction in pairs:
+            edge_junctions[edge].append(int(junction))
+            adjacency[int(junction)].append(int(edge))
+
+        # Tips that lie on each edge
+        edge_tips = [[] for _ in range(n_edges - 1)]
+        for i, label in enumerate(edge_labels[self.tips[:, 1], self.tips[:, 0]]):
+            if label > 0:
+                edge_tips[label - 1].append(i)
+
+        self._segments = {"edge_labels": edge_labels, "junction_labels": junction_labels,
+                          "edges": _group_pixels(edge_labels, edge_rows, edge_cols, n_edges - 1),
+                          "junctions": _group_pixels(junction_labels, self.rows[on_junction],
+                                                     self.cols[on_junction], n_junctions - 1),
+                          "edge_junctions": edge_junctions, "edge_tips": edge_tips, "adjacency": adjacency,
+                          "objects": None}
+        return self._segments
+
+
+def _group_pixels(labels, rows, cols, n):
+    """Group pixel coordinates by label.
+
+    Inputs:
+    labels = label image
+    rows   = pixel rows (row-major order)
+    cols   = pixel columns
+    n      = number of labels (excluding background)
+
+    Returns:
+    groups = list of (x, y) pixel coordinate arrays, one per label
+
+    :param labels: numpy.ndarray
+    :param rows: numpy.ndarray
+    :param cols: numpy.ndarray
+    :param n: int
+    :return groups: list
+    """
+    pixel_labels = labels[rows, cols]
+    order = np.argsort(pixel_labels, kind="stable")
+    bounds = np.searchsorted(pixel_labels[order], np.arange(1, n + 2))
+    coords = np.column_stack((cols[order], rows[order]))
+    return [coords[bounds[i]:bounds[i + 1]] for i in range(n)]
+
+
+def _skeleton_graph(skel_img):
+    """Return the graph of a skeleton image, or the graph itself if it is already a SkeletonGraph.
+
+    Inputs:
+    skel_img = Skeletonized image or SkeletonGraph
+
+    Returns:
+    graph    = SkeletonGraph
+
+    :param skel_img: numpy.ndarray or SkeletonGraph
+    :return graph: plantcv.plantcv.morphology.SkeletonGraph
+    """
+    if isinstance(skel_img, SkeletonGraph):
+        return skel_img
+    return SkeletonGraph(skel_img)
+
+
+def _skeleton_img(skel_img):
+    """Return the skeleton image of a skeleton image or SkeletonGraph.
+
+    Inputs:
+    skel_img = Skeletonized image or SkeletonGraph
+
+    Returns:
+    skel_img = Skeletonized image
+
+    :param skel_img: numpy.ndarray or SkeletonGraph
+    :return skel_img: numpy.ndarray
+    """
+    if isinstance(skel_img, SkeletonGraph):
+        return skel_img.skel_img
+    return skel_img
+
+
+def _prune_tips(skel_img, size):
+    """Remove the tips of a skeleton size times, the same as repeatedly removing the pixels found by find_tips.
+
+    Pruning starts at the tips and only works inward: after each round of tip removal only the neighbors of the removed
+    pixels can become new tips, so each skeleton pixel is tested a bounded number of times instead of re-scanning the
+    whole image each round.
+
+    Inputs:
+    skel_img   = Skeletonized image
+    size       = Number of rounds of tip removal
+
+    Returns:
+    pruned_img = Pruned image
+
+    :param skel_img: numpy.ndarray
+    :param size: int
+    :return pruned_img: numpy.ndarray
+    """
+    height, width = skel_img.shape[:2]
+    # Flat indices of a zero-padded copy of the skeleton
+    padded_width = width + 2
+    skeleton = np.pad(skel_img > 0, 1).ravel()
+    offsets = [dy * padded_width + dx for dy, dx in _neighbor_offsets]
+    pixels = np.flatnonzero(skeleton)
+    codes = np.zeros(len(skeleton), dtype=np.uint8)
+    for bit, offset in enumerate(offsets):
+        codes[pixels] |= skeleton[pixels + offset].astype(np.uint8) << bit
+    # Pixels on the image border are never tips
+    rows, cols = np.divmod(pixels, padded_width)
+    inner = np.zeros(len(skeleton), dtype=bool)
+    inner[pixels] = (rows > 1) & (rows < height) & (cols > 1) & (cols < width)
+
+    removed = []
+    candidates = pixels
+    for _ in range(size):
+        tips = candidates[skeleton[candidates] & inner[candidates] & _tip_lut[codes[candidates]]]
+        if len(tips) == 0:
+            break
+        # Remove all tips at once, then update the neighborhood codes of their neighbors
+        skeleton[tips] = False
+        removed.append(tips)
+        neighbors = []
+        for bit, offset in enumerate(offsets):
+            neighbor = tips - offset
+            codes[neighbor] &= np.uint8(~(1 << bit) & 255)
+            neighbors.append(neighbor)
+        candidates = np.unique(np.concatenate(neighbors))
+
+    pruned_img = skel_img.copy()
+    if removed:
+        rows, cols = np.divmod(np.concatenate(removed), padded_width)
+        pruned_img[rows - 1, cols - 1] = 0
+    return pruned_img
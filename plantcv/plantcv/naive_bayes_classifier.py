@@ -9,6 +9,10 @@ from plantcv.plantcv import fatal_error
 from plantcv.plantcv import params
 
 
+# Parsed PDF files, keyed by absolute filename. Values are (modification time, class names, PDF lookup table)
+_pdf_cache = {}
+
+
 def naive_bayes_classifier(rgb_img, pdf_file):
     """
     Use the Naive Bayes classifier to output a plant binary mask.
@@ -24,61 +28,26 @@ def naive_bayes_classifier(rgb_img, pdf_file):
     :param pdf_file: str
     :return masks: dict
     """
-
-    # Initialize PDF dictionary
-    pdfs = {}
-    # Read the PDF file
-    pf = open(pdf_file, "r")
-    # Read the first line (header)
-    pf.readline()
-    # Read each line of the file and parse the PDFs, store in the PDF dictionary
-    for row in pf:
-        # Remove newline character
-        row = row.rstrip("\n")
-        # Split the row into columns on tab characters
-        cols = row.split("\t")
-        # Make sure there are the correct number of columns (i.e. is this a valid PDF file?)
-        if len(cols) != 258:
-            fatal_error("Naive Bayes PDF file is not formatted correctly. Error on line:\n" + row)
-        # Store the PDFs. Column 0 is the class, Column 1 is the color channel, the rest are p at
-        # intensity values 0-255. Cast text p values as float
-        class_name = cols[0]
-        channel = cols[1]
-        if class_name not in pdfs:
-            pdfs[class_name] = {}
-        pdfs[class_name][channel] = [float(i) for i in cols[2:]]
+    # Read the PDFs as a lookup table with one row per class and one column per HSV channel
+    class_names, pdfs = _read_pdfs(pdf_file=pdf_file)
 
     # Split the input BGR image into component channels for BGR, HSV, and LAB colorspaces
     h, s, v = cv2.split(cv2.cvtColor(rgb_img, cv2.COLOR_BGR2HSV))
 
-    # Calculate the dimensions of the input image
-    width, height, depth = np.shape(rgb_img)
-
-    # Initialize an empty ndarray for plant and background. These will be used to store the joint probabilities
-    px_p = {}
-    for class_name in pdfs.keys():
-        px_p[class_name] = np.zeros([width, height])
+    # Calculate the joint probability of each pixel being in each class by gathering the per-class PDF values at the
+    # pixel intensities. px_p has shape (n_classes, rows, columns)
+    px_p = pdfs[:, 0, h] * pdfs[:, 1, s] * pdfs[:, 2, v]
 
-    # Loop over the image coordinates (each i, j pixel)
-    for i in range(0, width):
-        for j in range(0, height):
-            for class_name in pdfs.keys():
-                # Calculate the joint probability that this is in the class
-                px_p[class_name][i][j] = pdfs[class_name]["hue"][h[i][j]] * pdfs[class_name]["saturation"][s[i][j]] * \
-                    pdfs[class_name]["value"][v[i][j]]
+    # A pixel belongs to a class if the class has the highest probability and no other class ties with it
+    max_p = np.amax(px_p, axis=0)
+    at_max = px_p == max_p
+    unique_max = np.sum(at_max, axis=0) == 1
 
-    # Initialize empty masks
-    masks = {}
-    for class_name in pdfs.keys():
-        masks[class_name] = np.zeros([width, height], dtype=np.uint8)
     # Set pixel intensities to 255 (white) for the mask where the class has the highest probability
-    for class_name in masks:
-        background_classes = []
-        for name in masks:
-            if class_name is not name:
-                background_classes.append(px_p[name])
-        background_class = np.maximum.reduce(background_classes)
-        masks[class_name][np.where(px_p[class_name] > background_class)] = 255
+    masks = {}
+    for i, class_name in enumerate(class_names):
+        masks[class_name] = np.zeros(np.shape(h), dtype=np.uint8)
+        masks[class_name][np.logical_and(at_max[i], unique_max)] = 255
 
     # Print or plot the mask if debug is not None
     if params.debug is not None:
@@ -89,3 +58,59 @@ def naive_bayes_classifier(rgb_img, pdf_file):
                    cmap='gray')
 
     return masks
+
+
+def _read_pdfs(pdf_file):
+    """
+    Read a naive Bayes PDF file into a lookup table. Parsed files are cached until the file is modified.
+
+    Inputs:
+    pdf_file    = filename of file containing PDFs output from the Naive Bayes training method (see plantcv-train.py)
+
+    Returns:
+    class_names = List of class names
+    pdfs        = PDF lookup table with shape (n_classes, 3, 256) for the hue, saturation, and value channels
+
+    :param pdf_file: str
+    :return class_names: list
+    :return pdfs: numpy.ndarray
+    """
+    filename = os.path.abspath(pdf_file)
+    mtime = os.path.getmtime(filename)
+    if filename in _pdf_cache and _pdf_cache[filename][0] == mtime:
+        return _pdf_cache[filename][1], _pdf_cache[filename][2]
+
+    # Initialize PDF dictionary
+    pdfs = {}
+    # Read the PDF file
+    with open(filename, "r") as pf:
+        # Read the first line (header)
+        pf.readline()
+        # Read each line of the file and parse the PDFs, store in the PDF dictionary
+        for row in pf:
+            # Remove newline character
+            row = row.rstrip("\n")
+            # Split the row into columns on tab characters
+            cols = row.split("\t")
+            # Make sure there are the correct number of columns (i.e. is this a valid PDF file?)
+            if len(cols) != 258:
+                fatal_error("Naive Bayes PDF file is not formatted correctly. Error on line:\n" + row)
+            # Store the PDFs. Column 0 is the class, Column 1 is the color channel, the rest are p at
+            # intensity values 0-255. Cast text p values as float
+            class_name = cols[0]
+            channel = cols[1]
+            if class_name not in pdfs:
+                pdfs[class_name] = {}
+            pdfs[class_name][channel] = [float(i) for i in cols[2:]]
+
+    # Build the lookup table
+    class_names = list(pdfs.keys())
+    table = np.zeros((len(class_names), 3, 256), dtype=np.float64)
+    for i, class_name in enumerate(class_names):
+        for j, channel in enumerate(["hue", "saturation", "value"]):
+            if channel not in pdfs[class_name]:
+                fatal_error(f"Naive Bayes PDF file is missing the {channel} channel for the class {class_name}.")
+            table[i, j] = pdfs[class_name][channel]
+
+    _pdf_cache[filename] = (mtime, class_names, table)
+    return class_names, table
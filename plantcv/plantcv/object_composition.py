@@ -27,20 +27,13 @@ def object_composition(img, contours, hierarchy):
     :return mask: numpy.ndarray
     """
 
-    ori_img = np.copy(img)
-    # If the reference image is grayscale convert it to color
-    if len(np.shape(ori_img)) == 2:
-        ori_img = cv2.cvtColor(ori_img, cv2.COLOR_GRAY2BGR)
+    mask = np.zeros(np.shape(img)[:2], dtype=np.uint8)
 
-    stack = np.zeros((len(contours), 1))
-    r, g, b = cv2.split(ori_img)
-    mask = np.zeros(g.shape, dtype=np.uint8)
-
-    for c, cnt in enumerate(contours):
-        if hierarchy[0][c][2] == -1 and hierarchy[0][c][3] > -1:
-            stack[c] = 0
-        else:
-            stack[c] = 1
+    # Keep every contour except holes without children (child = -1, parent > -1)
+    stack = np.zeros(len(contours), dtype=np.int64)
+    if len(contours) > 0:
+        links = np.asarray(hierarchy)[0][:len(contours)]
+        stack = np.where((links[:, 2] == -1) & (links[:, 3] > -1), 0, 1)
 
     ids = np.where(stack == 1)[0]
     if len(ids) > 0:
@@ -49,6 +42,10 @@ def object_composition(img, contours, hierarchy):
         cv2.drawContours(mask, contours, -1, 255, -1, hierarchy=hierarchy)
 
         if params.debug is not None:
+            ori_img = np.copy(img)
+            # If the reference image is grayscale convert it to color
+            if len(np.shape(ori_img)) == 2:
+                ori_img = cv2.cvtColor(ori_img, cv2.COLOR_GRAY2BGR)
             cv2.drawContours(ori_img, group, -1, (255, 0, 0), params.line_thickness)
             for cnt in contours:
                 cv2.drawContours(ori_img, cnt, -1, (255, 0, 0), params.line_thickness)
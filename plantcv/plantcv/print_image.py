@@ -1,14 +1,18 @@
 # Print image to file
-import cv2
 import numpy
 import matplotlib
 from plantcv.plantcv import params
 from plantcv.plantcv import fatal_error
+from plantcv.plantcv._image_writer import _write_image
 
 
 def print_image(img, filename):
     """Save image to file.
 
+    Images (numpy arrays) are written with the output settings in params: image_format, png_compression, and
+    image_quality. If params.image_writers is greater than 0 they are written by background threads (see
+    flush_images).
+
     Inputs:
     img      = image object
     filename = name of file to save image to
@@ -21,7 +25,7 @@ def print_image(img, filename):
     # Print numpy array type images
     image_type = type(img)
     if image_type == numpy.ndarray:
-        cv2.imwrite(filename, img)
+        _write_image(img=img, filename=filename)
 
     # Print matplotlib type images
     elif image_type == matplotlib.figure.Figure:
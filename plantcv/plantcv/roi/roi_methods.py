@@ -235,7 +235,8 @@ def multi(img, coord, radius, spacing=None, nrows=None, ncols=None):
 
     # Get the height and width of the reference image
     height, width = np.shape(img)[:2]
-    overlap_img = np.zeros((height, width))
+    # Number of ROIs that cover each pixel
+    overlap_img = np.zeros((height, width), dtype=np.int32)
 
     # Initialize a binary image of the circle that will contain all ROI
     all_roi_img = np.zeros((height, width), dtype=np.uint8)
@@ -249,8 +250,6 @@ def multi(img, coord, radius, spacing=None, nrows=None, ncols=None):
             y = coord[1] + i * spacing[1]
             # Loop over each column
             for j in range(0, ncols):
-                # Initialize a binary image for each circle
-                bin_img = np.zeros((height, width), dtype=np.uint8)
                 # The upper left corner is the x starting coordinate + the ROI offset * the
                 # horizontal spacing between chips
                 x = coord[0] + j * spacing[0]
@@ -262,19 +261,14 @@ def multi(img, coord, radius, spacing=None, nrows=None, ncols=None):
                 # Draw the circle on the binary images
                 # Keep track of all roi
                 all_roi_img = cv2.circle(all_roi_img, (x, y), radius, 255, -1)
-                # Keep track of each roi individually to check overlapping
-                circle_img = cv2.circle(bin_img, (x, y), radius, 255, -1)
-                overlap_img = overlap_img + circle_img
-                # Make a list of contours and hierarchies
-                rc, rh = cv2.findContours(circle_img, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)[-2:]
+                # Keep track of each roi individually to check overlapping and make a list of contours and hierarchies
+                rc, rh = _circle_roi(overlap_img=overlap_img, center=(x, y), radius=radius)
                 roi_contour.append(rc)
                 roi_hierarchy.append(rh)
 
     # User specified ROI centers
     elif (type(coord) == list) and ((nrows and ncols) is None) and (spacing is None):
         for i in range(0, len(coord)):
-            # Initialize a binary image for each circle
-            bin_img = np.zeros((height, width), dtype=np.uint8)
             y = coord[i][1]
             x = coord[i][0]
             if x - radius < 0 or x + radius > width or y - radius < 0 or y + radius > height:
@@ -284,11 +278,8 @@ def multi(img, coord, radius, spacing=None, nrows=None, ncols=None):
             # Draw the circle on the binary image
             # Keep track of all roi
             all_roi_img = cv2.circle(all_roi_img, (x, y), radius, 255, -1)
-            # Keep track of each roi individually to check overlapping
-            circle_img = cv2.circle(bin_img, (x, y), radius, 255, -1)
-            overlap_img = overlap_img + circle_img
-            # Make a list of contours and hierarchies
-            rc, rh = cv2.findContours(circle_img, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)[-2:]
+            # Keep track of each roi individually to check overlapping and make a list of contours and hierarchies
+            rc, rh = _circle_roi(overlap_img=overlap_img, center=(x, y), radius=radius)
             roi_contour.append(rc)
             roi_hierarchy.append(rh)
     else:
@@ -298,7 +289,7 @@ def multi(img, coord, radius, spacing=None, nrows=None, ncols=None):
                     "or take custom ROI coordinates (user must provide only a list of tuples to 'coord' parameter). "
                     "Both options require a user-defined radius as well")
 
-    if np.amax(overlap_img) > 255:
+    if np.amax(overlap_img) > 1:
         print("WARNING: Two or more of the user defined regions of interest overlap! "
               "If you only see one ROI then they may overlap exactly.")
 
@@ -315,6 +306,37 @@ def multi(img, coord, radius, spacing=None, nrows=None, ncols=None):
     return roi_contour, roi_hierarchy
 
 
+def _circle_roi(overlap_img, center, radius):
+    """Draw a circular ROI on a canvas cropped to the circle and find its contour.
+
+    The contour is the same as the contour of the circle drawn on a full-size image.
+
+    Inputs:
+    overlap_img   = Image of the number of ROIs that cover each pixel (updated in place)
+    center        = Center of the circle (x, y)
+    radius        = Radius of the circle
+
+    Returns:
+    roi_contour   = An ROI set of points (contour).
+    roi_hierarchy = The hierarchy of ROI contour(s).
+
+    :param overlap_img: numpy.ndarray
+    :param center: tuple
+    :param radius: int
+    :return roi_contour: list
+    :return roi_hierarchy: numpy.ndarray
+    """
+    height, width = np.shape(overlap_img)
+    x, y = center
+    # Leave a 1 pixel margin around the circle unless the circle touches the image border
+    x0, y0 = max(x - radius - 1, 0), max(y - radius - 1, 0)
+    x1, y1 = min(x + radius + 2, width), min(y + radius + 2, height)
+    circle_img = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+    cv2.circle(circle_img, (x - x0, y - y0), radius, 255, -1)
+    overlap_img[y0:y1, x0:x1] += circle_img > 0
+    return cv2.findContours(circle_img, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE, offset=(x0, y0))[-2:]
+
+
 def custom(img, vertices):
     """
     Create an custom polygon ROI.
@@ -3,10 +3,10 @@
 import cv2
 import numpy as np
 import os
-from plantcv.plantcv import logical_and
 from plantcv.plantcv._debug import _debug
 from plantcv.plantcv import fatal_error
 from plantcv.plantcv import params
+from plantcv.plantcv._connected_components import _trace_contours
 
 
 def roi_objects(img, roi_contour, roi_hierarchy, object_contour, obj_hierarchy, roi_type="partial"):
@@ -15,17 +15,18 @@ def roi_objects(img, roi_contour, roi_hierarchy, object_contour, obj_hierarchy,
 
     Inputs:
     img            = RGB or grayscale image data for plotting
-    roi_contour    = contour of roi, output from "View and Adjust ROI" function
-    roi_hierarchy  = contour of roi, output from "View and Adjust ROI" function
+    roi_contour    = contour of roi, output from "View and Adjust ROI" function, or a list of roi contours (e.g. from
+                     roi.multi)
+    roi_hierarchy  = contour of roi, output from "View and Adjust ROI" function, or a list of roi hierarchies
     object_contour = contours of objects, output from "find_objects" function
     obj_hierarchy  = hierarchy of objects, output from "find_objects" function
     roi_type       = 'cutto', 'partial' (for partially inside, default), or 'largest' (keep only the largest contour)
 
     Returns:
-    kept_cnt       = kept contours
-    hierarchy      = contour hierarchy list
-    mask           = mask image
-    obj_area       = total object pixel area
+    kept_cnt       = kept contours (list of kept contours per ROI for a list of ROIs)
+    hierarchy      = contour hierarchy list (list of hierarchies per ROI for a list of ROIs)
+    mask           = mask image (mask of the objects kept in any ROI for a list of ROIs)
+    obj_area       = total object pixel area (list of areas per ROI for a list of ROIs)
 
     :param img: numpy.ndarray
     :param roi_type: str
@@ -38,18 +39,22 @@ def roi_objects(img, roi_contour, roi_hierarchy, object_contour, obj_hierarchy,
     :return mask: numpy.ndarray
     :return obj_area: int
     """
-    # Store debug
-    debug = params.debug
-    params.debug = None
+    if roi_type.upper() not in ('PARTIAL', 'LARGEST', 'CUTTO'):
+        fatal_error('ROI Type ' + str(roi_type) + ' is not "cutto", "largest", or "partial"!')
+    if roi_type.upper() == 'LARGEST':
+        # Print warning statement about this feature
+        print("Warning: roi_type='largest' will only return the largest contour and its immediate children. Other "
+              "subcontours will be dropped.")
 
-    # Create an empty grayscale (black) image the same dimensions as the input image
-    mask = np.zeros(np.shape(img)[:2], dtype=np.uint8)
-    cv2.drawContours(mask, object_contour, -1, (255), -1, lineType=8, hierarchy=obj_hierarchy)
+    # A single ROI is a list of contour arrays, roi.multi returns a list of contour lists (one per ROI)
+    multi_roi = len(roi_contour) > 0 and not isinstance(roi_contour[0], np.ndarray)
+    if not multi_roi:
+        roi_contour = [roi_contour]
+        roi_hierarchy = [roi_hierarchy]
 
-    # Create a mask of the filled in ROI
-    roi_mask = np.zeros(np.shape(img)[:2], dtype=np.uint8)
-    roi_points = np.vstack(roi_contour[0])
-    cv2.fillPoly(roi_mask, [roi_points], (255))
+    # Bounding boxes and children of the objects, computed once for all ROIs
+    obj_boxes = _bounding_boxes(object_contour)
+    obj_children = _children(object_contour, obj_hierarchy)
 
     # Make a copy of the input image for plotting
     ori_img = np.copy(img)
@@ -57,94 +62,237 @@ def roi_objects(img, roi_contour, roi_hierarchy, object_contour, obj_hierarchy,
     if len(np.shape(ori_img)) == 2:
         ori_img = cv2.cvtColor(ori_img, cv2.COLOR_GRAY2BGR)
 
-    # Allows user to find all objects that are completely inside or overlapping with ROI
-    if roi_type.upper() == 'PARTIAL' or roi_type.upper() == 'LARGEST':
-        # Filter contours outside of the region of interest
-        for c, cnt in enumerate(object_contour):
-            filtering_mask = np.zeros(np.shape(img)[:2], dtype=np.uint8)
-            cv2.fillPoly(filtering_mask, [np.vstack(object_contour[c])], (255))
-            overlap_img = logical_and(filtering_mask, roi_mask)
-            # Delete contours that do not overlap at all with the ROI
-            if np.sum(overlap_img) == 0:
-                cv2.drawContours(mask, object_contour, c, (0), -1, lineType=8, hierarchy=obj_hierarchy)
-
-        # Find the kept contours and area
-        kept_cnt, kept_hierarchy = cv2.findContours(np.copy(mask), cv2.RETR_TREE, cv2.CHAIN_APPROX_NONE)[-2:]
-        obj_area = cv2.countNonZero(mask)
-
-        # Find the largest contour if roi_type is set to 'largest'
-        if roi_type.upper() == 'LARGEST':
-            # Print warning statement about this feature
-            print("Warning: roi_type='largest' will only return the largest contour and its immediate children. Other "
-                  "subcontours will be dropped.")
-            # Find the index of the largest contour in the list of contours
-            largest_area = 0
-            index = 0
-            for c, cnt in enumerate(kept_cnt):
-                area = len(cnt)
-                if area > largest_area:
-                    largest_area = area
-                    index = c
-
-            # Store the largest contour as a list
-            largest_cnt = [kept_cnt[index]]
-
-            # Store the hierarchy of the largest contour into a list
-            largest_hierarchy = [kept_hierarchy[0][index]]
-
-            # Iterate through contours to find children of the largest contour
-            for i, khi in enumerate(kept_hierarchy[0]):
-                if khi[3] == index:  # is the parent equal to the largest contour?
-                    largest_hierarchy.append(khi)
-                    largest_cnt.append(kept_cnt[i])
-
-            # Make the kept hierarchies into an array so that cv2 can use it
-            largest_hierarchy = np.array([largest_hierarchy])
-
-            # Overwrite mask so it only has the largest contour
-            mask = np.zeros(np.shape(img)[:2], dtype=np.uint8)
-            for i, cnt in enumerate(largest_cnt):
-                # print(cnt)
-                if i == 0:
-                    color = (255)
-                else:
-                    color = (0)
-                    # print(i)
-                cv2.drawContours(mask, largest_cnt, i, color, -1, lineType=8, hierarchy=largest_hierarchy, maxLevel=0)
-
-            # Refind contours and hierarchy from new mask so they are easier to work with downstream
-            kept_cnt, kept_hierarchy = cv2.findContours(np.copy(mask), cv2.RETR_TREE, cv2.CHAIN_APPROX_NONE)[-2:]
-
-            # Compute object area
-            obj_area = cv2.countNonZero(mask)
-
-        cv2.drawContours(ori_img, kept_cnt, -1, (0, 255, 0), -1, lineType=8, hierarchy=kept_hierarchy)
-        cv2.drawContours(ori_img, roi_contour, -1, (255, 0, 0), params.line_thickness, lineType=8,
-                         hierarchy=roi_hierarchy)
-    # Allows user to cut objects to the ROI (all objects completely outside ROI will not be kept)
-    elif roi_type.upper() == 'CUTTO':
-        background1 = np.zeros(np.shape(img)[:2], dtype=np.uint8)
-        background2 = np.zeros(np.shape(img)[:2], dtype=np.uint8)
-        cv2.drawContours(background1, object_contour, -1, (255), -1, lineType=8, hierarchy=obj_hierarchy)
-        roi_points = np.vstack(roi_contour[0])
-        cv2.fillPoly(background2, [roi_points], (255))
-        mask = cv2.multiply(background1, background2)
-        obj_area = cv2.countNonZero(mask)
-        kept_cnt, kept_hierarchy = cv2.findContours(np.copy(mask), cv2.RETR_TREE, cv2.CHAIN_APPROX_NONE)[-2:]
+    mask = np.zeros(np.shape(img)[:2], dtype=np.uint8)
+    kept_cnts, kept_hierarchies, obj_areas = [], [], []
+    for rc, rh in zip(roi_contour, roi_hierarchy):
+        if roi_type.upper() != 'CUTTO':
+            # Count one logical_and step per object, as the per-object overlap test used to, to keep the debug file
+            # numbering
+            params.device += len(object_contour)
+        kept_cnt, kept_hierarchy, roi_obj_mask, (x, y), obj_area = _roi_filter(object_contour=object_contour,
+                                                                               obj_boxes=obj_boxes,
+                                                                               obj_children=obj_children,
+                                                                               roi_contour=rc,
+                                                                               roi_type=roi_type,
+                                                                               shape=np.shape(img)[:2])
+        h, w = roi_obj_mask.shape
+        mask[y:y + h, x:x + w] = cv2.bitwise_or(mask[y:y + h, x:x + w], roi_obj_mask)
+        kept_cnts.append(kept_cnt)
+        kept_hierarchies.append(kept_hierarchy)
+        obj_areas.append(obj_area)
         cv2.drawContours(ori_img, kept_cnt, -1, (0, 255, 0), -1, lineType=8, hierarchy=kept_hierarchy)
-        cv2.drawContours(ori_img, roi_contour, -1, (255, 0, 0), params.line_thickness, lineType=8,
-                         hierarchy=roi_hierarchy)
-    else:
-        # Reset debug mode
-        params.debug = debug
-        fatal_error('ROI Type ' + str(roi_type) + ' is not "cutto", "largest", or "partial"!')
+        cv2.drawContours(ori_img, rc, -1, (255, 0, 0), params.line_thickness, lineType=8, hierarchy=rh)
 
-    # Reset debug mode
-    params.debug = debug
     _debug(ori_img,
            filename=os.path.join(params.debug_outdir, str(params.device) + '_obj_on_img.png'))
-    _debug(mask, 
+    _debug(mask,
            filename=os.path.join(params.debug_outdir, str(params.device) + '_roi_mask.png'),
            cmap='gray')
 
-    return kept_cnt, kept_hierarchy, mask, obj_area
+    if multi_roi:
+        return kept_cnts, kept_hierarchies, mask, obj_areas
+    return kept_cnts[0], kept_hierarchies[0], mask, obj_areas[0]
+
+
+def _bounding_boxes(contours):
+    """Bounding boxes of a list of contours.
+
+    Inputs:
+    contours = list of contours
+
+    Returns:
+    boxes    = array of (x0, y0, x1, y1) bounding boxes (x1 and y1 are exclusive)
+
+    :param contours: list
+    :return boxes: numpy.ndarray
+    """
+    boxes = np.zeros((len(contours), 4), dtype=np.int64)
+    for i, cnt in enumerate(contours):
+        x, y, w, h = cv2.boundingRect(np.vstack(cnt))
+        boxes[i] = x, y, x + w, y + h
+    return boxes
+
+
+def _children(contours, hierarchy):
+    """Child contours of each contour.
+
+    Inputs:
+    contours  = list of contours
+    hierarchy = contour hierarchy (or None)
+
+    Returns:
+    children  = list of the indices of the child contours of each contour
+
+    :param contours: list
+    :param hierarchy: numpy.ndarray
+    :return children: list
+    """
+    children = [[] for _ in range(len(contours))]
+    if hierarchy is not None:
+        for c, parent in enumerate(hierarchy[0][:len(contours), 3]):
+            if parent >= 0:
+                children[parent].append(c)
+    return children
+
+
+def _subtree(children, c):
+    """Indices of a contour and all of its descendants."""
+    subtree = [c]
+    for i in subtree:
+        subtree.extend(children[i])
+    return subtree
+
+
+def _intersects(boxes, box):
+    """Test which bounding boxes intersect a bounding box (both in (x0, y0, x1, y1) format)."""
+    return (boxes[:, 0] < box[2]) & (boxes[:, 2] > box[0]) & (boxes[:, 1] < box[3]) & (boxes[:, 3] > box[1])
+
+
+def _roi_filter(object_contour, obj_boxes, obj_children, roi_contour, roi_type, shape):
+    """Filter objects with one ROI.
+
+    All drawing is done on a window of the image that contains the result (the mask is empty outside of the window),
+    and only the contours that intersect the window are drawn, so the cost depends on the size of the ROI and the kept
+    objects instead of the size of the image and the number of objects. Like cv2.drawContours with the object
+    hierarchy, a deleted contour is filled together with all of its descendants.
+
+    Inputs:
+    object_contour = contours of objects
+    obj_boxes      = bounding boxes of the objects (from _bounding_boxes)
+    obj_children   = child contours of the objects (from _children)
+    roi_contour    = contour of roi
+    roi_type       = 'cutto', 'partial', or 'largest'
+    shape          = shape of the image
+
+    Returns:
+    kept_cnt       = kept contours
+    hierarchy      = contour hierarchy list
+    mask           = mask image of the window
+    offset         = (x, y) coordinates of the top left corner of the window
+    obj_area       = total object pixel area
+
+    :param object_contour: list
+    :param obj_boxes: numpy.ndarray
+    :param obj_children: list
+    :param roi_contour: list
+    :param roi_type: str
+    :param shape: tuple
+    :return kept_cnt: list
+    :return hierarchy: numpy.ndarray
+    :return mask: numpy.ndarray
+    :return offset: tuple
+    :return obj_area: int
+    """
+    height, width = shape
+    # Mask of the filled in ROI, cropped to the bounding box of the ROI
+    roi_points = np.vstack(roi_contour[0])
+    x, y, w, h = cv2.boundingRect(roi_points)
+    roi_box = np.array([min(max(x, 0), width), min(max(y, 0), height), min(x + w, width), min(y + h, height)])
+    roi_box[2:] = np.maximum(roi_box[2:], roi_box[:2])
+    roi_mask = np.zeros((roi_box[3] - roi_box[1], roi_box[2] - roi_box[0]), dtype=np.uint8)
+    if roi_mask.size > 0:
+        cv2.fillPoly(roi_mask, [roi_points], (255), offset=(-int(roi_box[0]), -int(roi_box[1])))
+
+    if roi_type.upper() == 'CUTTO':
+        # Cut objects to the ROI (all objects completely outside ROI will not be kept)
+        window = _window(roi_box, shape)
+        background1 = _draw_window(object_contour, np.flatnonzero(_intersects(obj_boxes, window)), window)
+        background2 = np.zeros_like(background1)
+        background2[roi_box[1] - window[1]:roi_box[3] - window[1],
+                    roi_box[0] - window[0]:roi_box[2] - window[0]] = roi_mask
+        mask = cv2.multiply(background1, background2)
+        kept_cnt, kept_hierarchy, offset = _window_objects(mask, window)
+        return kept_cnt, kept_hierarchy, mask, offset, cv2.countNonZero(mask)
+
+    # Find all objects that are completely inside or overlapping with ROI. Only objects whose bounding box intersects
+    # the ROI can overlap with it, and the overlap is only rasterized within the intersection of the bounding boxes
+    overlap = np.zeros(len(object_contour), dtype=bool)
+    for c in np.flatnonzero(_intersects(obj_boxes, roi_box)):
+        box = np.concatenate([np.maximum(obj_boxes[c, :2], roi_box[:2]), np.minimum(obj_boxes[c, 2:], roi_box[2:])])
+        filtering_mask = np.zeros((box[3] - box[1], box[2] - box[0]), dtype=np.uint8)
+        cv2.fillPoly(filtering_mask, [np.vstack(object_contour[c])], (255), offset=(-int(box[0]), -int(box[1])))
+        roi_crop = roi_mask[box[1] - roi_box[1]:box[3] - roi_box[1], box[0] - roi_box[0]:box[2] - roi_box[0]]
+        overlap[c] = cv2.countNonZero(cv2.bitwise_and(filtering_mask, roi_crop)) > 0
+
+    # The kept objects are within the union of the bounding boxes of the overlapping contours
+    if np.any(overlap):
+        kept_boxes = obj_boxes[overlap]
+        window = _window(np.concatenate([kept_boxes[:, :2].min(axis=0), kept_boxes[:, 2:].max(axis=0)]), shape)
+    else:
+        window = _window(np.array([0, 0, 0, 0]), shape)
+    in_window = _intersects(obj_boxes, window)
+    mask = _draw_window(object_contour, np.flatnonzero(in_window), window)
+    # Delete contours that do not overlap at all with the ROI
+    for c in np.flatnonzero(~overlap & in_window):
+        _draw_window(object_contour, _subtree(obj_children, c), window, mask=mask, color=0)
+
+    # Find the kept contours and area
+    kept_cnt, kept_hierarchy, offset = _window_objects(mask, window)
+    obj_area = cv2.countNonZero(mask)
+
+    # Find the largest contour if roi_type is set to 'largest'
+    if roi_type.upper() == 'LARGEST':
+        # Find the index of the largest contour in the list of contours
+        largest_area = 0
+        index = 0
+        for c, cnt in enumerate(kept_cnt):
+            area = len(cnt)
+            if area > largest_area:
+                largest_area = area
+                index = c
+
+        # Store the largest contour as a list
+        largest_cnt = [kept_cnt[index]]
+
+        # Store the hierarchy of the largest contour into a list
+        largest_hierarchy = [kept_hierarchy[0][index]]
+
+        # Iterate through contours to find children of the largest contour
+        for i, khi in enumerate(kept_hierarchy[0]):
+            if khi[3] == index:  # is the parent equal to the largest contour?
+                largest_hierarchy.append(khi)
+                largest_cnt.append(kept_cnt[i])
+
+        # Make the kept hierarchies into an array so that cv2 can use it
+        largest_hierarchy = np.array([largest_hierarchy])
+
+        # Overwrite mask so it only has the largest contour
+        mask = np.zeros_like(mask)
+        for i, cnt in enumerate(largest_cnt):
+            if i == 0:
+                color = (255)
+            else:
+                color = (0)
+            cv2.drawContours(mask, largest_cnt, i, color, -1, lineType=8, hierarchy=largest_hierarchy, maxLevel=0,
+                             offset=(-int(window[0]), -int(window[1])))
+
+        # Refind contours and hierarchy from new mask so they are easier to work with downstream
+        kept_cnt, kept_hierarchy, offset = _window_objects(mask, window)
+
+        # Compute object area
+        obj_area = cv2.countNonZero(mask)
+
+    return kept_cnt, kept_hierarchy, mask, offset, obj_area
+
+
+def _window(box, shape):
+    """Pad a bounding box by one pixel (so that no object touches the window border unless it touches the image
+    border) and clip it to the image. Returns (x0, y0, x1, y1), at least one pixel in size."""
+    x0, y0 = max(int(box[0]) - 1, 0), max(int(box[1]) - 1, 0)
+    x1, y1 = min(int(box[2]) + 1, shape[1]), min(int(box[3]) + 1, shape[0])
+    return x0, y0, max(x1, x0 + 1), max(y1, y0 + 1)
+
+
+def _draw_window(object_contour, indices, window, mask=None, color=255):
+    """Fill a set of objects (together, like cv2.drawContours) on a window of the image (a new mask by default)."""
+    if mask is None:
+        mask = np.zeros((window[3] - window[1], window[2] - window[0]), dtype=np.uint8)
+    cv2.drawContours(mask, [object_contour[i] for i in indices], -1, (color), -1, lineType=8,
+                     offset=(-window[0], -window[1]))
+    return mask
+
+
+def _window_objects(mask, window):
+    """Find the contours of a window mask in image coordinates. Returns the contours, hierarchy, and window offset."""
+    kept_cnt, kept_hierarchy = _trace_contours(mask=mask, offset=(window[0], window[1]))
+    return kept_cnt, kept_hierarchy, (window[0], window[1])
@@ -1,6 +1,7 @@
 # Segment objects into spatial based clusters within an image
 
 import os
+import cv2
 import numpy as np
 from sklearn.cluster import DBSCAN
 from sklearn.cluster import OPTICS
@@ -10,7 +11,8 @@ from plantcv.plantcv._debug import _debug
 from plantcv.plantcv import color_palette
 
 
-def spatial_clustering(mask, algorithm="DBSCAN", min_cluster_size=5, max_distance=None):
+def spatial_clustering(mask, algorithm="DBSCAN", min_cluster_size=5, max_distance=None, precluster=None, grid_size=4,
+                       return_labels=False):
     """
     Counts and segments portions of an image based on distance between two pixels.
     Masks showing all clusters, plus masks of individual clusters, are returned.
@@ -25,15 +27,26 @@ def spatial_clustering(mask, algorithm="DBSCAN", min_cluster_size=5, max_distanc
                        of the same cluster.  For the DBSCAN algorithm, value must be between
                        0 and 1.  For OPTICS, the value is in pixels and depends on the size
                        of your picture.  (Default=0)
+    precluster       = Optionally cluster fewer points instead of every pixel: "grid" clusters one point per
+                       grid_size x grid_size cell of the image (the mean position of the pixels in the cell),
+                       "components" clusters the boundary pixels of the connected components of the mask and keeps each
+                       component in one cluster. Only supported with DBSCAN. (Default=None)
+    grid_size        = Size of the grid cells (in pixels) for precluster="grid", should be smaller than max_distance
+                       (in pixels). (Default=4)
+    return_labels    = If True, return a labeled image instead of the list of cluster masks. (Default=False)
 
     Returns:
     clust_img        = Output image with each cluster draw with a unique color.
-    clust_masks      = List of binary masks, one per cluster.
+    clust_masks      = List of binary masks, one per cluster (or, if return_labels is True, an int32 image labeled with
+                       1 to the number of clusters, 0 for the background, and -1 for pixels not assigned to a cluster).
 
     :param mask: numpy.ndarray
     :param algorithm: str
     :param min_cluster_size: int
     :param max_distance: float
+    :param precluster: str
+    :param grid_size: int
+    :param return_labels: bool
     :return clust_img: numpy.ndarray
     :return clust_masks: list
     """
@@ -47,6 +60,11 @@ def spatial_clustering(mask, algorithm="DBSCAN", min_cluster_size=5, max_distanc
     # If the algorithm is not in the default_max_dist dictionary raise a NameError
     if al_upper not in default_max_dist:
         raise NameError("Please use only 'OPTICS' or 'DBSCAN' ")
+    if precluster is not None and precluster.upper() not in ("GRID", "COMPONENTS"):
+        raise NameError("Please use only 'grid' or 'components' pre-clustering ")
+    # OPTICS cannot weight the points by their number of pixels, so min_cluster_size would count points, not pixels
+    if precluster is not None and al_upper != "DBSCAN":
+        raise NameError("Pre-clustering is only supported with 'DBSCAN' ")
 
     # If max_distance is not set, apply the default value
     if max_distance is None:
@@ -56,43 +74,125 @@ def spatial_clustering(mask, algorithm="DBSCAN", min_cluster_size=5, max_distanc
     x, y = np.where(mask == 255)
     zipped = np.column_stack((x, y))
 
+    # Points to cluster, their weights (number of pixels), and the point of each pixel
+    points, weights, inverse = _precluster(mask=mask, zipped=zipped, precluster=precluster, grid_size=grid_size)
+
     if "OPTICS" in al_upper:
         scaled = StandardScaler(with_mean=False, with_std=False).fit_transform(zipped)
         db = OPTICS(max_eps=max_distance, min_samples=min_cluster_size, n_jobs=-1).fit(scaled)
     elif "DBSCAN" in al_upper:
-        scaled = StandardScaler().fit_transform(zipped)
-        db = DBSCAN(eps=max_distance, min_samples=min_cluster_size, n_jobs=-1).fit(scaled)
+        scaled = StandardScaler().fit(zipped).transform(points)
+        db = DBSCAN(eps=max_distance, min_samples=min_cluster_size, n_jobs=-1).fit(scaled, sample_weight=weights)
+
+    # Cluster label of each pixel
+    labels = _pixel_labels(db.labels_, points=points, inverse=inverse, zipped=zipped, mask=mask, precluster=precluster)
 
     # Number of clusters
-    n_clusters = len(set(db.labels_)) - (1 if -1 in db.labels_ else 0)
+    n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
     # Create a color palette of n_clusters colors
     colors = color_palette(n_clusters + 1)
-    # Initialize variables
-    dict_of_colors = {}
-    clust_masks = []
     h, w = mask.shape
-    # Colorized clusters image
-    clust_img = np.zeros((h, w, 3), np.uint8)
-    # Index the label color for each cluster
-    for y in range(0, n_clusters):
-        dict_of_colors[str(y)] = colors[y]
-        clust_masks.append(np.zeros((h, w), np.uint8))
 
-    # Group -1 are points not assigned to a cluster
-    dict_of_colors["-1"] = (255, 255, 255)
-
-    # Loop over labels/clusters
-    for z in range(0, len(db.labels_)):
-        if not db.labels_[z] == -1:
-            # Create a binary mask for each cluster
-            clust_masks[db.labels_[z]][zipped[z][0], zipped[z][1]] = 255
-
-        # Add a cluster with a unique label color to the cluster image
-        clust_img[zipped[z][0], zipped[z][1]] = (dict_of_colors[str(db.labels_[z])][2],
-                                                 dict_of_colors[str(db.labels_[z])][1],
-                                                 dict_of_colors[str(db.labels_[z])][0])
+    # Colorized clusters image (group -1 are points not assigned to a cluster)
+    lut = np.array([(255, 255, 255)] + [colors[c][::-1] for c in range(0, n_clusters)], dtype=np.uint8)
+    clust_img = np.zeros((h, w, 3), np.uint8)
+    clust_img[x, y] = lut[labels + 1]
+
+    if return_labels:
+        clust_masks = np.zeros((h, w), np.int32)
+        clust_masks[x, y] = np.where(labels == -1, -1, labels + 1)
+    else:
+        # Create a binary mask for each cluster
+        clust_masks = [np.zeros((h, w), np.uint8) for _ in range(0, n_clusters)]
+        order = np.argsort(labels, kind="stable")
+        starts = np.searchsorted(labels[order], np.arange(0, n_clusters + 1))
+        for c in range(0, n_clusters):
+            pixels = order[starts[c]:starts[c + 1]]
+            clust_masks[c][x[pixels], y[pixels]] = 255
 
     _debug(visual=clust_img,
            filename=os.path.join(params.debug_outdir, f"{params.device}_{al_upper}_clusters.png"))
 
     return clust_img, clust_masks
+
+
+def _precluster(mask, zipped, precluster, grid_size):
+    """Reduce the pixels of a mask to fewer points to cluster.
+
+    Inputs:
+    mask       = Mask/binary image
+    zipped     = (row, column) coordinates of the white pixels of the mask
+    precluster = None (cluster every pixel), "grid", or "components"
+    grid_size  = Size of the grid cells (in pixels) for precluster="grid"
+
+    Returns:
+    points     = (row, column) coordinates of the points to cluster
+    weights    = Number of pixels of each point (None if every point is one pixel)
+    inverse    = Index of the point of each pixel (None unless precluster="grid")
+
+    :param mask: numpy.ndarray
+    :param zipped: numpy.ndarray
+    :param precluster: str
+    :param grid_size: int
+    :return points: numpy.ndarray
+    :return weights: numpy.ndarray
+    :return inverse: numpy.ndarray
+    """
+    if precluster is None:
+        return zipped, None, None
+    if precluster.upper() == "GRID":
+        # One point per grid cell, at the mean position of the pixels in the cell
+        cells, inverse, weights = np.unique(zipped // grid_size, axis=0, return_inverse=True, return_counts=True)
+        inverse = inverse.reshape(-1)
+        points = np.column_stack([np.bincount(inverse, weights=zipped[:, i]) / weights for i in range(0, 2)])
+        return points, weights, inverse
+    # The distance between two connected components is the distance between their boundaries. Each boundary pixel
+    # stands for the pixels that are closest to it
+    white = np.where(mask == 255, 255, 0).astype(np.uint8)
+    boundary = cv2.subtract(white, cv2.erode(white, np.ones((3, 3), np.uint8), borderType=cv2.BORDER_CONSTANT,
+                                             borderValue=0))
+    points = np.column_stack(np.where(boundary > 0))
+    # Labels of the nearest boundary pixel are numbered from 1 in the same (row-major) order as the points
+    _, nearest = cv2.distanceTransformWithLabels(np.where(boundary > 0, 0, 255).astype(np.uint8), cv2.DIST_L2, 5,
+                                                 labelType=cv2.DIST_LABEL_PIXEL)
+    weights = np.bincount(nearest[zipped[:, 0], zipped[:, 1]] - 1, minlength=len(points))
+    return points, weights, None
+
+
+def _pixel_labels(point_labels, points, inverse, zipped, mask, precluster):
+    """Cluster label of each white pixel of a mask from the cluster labels of the points.
+
+    Inputs:
+    point_labels = Cluster label of each point (-1 for points not assigned to a cluster)
+    points       = (row, column) coordinates of the points (from _precluster)
+    inverse      = Index of the point of each pixel (from _precluster)
+    zipped       = (row, column) coordinates of the white pixels of the mask
+    mask         = Mask/binary image
+    precluster   = None, "grid", or "components"
+
+    Returns:
+    labels       = Cluster label of each pixel
+
+    :param point_labels: numpy.ndarray
+    :param points: numpy.ndarray
+    :param inverse: numpy.ndarray
+    :param zipped: numpy.ndarray
+    :param mask: numpy.ndarray
+    :param precluster: str
+    :return labels: numpy.ndarray
+    """
+    if precluster is None:
+        return np.asarray(point_labels)
+    if precluster.upper() == "GRID":
+        return np.asarray(point_labels)[inverse]
+    # Each connected component gets the cluster of most of its boundary pixels
+    n_comps, comps = cv2.connectedComponents(np.where(mask == 255, 255, 0).astype(np.uint8), connectivity=8)
+    clustered = point_labels >= 0
+    n_labels = max(np.max(point_labels) + 1, 1)
+    votes = np.bincount(comps[points[clustered, 0], points[clustered, 1]] * n_labels + point_labels[clustered],
+                        minlength=n_comps * n_labels).reshape(n_comps, n_labels)
+    comp_labels = np.where(votes.any(axis=1), np.argmax(votes, axis=1), -1)
+    # Renumber the clusters that are left from 0
+    assigned = comp_labels >= 0
+    comp_labels[assigned] = np.unique(comp_labels[assigned], return_inverse=True)[1]
+    return comp_labels[comps[zipped[:, 0], zipped[:, 1]]]
@@ -1,6 +1,7 @@
 # Extract one of the predefined indices from a hyperspectral datacube
 
 import os
+from functools import lru_cache
 import numpy as np
 import cv2
 from plantcv.plantcv import params
@@ -11,6 +12,44 @@ from plantcv.plantcv.transform import rescale
 from plantcv.plantcv.hyperspectral import _find_closest
 
 
+# Number of image lines processed at a time when computing indices
+_TILE_LINES = 256
+
+# Index definitions: index name -> (method label, required wavelengths, formula)
+# The formula receives one band per required wavelength, in the order listed
+_indices = {
+    "ndvi": ("NDVI", (800, 670), lambda r800, r670: (r800 - r670) / (r800 + r670)),
+    "gdvi": ("GDVI", (800, 550), lambda r800, r550: r800 - r550),
+    "savi": ("SAVI", (800, 680), lambda r800, r680: (1.5 * (r800 - r680)) / (r800 + r680 + 0.5)),
+    "pri": ("PRI", (570, 531), lambda r570, r531: (r531 - r570) / (r531 + r570)),
+    "ari": ("ARI", (550, 700), lambda r550, r700: (1 / r550) - (1 / r700)),
+    "ci_rededge": ("CI_REDEDGE", (700, 800), lambda r700, r800: (r800 / r700) - 1),
+    "cri550": ("CRI510", (510, 550), lambda r510, r550: (1 / r510) - (1 / r550)),
+    "cri700": ("CRI700", (510, 700), lambda r510, r700: (1 / r510) - (1 / r700)),
+    "evi": ("EVI", (480, 670, 800),
+            lambda r480, r670, r800: (2.5 * (r800 - r670)) / (1 + r800 + (6 * r670) - (7.5 * r480))),
+    "mari": ("MARI", (550, 700, 800), lambda r550, r700, r800: ((1 / r550) - (1 / r700)) * r800),
+    "mcari": ("MCARI", (550, 670, 700),
+              lambda r550, r670, r700: ((r700 - r670) - 0.2 * (r700 - r550)) * (r700 / r670)),
+    "mtci": ("MTCI", (681.25, 708.75, 753.75), lambda r681, r708, r753: (r753 - r708) / (r708 - r681)),
+    "ndre": ("NDRE", (720, 790), lambda r720, r790: (r790 - r720) / (r790 + r720)),
+    "psnd_chla": ("PSND_CHLA", (680, 800), lambda r680, r800: (r800 - r680) / (r800 + r680)),
+    "psnd_chlb": ("PSND_CHLB", (635, 800), lambda r635, r800: (r800 - r635) / (r800 + r635)),
+    "psnd_car": ("PSND_CAR", (470, 800), lambda r470, r800: (r800 - r470) / (r800 + r470)),
+    "psri": ("PSRI", (500, 678, 750), lambda r500, r678, r750: (r678 - r500) / r750),
+    "pssr_chla": ("PSSR_CHLA", (800, 680), lambda r800, r680: r800 / r680),
+    "pssr_chlb": ("PSSR_CHLB", (800, 635), lambda r800, r635: r800 / r635),
+    "pssr_car": ("PSSR_CAR", (800, 470), lambda r800, r470: r800 / r470),
+    "rgri": ("RGRI", (670, 560), lambda r670, r560: r670 / r560),
+    "rvsi": ("RVSI", (714, 733, 752), lambda r714, r733, r752: ((r714 + r752) / 2) - r733),
+    "sipi": ("SIPI", (480, 670, 800), lambda r480, r670, r800: (r800 - r670) / (r800 - r480)),
+    "sr": ("SR", (800, 670), lambda r800, r670: r800 / r670),
+    "vari": ("VARI", (670, 550, 480), lambda r670, r550, r480: (r550 - r670) / (r550 + r670 - r480)),
+    "vi_green": ("VI_GREEN", (670, 550), lambda r670, r550: (r550 - r670) / (r550 + r670)),
+    "wi": ("WI", (900, 970), lambda r900, r970: r900 / r970)
+}
+
+
 def ndvi(hsi, distance=20):
     """Normalized Difference Vegetation Index.
 
@@ -30,17 +69,7 @@ def ndvi(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 800 and (float(hsi.min_wavelength) - distance) <= 670:
-        # Obtain index that best represents NIR and red bands
-        r800_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 800)
-        r670_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 670)
-        r800 = (hsi.array_data[:, :, r800_index])
-        r670 = (hsi.array_data[:, :, r670_index])
-        # Naturally ranges from -1 to 1
-        index_array_raw = (r800 - r670) / (r800 + r670)
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="NDVI")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating NDVI. Try increasing distance.")
+    return _single_index(hsi=hsi, index="ndvi", distance=distance)
 
 
 def gdvi(hsi, distance=20):
@@ -62,16 +91,7 @@ def gdvi(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 800 and (float(hsi.min_wavelength) - distance) <= 550:
-        r800_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 800)
-        r550_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 550)
-        r800 = (hsi.array_data[:, :, r800_index])
-        r550 = (hsi.array_data[:, :, r550_index])
-        # Naturally ranges from -1 to 1
-        index_array_raw = r800 - r550
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="GDVI")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating GDVI. Try increasing distance.")
+    return _single_index(hsi=hsi, index="gdvi", distance=distance)
 
 
 def savi(hsi, distance=20):
@@ -93,16 +113,7 @@ def savi(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 800 and (float(hsi.min_wavelength) - distance) <= 680:
-        r800_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 800)
-        r680_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 680)
-        r800 = (hsi.array_data[:, :, r800_index])
-        r680 = (hsi.array_data[:, :, r680_index])
-        # Naturally ranges from -1.2 to 1.2
-        index_array_raw = (1.5 * (r800 - r680)) / (r800 + r680 + 0.5)
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="SAVI")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating SAVI. Try increasing distance.")
+    return _single_index(hsi=hsi, index="savi", distance=distance)
 
 
 def pri(hsi, distance=20):
@@ -124,16 +135,7 @@ def pri(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 570 and (float(hsi.min_wavelength) - distance) <= 531:
-        # Obtain index that best approximates 570 and 531 nm bands
-        r570_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 570)
-        r531_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 531)
-        r570 = (hsi.array_data[:, :, r570_index])
-        r531 = (hsi.array_data[:, :, r531_index])
-        index_array_raw = (r531 - r570) / (r531 + r570)
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="PRI")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating PRI. Try increasing distance.")
+    return _single_index(hsi=hsi, index="pri", distance=distance)
 
 
 def ari(hsi, distance=20):
@@ -155,15 +157,7 @@ def ari(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 700 and (float(hsi.min_wavelength) - distance) <= 550:
-        r550_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 550)
-        r700_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 700)
-        r550 = (hsi.array_data[:, :, r550_index])
-        r700 = (hsi.array_data[:, :, r700_index])
-        index_array_raw = (1 / r550) - (1 / r700)
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="ARI")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating ARI. Try increasing distance.")
+    return _single_index(hsi=hsi, index="ari", distance=distance)
 
 
 def ci_rededge(hsi, distance=20):
@@ -185,16 +179,7 @@ def ci_rededge(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 800 and (float(hsi.min_wavelength) - distance) <= 700:
-        r700_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 700)
-        r800_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 800)
-        r700 = (hsi.array_data[:, :, r700_index])
-        r800 = (hsi.array_data[:, :, r800_index])
-        # Naturally ranges from -1 to inf
-        index_array_raw = (r800 / r700) - 1
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="CI_REDEDGE")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating CI_REDEDGE. Try increasing distance.")
+    return _single_index(hsi=hsi, index="ci_rededge", distance=distance)
 
 
 def cri550(hsi, distance=20):
@@ -216,16 +201,7 @@ def cri550(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 550 and (float(hsi.min_wavelength) - distance) <= 510:
-        r510_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 510)
-        r550_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 550)
-        r510 = (hsi.array_data[:, :, r510_index])
-        r550 = (hsi.array_data[:, :, r550_index])
-        # Naturally ranges from -inf to inf
-        index_array_raw = (1 / r510) - (1 / r550)
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="CRI510")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating CRI510. Try increasing distance.")
+    return _single_index(hsi=hsi, index="cri550", distance=distance)
 
 
 def cri700(hsi, distance=20):
@@ -247,16 +223,7 @@ def cri700(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 700 and (float(hsi.min_wavelength) - distance) <= 510:
-        r510_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 510)
-        r700_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 700)
-        r510 = (hsi.array_data[:, :, r510_index])
-        r700 = (hsi.array_data[:, :, r700_index])
-        # Naturally ranges from -inf to inf
-        index_array_raw = (1 / r510) - (1 / r700)
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="CRI700")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating CRI700. Try increasing distance.")
+    return _single_index(hsi=hsi, index="cri700", distance=distance)
 
 
 def egi(rgb_img):
@@ -315,18 +282,7 @@ def evi(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 800 and (float(hsi.min_wavelength) - distance) <= 480:
-        r480_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 480)
-        r670_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 670)
-        r800_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 800)
-        r480 = (hsi.array_data[:, :, r480_index])
-        r670 = (hsi.array_data[:, :, r670_index])
-        r800 = (hsi.array_data[:, :, r800_index])
-        # Naturally ranges from -inf to inf
-        index_array_raw = (2.5 * (r800 - r670)) / (1 + r800 + (6 * r670) - (7.5 * r480))
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="EVI")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating EVI. Try increasing distance.")
+    return _single_index(hsi=hsi, index="evi", distance=distance)
 
 
 def mari(hsi, distance=20):
@@ -348,18 +304,7 @@ def mari(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 800 and (float(hsi.min_wavelength) - distance) <= 550:
-        r550_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 550)
-        r700_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 700)
-        r800_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 800)
-        r550 = (hsi.array_data[:, :, r550_index])
-        r700 = (hsi.array_data[:, :, r700_index])
-        r800 = (hsi.array_data[:, :, r800_index])
-        # Naturally ranges from -inf to inf
-        index_array_raw = ((1 / r550) - (1 / r700)) * r800
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="MARI")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating MARI. Try increasing distance.")
+    return _single_index(hsi=hsi, index="mari", distance=distance)
 
 
 def mcari(hsi, distance=20):
@@ -381,18 +326,7 @@ def mcari(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 700 and (float(hsi.min_wavelength) - distance) <= 550:
-        r550_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 550)
-        r670_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 670)
-        r700_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 700)
-        r550 = (hsi.array_data[:, :, r550_index])
-        r670 = (hsi.array_data[:, :, r670_index])
-        r700 = (hsi.array_data[:, :, r700_index])
-        # Naturally ranges from -inf to inf
-        index_array_raw = ((r700 - r670) - 0.2 * (r700 - r550)) * (r700 / r670)
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="MCARI")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating MCARI. Try increasing distance.")
+    return _single_index(hsi=hsi, index="mcari", distance=distance)
 
 
 def mtci(hsi, distance=20):
@@ -414,18 +348,7 @@ def mtci(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 753.75 and (float(hsi.min_wavelength) - distance) <= 681.25:
-        r681_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 681.25)
-        r708_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 708.75)
-        r753_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 753.75)
-        r681 = (hsi.array_data[:, :, r681_index])
-        r708 = (hsi.array_data[:, :, r708_index])
-        r753 = (hsi.array_data[:, :, r753_index])
-        # Naturally ranges from -inf to inf
-        index_array_raw = (r753 - r708) / (r708 - r681)
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="MTCI")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating MTCI. Try increasing distance.")
+    return _single_index(hsi=hsi, index="mtci", distance=distance)
 
 
 def ndre(hsi, distance=20):
@@ -447,16 +370,7 @@ def ndre(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 790 and (float(hsi.min_wavelength) - distance) <= 720:
-        r720_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 720)
-        r790_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 790)
-        r790 = (hsi.array_data[:, :, r790_index])
-        r720 = (hsi.array_data[:, :, r720_index])
-        # Naturally ranges from -1 to 1
-        index_array_raw = (r790 - r720) / (r790 + r720)
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="NDRE")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating NDRE. Try increasing distance.")
+    return _single_index(hsi=hsi, index="ndre", distance=distance)
 
 
 def psnd_chla(hsi, distance=20):
@@ -478,16 +392,7 @@ def psnd_chla(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 800 and (float(hsi.min_wavelength) - distance) <= 680:
-        r680_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 680)
-        r800_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 800)
-        r680 = (hsi.array_data[:, :, r680_index])
-        r800 = (hsi.array_data[:, :, r800_index])
-        # Naturally ranges from -1 to 1
-        index_array_raw = (r800 - r680) / (r800 + r680)
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="PSND_CHLA")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating PSND_CHLA. Try increasing distance.")
+    return _single_index(hsi=hsi, index="psnd_chla", distance=distance)
 
 
 def psnd_chlb(hsi, distance=20):
@@ -509,16 +414,7 @@ def psnd_chlb(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 800 and (float(hsi.min_wavelength) - distance) <= 635:
-        r635_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 635)
-        r800_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 800)
-        r635 = (hsi.array_data[:, :, r635_index])
-        r800 = (hsi.array_data[:, :, r800_index])
-        # Naturally ranges from -1 to 1
-        index_array_raw = (r800 - r635) / (r800 + r635)
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="PSND_CHLB")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating PSND_CHLB. Try increasing distance.")
+    return _single_index(hsi=hsi, index="psnd_chlb", distance=distance)
 
 
 def psnd_car(hsi, distance=20):
@@ -540,16 +436,7 @@ def psnd_car(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 800 and (float(hsi.min_wavelength) - distance) <= 470:
-        r470_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 470)
-        r800_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 800)
-        r470 = (hsi.array_data[:, :, r470_index])
-        r800 = (hsi.array_data[:, :, r800_index])
-        # Naturally ranges from -1 to 1
-        index_array_raw = (r800 - r470) / (r800 + r470)
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="PSND_CAR")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating PSND_CAR. Try increasing distance.")
+    return _single_index(hsi=hsi, index="psnd_car", distance=distance)
 
 
 def psri(hsi, distance=20):
@@ -571,18 +458,7 @@ def psri(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 750 and (float(hsi.min_wavelength) - distance) <= 500:
-        r500_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 500)
-        r678_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 678)
-        r750_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 750)
-        r500 = (hsi.array_data[:, :, r500_index])
-        r678 = (hsi.array_data[:, :, r678_index])
-        r750 = (hsi.array_data[:, :, r750_index])
-        # Naturally ranges from -inf to inf
-        index_array_raw = (r678 - r500) / r750
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="PSRI")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating PSRI. Try increasing distance.")
+    return _single_index(hsi=hsi, index="psri", distance=distance)
 
 
 def pssr_chla(hsi, distance=20):
@@ -604,16 +480,7 @@ def pssr_chla(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 800 and (float(hsi.min_wavelength) - distance) <= 680:
-        r800_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 800)
-        r680_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 680)
-        r800 = (hsi.array_data[:, :, r800_index])
-        r680 = (hsi.array_data[:, :, r680_index])
-        # Naturally ranges from 0 to inf
-        index_array_raw = r800 / r680
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="PSSR_CHLA")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating PSSR_CHLA. Try increasing distance.")
+    return _single_index(hsi=hsi, index="pssr_chla", distance=distance)
 
 
 def pssr_chlb(hsi, distance=20):
@@ -635,16 +502,7 @@ def pssr_chlb(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 800 and (float(hsi.min_wavelength) - distance) <= 635:
-        r800_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 800)
-        r635_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 635)
-        r800 = (hsi.array_data[:, :, r800_index])
-        r635 = (hsi.array_data[:, :, r635_index])
-        # Naturally ranges from 0 to inf
-        index_array_raw = r800 / r635
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="PSSR_CHLB")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating PSSR_CHLB. Try increasing distance.")
+    return _single_index(hsi=hsi, index="pssr_chlb", distance=distance)
 
 
 def pssr_car(hsi, distance=20):
@@ -666,16 +524,7 @@ def pssr_car(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 800 and (float(hsi.min_wavelength) - distance) <= 470:
-        r800_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 800)
-        r470_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 470)
-        r800 = (hsi.array_data[:, :, r800_index])
-        r470 = (hsi.array_data[:, :, r470_index])
-        # Naturally ranges from 0 to inf
-        index_array_raw = r800 / r470
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="PSSR_CAR")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating PSSR_CAR. Try increasing distance.")
+    return _single_index(hsi=hsi, index="pssr_car", distance=distance)
 
 
 def rgri(hsi, distance=20):
@@ -694,16 +543,7 @@ def rgri(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 670 and (float(hsi.min_wavelength) - distance) <= 560:
-        r670_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 670)
-        r560_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 560)
-        r670 = (hsi.array_data[:, :, r670_index])
-        r560 = (hsi.array_data[:, :, r560_index])
-        # Naturally ranges from 0 to inf
-        index_array_raw = r670 / r560
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="RGRI")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating RGRI. Try increasing distance.")
+    return _single_index(hsi=hsi, index="rgri", distance=distance)
 
 
 def rvsi(hsi, distance=20):
@@ -725,18 +565,7 @@ def rvsi(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 752 and (float(hsi.min_wavelength) - distance) <= 714:
-        r714_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 714)
-        r733_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 733)
-        r752_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 752)
-        r714 = (hsi.array_data[:, :, r714_index])
-        r733 = (hsi.array_data[:, :, r733_index])
-        r752 = (hsi.array_data[:, :, r752_index])
-        # Naturally ranges from -1 to 1
-        index_array_raw = ((r714 + r752) / 2) - r733
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="RVSI")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating RVSI. Try increasing distance.")
+    return _single_index(hsi=hsi, index="rvsi", distance=distance)
 
 
 def sipi(hsi, distance=20):
@@ -758,18 +587,7 @@ def sipi(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 800 and (float(hsi.min_wavelength) - distance) <= 480:
-        r480_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 480)
-        r670_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 670)
-        r800_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 800)
-        r445 = (hsi.array_data[:, :, r480_index])
-        r670 = (hsi.array_data[:, :, r670_index])
-        r800 = (hsi.array_data[:, :, r800_index])
-        # Naturally ranges from -inf to inf
-        index_array_raw = (r800 - r670) / (r800 - r445)
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="SIPI")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating SIPI. Try increasing distance.")
+    return _single_index(hsi=hsi, index="sipi", distance=distance)
 
 
 def sr(hsi, distance=20):
@@ -791,16 +609,7 @@ def sr(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 800 and (float(hsi.min_wavelength) - distance) <= 670:
-        r670_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 670)
-        r800_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 800)
-        r670 = (hsi.array_data[:, :, r670_index])
-        r800 = (hsi.array_data[:, :, r800_index])
-        # Naturally ranges from 0 to inf
-        index_array_raw = r800 / r670
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="SR")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating SR. Try increasing distance.")
+    return _single_index(hsi=hsi, index="sr", distance=distance)
 
 
 def vari(hsi, distance=20):
@@ -822,18 +631,7 @@ def vari(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 670 and (float(hsi.min_wavelength) - distance) <= 480:
-        r670_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 670)
-        r550_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 550)
-        r480_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 480)
-        r670 = (hsi.array_data[:, :, r670_index])
-        r550 = (hsi.array_data[:, :, r550_index])
-        r480 = (hsi.array_data[:, :, r480_index])
-        # Naturally ranges from -inf to inf
-        index_array_raw = (r550 - r670) / (r550 + r670 - r480)
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="VARI")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating VARI. Try increasing distance.")
+    return _single_index(hsi=hsi, index="vari", distance=distance)
 
 
 def vi_green(hsi, distance=20):
@@ -855,16 +653,7 @@ def vi_green(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 670 and (float(hsi.min_wavelength) - distance) <= 550:
-        r670_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 670)
-        r550_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 550)
-        r670 = (hsi.array_data[:, :, r670_index])
-        r550 = (hsi.array_data[:, :, r550_index])
-        # Naturally ranges from -1 to 1
-        index_array_raw = (r550 - r670) / (r550 + r670)
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="VI_GREEN")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating VI_GREEN. Try increasing distance.")
+    return _single_index(hsi=hsi, index="vi_green", distance=distance)
 
 
 def wi(hsi, distance=20):
@@ -886,16 +675,125 @@ def wi(hsi, distance=20):
     :return index_array: __main__.Spectral_data
     """
 
-    if (float(hsi.max_wavelength) + distance) >= 970 and (float(hsi.min_wavelength) - distance) <= 900:
-        r900_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 900)
-        r970_index = _find_closest(np.array([float(i) for i in hsi.wavelength_dict.keys()]), 970)
-        r900 = (hsi.array_data[:, :, r900_index])
-        r970 = (hsi.array_data[:, :, r970_index])
-        # Naturally ranges from 0 to Inf
-        index_array_raw = r900 / r970
-        return _package_index(hsi=hsi, raw_index=index_array_raw, method="WI")
-    else:
-        fatal_error("Available wavelengths are not suitable for calculating WBI. Try increasing distance.")
+    return _single_index(hsi=hsi, index="wi", distance=distance)
+
+
+def batch(hsi, indices, distance=20):
+    """Calculate several spectral indices in a single pass over a hyperspectral datacube.
+
+    The datacube is read in blocks of lines and only the bands required by the requested indices are loaded for
+    each block, so memory-mapped datacubes are never read in full.
+
+    Inputs:
+    hsi         = hyperspectral image (PlantCV Spectral_data instance)
+    indices     = list of index names (e.g. ["ndvi", "savi", "pri"]), see the spectral_index functions
+    distance    = how lenient to be if the required wavelengths are not available
+
+    Returns:
+    index_dict  = Dictionary of index data (Spectral_data instances) keyed by index name
+
+    :param hsi: __main__.Spectral_data
+    :param indices: list
+    :param distance: int
+    :return index_dict: dict
+    """
+    raw_indices = _calc_indices(hsi=hsi, indices=indices, distance=distance)
+    index_dict = {}
+    for name in indices:
+        index_dict[name] = _package_index(hsi=hsi, raw_index=raw_indices[name], method=_indices[name][0])
+    return index_dict
+
+
+def _single_index(hsi, index, distance):
+    """Private function to calculate one predefined index.
+
+    Inputs:
+    hsi         = hyperspectral image (PlantCV Spectral_data instance)
+    index       = index name
+    distance    = how lenient to be if the required wavelengths are not available
+
+    Returns:
+    index_array = Index data as a Spectral_data instance
+
+    :param hsi: __main__.Spectral_data
+    :param index: str
+    :param distance: int
+    :return index_array: __main__.Spectral_data
+    """
+    raw_index = _calc_indices(hsi=hsi, indices=[index], distance=distance)[index]
+    return _package_index(hsi=hsi, raw_index=raw_index, method=_indices[index][0])
+
+
+def _calc_indices(hsi, indices, distance):
+    """Private function to calculate raw index arrays, processing the datacube in blocks of lines.
+
+    Inputs:
+    hsi         = hyperspectral image (PlantCV Spectral_data instance)
+    indices     = list of index names
+    distance    = how lenient to be if the required wavelengths are not available
+
+    Returns:
+    raw_indices = Dictionary of raw index arrays keyed by index name
+
+    :param hsi: __main__.Spectral_data
+    :param indices: list
+    :param distance: int
+    :return raw_indices: dict
+    """
+    # Validate every requested index before reading any data
+    for name in indices:
+        if name not in _indices:
+            fatal_error(f"{name} is not a supported spectral index. Options: {', '.join(_indices.keys())}")
+        method, wavelengths, _ = _indices[name]
+        if not ((float(hsi.max_wavelength) + distance) >= max(wavelengths) and
+                (float(hsi.min_wavelength) - distance) <= min(wavelengths)):
+            fatal_error(f"Available wavelengths are not suitable for calculating {method}. Try increasing distance.")
+
+    # Resolve the band index of every required wavelength once
+    wavelengths, bands = _sorted_wavelengths(tuple(hsi.wavelength_dict.items()))
+    band_list = []
+    band_args = {}
+    for name in indices:
+        band_args[name] = []
+        for wavelength in _indices[name][1]:
+            band = bands[_find_closest(wavelengths, wavelength)]
+            if band not in band_list:
+                band_list.append(band)
+            band_args[name].append(band_list.index(band))
+
+    lines = np.shape(hsi.array_data)[0]
+    raw_indices = {}
+    for start in range(0, lines, _TILE_LINES):
+        stop = min(start + _TILE_LINES, lines)
+        # Load only the required bands for this block of lines
+        tile = np.asarray(hsi.array_data[start:stop, :, band_list])
+        for name in indices:
+            tile_index = _indices[name][2](*[tile[:, :, i] for i in band_args[name]])
+            if name not in raw_indices:
+                raw_indices[name] = np.empty((lines,) + np.shape(tile_index)[1:], dtype=tile_index.dtype)
+            raw_indices[name][start:stop] = tile_index
+    return raw_indices
+
+
+@lru_cache(maxsize=16)
+def _sorted_wavelengths(wavelength_items):
+    """Private function to build a sorted wavelength array and the matching band indices.
+
+    Inputs:
+    wavelength_items = tuple of (wavelength, band index) pairs from a Spectral_data wavelength_dict
+
+    Returns:
+    wavelengths      = sorted wavelength array
+    bands            = band indices in the same order as wavelengths
+
+    :param wavelength_items: tuple
+    :return wavelengths: numpy.ndarray
+    :return bands: numpy.ndarray
+    """
+    wavelengths = np.array([float(wavelength) for wavelength, _ in wavelength_items])
+    bands = np.array([int(band) for _, band in wavelength_items])
+    order = np.argsort(wavelengths, kind="stable")
+    return wavelengths[order], bands[order]
 
 
 def _package_index(hsi, raw_index, method):
@@ -2,16 +2,14 @@
 
 
 import os
-import numpy as np
 from plantcv.plantcv._debug import _debug
 from plantcv.plantcv import params
-from scipy.ndimage import generic_filter
+from plantcv.plantcv.window_filter import _window_stats
 
 
 def stdev_filter(img, ksize, borders='nearest'):
     """
-    Creates a binary image from a grayscale image using skimage texture calculation for thresholding.
-    This function is quite slow.
+    Creates a grayscale image of pixelwise standard deviation calculated over a moving window.
 
     Inputs:
     gray_img       = Grayscale image data
@@ -28,11 +26,8 @@ def stdev_filter(img, ksize, borders='nearest'):
     :return output: numpy.ndarray
     """
 
-    # Make an array the same size as the original image
-    output = np.zeros(img.shape, dtype=img.dtype)
-
-    # Apply the texture function over the whole image
-    generic_filter(img, np.std, size=ksize, output=output, mode=borders)
+    # Calculate the moving window standard deviation, stored with the data type of the input image
+    output = _window_stats(img=img, ksize=ksize, stats=["stdev"], borders=borders)["stdev"].astype(img.dtype)
 
     _debug(visual=output,
            filename=os.path.join(params.debug_outdir, str(params.device) + "_variance.png"))
@@ -7,9 +7,8 @@ import numpy as np
 from matplotlib import pyplot as plt
 from plantcv.plantcv import fatal_error
 from plantcv.plantcv import params
-from skimage.feature import greycomatrix, greycoprops
-from scipy.ndimage import generic_filter
 from plantcv.plantcv._debug import _debug
+from plantcv.plantcv.window_filter import _pad_modes
 
 
 # Binary threshold
@@ -269,13 +268,12 @@ def triangle(gray_img, max_value, object_type="light", xstep=1):
 def texture(gray_img, ksize, threshold, offset=3, texture_method='dissimilarity', borders='nearest',
             max_value=255):
     """Creates a binary image from a grayscale image using skimage texture calculation for thresholding.
-    This function is quite slow.
 
     Inputs:
     gray_img       = Grayscale image data
     ksize          = Kernel size for texture measure calculation
     threshold      = Threshold value (0-255)
-    offset         = Distance offsets
+    offset         = Distance offsets (0 or larger and smaller than ksize)
     texture_method = Feature of a grey level co-occurrence matrix, either
                      'contrast', 'dissimilarity', 'homogeneity', 'ASM', 'energy',
                      or 'correlation'.For equations of different features see
@@ -297,21 +295,10 @@ def texture(gray_img, ksize, threshold, offset=3, texture_method='dissimilarity'
     :return bin_img: numpy.ndarray
     """
 
-    # Function that calculates the texture of a kernel
-    def calc_texture(inputs):
-        inputs = np.reshape(a=inputs, newshape=[ksize, ksize])
-        inputs = inputs.astype(np.uint8)
-        # Greycomatrix takes image, distance offset, angles (in radians), symmetric, and normed
-        # http://scikit-image.org/docs/dev/api/skimage.feature.html#skimage.feature.greycomatrix
-        glcm = greycomatrix(inputs, [offset], [0], 256, symmetric=True, normed=True)
-        diss = greycoprops(glcm, texture_method)[0, 0]
-        return diss
-
-    # Make an array the same size as the original image
-    output = np.zeros(gray_img.shape, dtype=gray_img.dtype)
-
-    # Apply the texture function over the whole image
-    generic_filter(gray_img, calc_texture, size=ksize, output=output, mode=borders)
+    # Calculate the texture measurement over a moving window for the whole image. Casting to the input data type
+    # matches the values stored in the output image by the per-pixel greycomatrix calculation
+    output = _glcm_props(gray_img=gray_img, ksize=ksize, offset=offset, props=[texture_method],
+                         borders=borders)[texture_method].astype(gray_img.dtype)
 
     # Threshold so higher texture measurements stand out
     bin_img = binary(gray_img=output, threshold=threshold, max_value=max_value, object_type='light')
@@ -485,6 +472,118 @@ def _call_adaptive_threshold(gray_img, max_value, adaptive_method, threshold_met
     return bin_img
 
 
+# Internal method for calculating grey level co-occurrence matrix (GLCM) properties over a moving window
+def _glcm_props(gray_img, ksize, offset, props, borders="nearest"):
+    """Calculate GLCM texture properties for the ksize x ksize window around every pixel of an image.
+
+    The results are equal to calling skimage greycomatrix(window, [offset], [0], 256, symmetric=True, normed=True)
+    and greycoprops for every window, but no matrices are built. Properties that are linear in the GLCM (contrast,
+    dissimilarity, homogeneity, correlation) are moving-window sums of per-pixel-pair values. The angular second
+    moment (the sum of squared GLCM counts) is the number of pixel-pair pairs within a window that have the same
+    grey levels, which is counted as a moving-window sum for each displacement between two pixel pairs.
+
+    Inputs:
+    gray_img = Grayscale image data (8-bit)
+    ksize    = Window size
+    offset   = Horizontal distance between the pixels of a pair
+    props    = List of GLCM properties ('contrast', 'dissimilarity', 'homogeneity', 'ASM', 'energy', 'correlation')
+    borders  = How the array borders are handled, either 'reflect', 'constant', 'nearest', 'mirror', or 'wrap'
+
+    Returns:
+    textures = Dictionary of float images, one per property
+
+    :param gray_img: numpy.ndarray
+    :param ksize: int
+    :param offset: int
+    :param props: list
+    :param borders: str
+    :return textures: dict
+    """
+    valid_props = ["contrast", "dissimilarity", "homogeneity", "ASM", "energy", "correlation"]
+    for prop in props:
+        if prop not in valid_props:
+            fatal_error(f"{prop} is not a valid texture_method. Use one of: {', '.join(valid_props)}.")
+    if offset < 0 or offset >= ksize:
+        fatal_error("The offset must be 0 or larger and smaller than the kernel size (ksize).")
+    if borders not in _pad_modes:
+        fatal_error(f"{borders} is not a valid borders option. Use one of: {', '.join(_pad_modes.keys())}.")
+
+    # Pad the image so that the window for output pixel (r, c) is padded[r:r + ksize, c:c + ksize], with the window
+    # placement of scipy.ndimage filters
+    before = ksize // 2
+    padded = np.pad(gray_img.astype(np.uint8), ((before, ksize - 1 - before), (before, ksize - 1 - before)),
+                    mode=_pad_modes[borders]).astype(np.float64)
+    # Grey levels of the first (a) and second (b) pixel of every horizontal pixel pair
+    # (with an offset of 0 every pair is a pixel with itself)
+    a = padded[:, :padded.shape[1] - offset]
+    b = padded[:, offset:]
+    # Each window contains ksize rows of pair_cols pixel pairs
+    pair_cols = ksize - offset
+    n_pairs = ksize * pair_cols
+    rows, cols = np.shape(gray_img)
+
+    def window_sum(values, height, width):
+        # Moving-window sum over height x width boxes of values, using an integral image. Sums of integer values are
+        # exact (float64 integral image for grey level products, int32 integral image for 8-bit indicators). Unlike
+        # window_filter._window_sum the boxes are not square and the pixel pairs are already padded, and OpenCV
+        # integral images are much faster than cumulative sums for the many indicator images of the ASM
+        if values.dtype == np.uint8:
+            integral = cv2.integral(values, sdepth=cv2.CV_32S)
+        else:
+            integral = cv2.integral(values, sdepth=cv2.CV_64F)
+        return (integral[height:height + rows, width:width + cols] - integral[:rows, width:width + cols] -
+                integral[height:height + rows, :cols] + integral[:rows, :cols])
+
+    textures = {}
+    diff = a - b
+    if "contrast" in props:
+        textures["contrast"] = window_sum(diff ** 2, ksize, pair_cols) / n_pairs
+    if "dissimilarity" in props:
+        textures["dissimilarity"] = window_sum(np.abs(diff), ksize, pair_cols) / n_pairs
+    if "homogeneity" in props:
+        textures["homogeneity"] = window_sum(1 / (1 + diff ** 2), ksize, pair_cols) / n_pairs
+    if "correlation" in props:
+        # The symmetric GLCM has equal row and column means and variances
+        s1 = window_sum(a + b, ksize, pair_cols)
+        s2 = window_sum(a ** 2 + b ** 2, ksize, pair_cols)
+        sab = window_sum(a * b, ksize, pair_cols)
+        var = 2 * n_pairs * s2 - s1 ** 2
+        cov = 4 * n_pairs * sab - s1 ** 2
+        # greycoprops sets the correlation to 1 for windows with a single grey level
+        correlation = np.ones(np.shape(gray_img), dtype=np.float64)
+        np.divide(cov, var, out=correlation, where=var > 0)
+        textures["correlation"] = correlation
+    if "ASM" in props or "energy" in props:
+        # With G the non-symmetric co-occurrence counts, the symmetric GLCM is G + G.T and
+        # sum((G + G.T) ** 2) = 2 * sum(G ** 2) + 2 * sum(G * G.T)
+        # sum(G ** 2) counts ordered pairs of pixel pairs (p, q) with (a_p, b_p) == (a_q, b_q) and
+        # sum(G * G.T) counts ordered pairs of pixel pairs with (a_p, b_p) == (b_q, a_q)
+        pair_code = (a * 256 + b).astype(np.uint16)
+        swap_code = (b * 256 + a).astype(np.uint16)
+        same = np.full(np.shape(gray_img), n_pairs, dtype=np.int64)
+        swapped = window_sum((a == b).astype(np.uint8), ksize, pair_cols).astype(np.int64)
+        # Both conditions are symmetric in p and q, so count each displacement q - p = (dy, dx) in one half-plane twice
+        for dy in range(0, ksize):
+            for dx in range(-pair_cols + 1, pair_cols):
+                if dy == 0 and dx <= 0:
+                    continue
+                # Pixel pairs p and q = p + (dy, dx) that are both inside the padded image
+                ph, pw = a.shape[0] - dy, a.shape[1] - abs(dx)
+                p_code = pair_code[:ph, max(0, -dx):max(0, -dx) + pw]
+                q_code = pair_code[dy:dy + ph, max(0, dx):max(0, dx) + pw]
+                q_swap = swap_code[dy:dy + ph, max(0, dx):max(0, dx) + pw]
+                # A window contains both p and q for (ksize - dy) x (pair_cols - |dx|) positions of p
+                same += 2 * window_sum((p_code == q_code).view(np.uint8), ksize - dy, pair_cols - abs(dx))
+                swapped += 2 * window_sum((p_code == q_swap).view(np.uint8), ksize - dy, pair_cols - abs(dx))
+        asm = (2 * same + 2 * swapped) / (2 * n_pairs) ** 2
+        if "ASM" in props:
+            textures["ASM"] = asm
+        if "energy" in props:
+            textures["energy"] = np.sqrt(asm)
+
+    return textures
+
+
 # Internal method for detecting peaks for the triangle autothreshold method
 def _detect_peaks(x, mph=None, mpd=1, threshold=0, edge='rising', kpsh=False, valley=False, show=False, ax=None):
     """Marcos Duarte, https://github.com/demotu/BMC; version 1.0.4; license MIT
@@ -0,0 +1,131 @@
+# Moving window statistics filters
+
+import os
+import numpy as np
+from scipy.ndimage import minimum_filter, maximum_filter
+from plantcv.plantcv._debug import _debug
+from plantcv.plantcv import params
+from plantcv.plantcv import fatal_error
+
+
+def window_filter(img, ksize, stat="mean", borders="nearest"):
+    """
+    Creates an image of a pixelwise statistic (mean, variance, standard deviation, minimum, maximum, or range)
+    calculated over a moving window.
+
+    Inputs:
+    img     = Grayscale or RGB image data
+    ksize   = Kernel size of the moving window
+    stat    = Statistic to calculate, either 'mean', 'variance', 'stdev', 'min', 'max', or 'range' (default: 'mean')
+    borders = How the array borders are handled, either 'reflect', 'constant', 'nearest', 'mirror', or 'wrap'
+
+    Returns:
+    output  = Filtered image. Mean, variance, and stdev images are float, min, max, and range images have the data type
+              of the input image
+
+    :param img: numpy.ndarray
+    :param ksize: int
+    :param stat: str
+    :param borders: str
+    :return output: numpy.ndarray
+    """
+    output = _window_stats(img=img, ksize=ksize, stats=[stat], borders=borders)[stat]
+
+    _debug(visual=output,
+           filename=os.path.join(params.debug_outdir, str(params.device) + "_window_" + stat + ".png"))
+
+    return output
+
+
+def _window_stats(img, ksize, stats, borders="nearest"):
+    """
+    Calculate moving window statistics. Means and variances are calculated from moving window sums of the image and of
+    its square (var = E[x^2] - E[x]^2), minimum and maximum with separable rank filters. Window sums of integer images
+    are exact. The window placement and border handling are the same as for scipy.ndimage.generic_filter.
+
+    Inputs:
+    img      = Grayscale or RGB image data
+    ksize    = Kernel size of the moving window
+    stats    = List of statistics ('mean', 'variance', 'stdev', 'min', 'max', 'range')
+    borders  = How the array borders are handled, either 'reflect', 'constant', 'nearest', 'mirror', or 'wrap'
+
+    Returns:
+    filtered = Dictionary of filtered images, one per statistic
+
+    :param img: numpy.ndarray
+    :param ksize: int
+    :param stats: list
+    :param borders: str
+    :return filtered: dict
+    """
+    valid_stats = ["mean", "variance", "stdev", "min", "max", "range"]
+    for stat in stats:
+        if stat not in valid_stats:
+            fatal_error(f"{stat} is not a valid stat. Use one of: {', '.join(valid_stats)}.")
+    if borders not in _pad_modes:
+        fatal_error(f"{borders} is not a valid borders option. Use one of: {', '.join(_pad_modes.keys())}.")
+
+    filtered = {}
+    if any(stat in stats for stat in ["mean", "variance", "stdev"]):
+        # Number of pixels in a window
+        n = ksize ** img.ndim
+        if np.issubdtype(img.dtype, np.integer):
+            values = img.astype(np.int64)
+        else:
+            values = img.astype(np.float64)
+        sum1 = _window_sum(values=values, ksize=ksize, borders=borders)
+        filtered["mean"] = sum1 / n
+        if "variance" in stats or "stdev" in stats:
+            sum2 = _window_sum(values=values ** 2, ksize=ksize, borders=borders)
+            # n * sum(x^2) - sum(x)^2 is exact for integer images unless it could overflow 64-bit integers
+            max_abs = float(np.amax(np.abs(values))) if values.size > 0 else 0
+            if values.dtype != np.int64 or (n * max_abs) ** 2 >= 2 ** 62:
+                sum1 = sum1.astype(np.float64)
+                sum2 = sum2.astype(np.float64)
+            # Clip small negative values from round-off of float images
+            variance = np.maximum((n * sum2 - sum1 ** 2) / n ** 2, 0)
+            filtered["variance"] = variance
+            filtered["stdev"] = np.sqrt(variance)
+    if "min" in stats or "range" in stats:
+        filtered["min"] = minimum_filter(img, size=ksize, mode=borders)
+    if "max" in stats or "range" in stats:
+        filtered["max"] = maximum_filter(img, size=ksize, mode=borders)
+    if "range" in stats:
+        filtered["range"] = filtered["max"] - filtered["min"]
+
+    return {stat: filtered[stat] for stat in stats}
+
+
+# scipy.ndimage border modes and the equivalent numpy.pad modes
+_pad_modes = {"reflect": "symmetric", "constant": "constant", "nearest": "edge", "mirror": "reflect", "wrap": "wrap"}
+
+
+def _window_sum(values, ksize, borders):
+    """
+    Moving window sum over ksize boxes along every axis, computed with padded cumulative sums.
+
+    Inputs:
+    values  = Image data
+    ksize   = Kernel size of the moving window
+    borders = How the array borders are handled, either 'reflect', 'constant', 'nearest', 'mirror', or 'wrap'
+
+    Returns:
+    sums    = Moving window sums
+
+    :param values: numpy.ndarray
+    :param ksize: int
+    :param borders: str
+    :return sums: numpy.ndarray
+    """
+    sums = values
+    before = ksize // 2
+    for axis in range(values.ndim):
+        # Pad the axis, moved to the front, with the border mode
+        moved = np.moveaxis(sums, axis, 0)
+        padded = np.pad(moved, [(before, ksize - 1 - before)] + [(0, 0)] * (values.ndim - 1),
+                        mode=_pad_modes[borders])
+        # Cumulative sum with a leading zero, window sums are differences ksize apart
+        cumsum = np.zeros((padded.shape[0] + 1,) + padded.shape[1:], dtype=padded.dtype)
+        np.cumsum(padded, axis=0, out=cumsum[1:])
+        sums = np.moveaxis(cumsum[ksize:] - cumsum[:-ksize], 0, axis)
+    return sums
@@ -8,8 +8,10 @@ import numpy as np
 import cv2
 import sys
 import pandas as pd
+import pyarrow.parquet as pq
 from plotnine import ggplot
 from plantcv import plantcv as pcv
+from plantcv.plantcv._connected_components import _ConnectedComponents
 import plantcv.learn
 import plantcv.parallel
 import plantcv.utils
@@ -20,6 +22,7 @@ import matplotlib.pyplot as plt
 import dask
 from dask.distributed import Client
 from skimage import img_as_ubyte
+from scipy.ndimage import generic_filter
 
 PARALLEL_TEST_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "parallel_data")
 TEST_TMPDIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".cache")
@@ -386,6 +389,79 @@ def test_plantcv_parallel_metadata_parser_images():
     assert meta == expected
 
 
+def test_plantcv_parallel_metadata_parser_metadata_index():
+    # Create a test tmp directory
+    cache_dir = os.path.join(TEST_TMPDIR, "test_plantcv_parallel_metadata_parser_metadata_index")
+    os.mkdir(cache_dir)
+    input_dir = os.path.join(cache_dir, "images")
+    shutil.copytree(os.path.join(PARALLEL_TEST_DATA, TEST_IMG_DIR), input_dir)
+    # Create config instance
+    config = plantcv.parallel.WorkflowConfig()
+    config.input_dir = input_dir
+    config.json = os.path.join(cache_dir, "output.json")
+    config.filename_metadata = ["imgtype", "camera", "frame", "zoom", "lifter", "gain", "exposure", "id"]
+    config.workflow = TEST_PIPELINE
+    config.metadata_filters = {"imgtype": ["VIS", "NIR"]}
+    config.imgformat = "jpg"
+    expected = plantcv.parallel.metadata_parser(config=config)
+    config.metadata_index = os.path.join(cache_dir, "metadata_index.db")
+    # The first run builds the index, the second run queries it
+    meta1 = plantcv.parallel.metadata_parser(config=config)
+    meta2 = plantcv.parallel.metadata_parser(config=config)
+    # Metadata filters are index queries
+    config.metadata_filters = {"imgtype": "VIS"}
+    meta3 = plantcv.parallel.metadata_parser(config=config)
+    assert meta1 == expected and meta2 == expected and list(meta3.keys()) == ["VIS_SV_0_z1_h1_g0_e82_117770.jpg"]
+
+
+def test_plantcv_parallel_metadata_parser_metadata_index_update():
+    # Create a test tmp directory
+    cache_dir = os.path.join(TEST_TMPDIR, "test_plantcv_parallel_metadata_parser_metadata_index_update")
+    os.mkdir(cache_dir)
+    input_dir = os.path.join(cache_dir, "images")
+    shutil.copytree(os.path.join(PARALLEL_TEST_DATA, TEST_IMG_DIR), input_dir)
+    # Create config instance
+    config = plantcv.parallel.WorkflowConfig()
+    config.input_dir = input_dir
+    config.json = os.path.join(cache_dir, "output.json")
+    config.filename_metadata = ["imgtype", "camera", "frame", "zoom", "lifter", "gain", "exposure", "id"]
+    config.workflow = TEST_PIPELINE
+    config.imgformat = "jpg"
+    config.metadata_index = os.path.join(cache_dir, "metadata_index.db")
+    _ = plantcv.parallel.metadata_parser(config=config)
+    # Add an image in a new subdirectory and remove an image
+    os.mkdir(os.path.join(input_dir, "new"))
+    shutil.copyfile(os.path.join(input_dir, "VIS_SV_0_z1_h1_g0_e82_117770.jpg"),
+                    os.path.join(input_dir, "new", "VIS_SV_90_z1_h1_g0_e82_117770.jpg"))
+    os.remove(os.path.join(input_dir, "NIR_SV_0_z1_h1_g0_e65_117779.jpg"))
+    # Make sure the modification time of the input directory changes
+    os.utime(input_dir, ns=(0, os.stat(input_dir).st_mtime_ns + 1000000000))
+    meta = plantcv.parallel.metadata_parser(config=config)
+    assert sorted(meta.keys()) == ["VIS_SV_0_z1_h1_g0_e82_117770.jpg", "VIS_SV_90_z1_h1_g0_e82_117770.jpg"] and \
+        meta["VIS_SV_90_z1_h1_g0_e82_117770.jpg"]["frame"] == "90"
+
+
+def test_plantcv_parallel_metadata_parser_snapshots_metadata_index():
+    # Create a test tmp directory
+    cache_dir = os.path.join(TEST_TMPDIR, "test_plantcv_parallel_metadata_parser_snapshots_metadata_index")
+    os.mkdir(cache_dir)
+    # Create config instance
+    config = plantcv.parallel.WorkflowConfig()
+    config.input_dir = os.path.join(PARALLEL_TEST_DATA, TEST_SNAPSHOT_DIR)
+    config.json = os.path.join(cache_dir, "output.json")
+    config.filename_metadata = ["imgtype", "camera", "frame", "zoom", "lifter", "gain", "exposure", "id"]
+    config.workflow = TEST_PIPELINE
+    config.metadata_filters = {"imgtype": "VIS", "camera": "SV"}
+    config.start_date = "2014-10-21 00:00:00.0"
+    config.end_date = "2014-10-23 00:00:00.0"
+    config.timestampformat = '%Y-%m-%d %H:%M:%S.%f'
+    config.imgformat = "jpg"
+    config.metadata_index = os.path.join(cache_dir, "metadata_index.db")
+
+    meta = plantcv.parallel.metadata_parser(config=config)
+    assert meta == METADATA_VIS_ONLY
+
+
 def test_plantcv_parallel_metadata_parser_multivalue_filter():
     # Create config instance
     config = plantcv.parallel.WorkflowConfig()
@@ -912,6 +988,78 @@ def test_plantcv_parallel_multiprocess():
     assert os.path.exists(result_file)
 
 
+def test_plantcv_parallel_multiprocess_inprocess():
+    # Create a test tmp directory
+    cache_dir = os.path.join(TEST_TMPDIR, "test_plantcv_parallel_multiprocess_inprocess")
+    os.mkdir(cache_dir)
+    image_name = list(METADATA_VIS_ONLY.keys())[0]
+    image_path = os.path.join(METADATA_VIS_ONLY[image_name]['path'], image_name)
+    result_file = os.path.join(cache_dir, image_name + '.txt')
+    jobs = [['python', TEST_PIPELINE, '--image', image_path, '--outdir', cache_dir, '--result', result_file,
+             '--writeimg', '--other', 'on']]
+    # Create a dask LocalCluster client
+    client = Client(n_workers=1)
+    plantcv.parallel.multiprocess(jobs, client=client, inprocess=True)
+    assert os.path.exists(result_file)
+
+
+def test_plantcv_parallel_multiprocess_callback():
+    # Create a test tmp directory
+    cache_dir = os.path.join(TEST_TMPDIR, "test_plantcv_parallel_multiprocess_callback")
+    os.mkdir(cache_dir)
+    image_name = list(METADATA_VIS_ONLY.keys())[0]
+    image_path = os.path.join(METADATA_VIS_ONLY[image_name]['path'], image_name)
+    result_file = os.path.join(cache_dir, image_name + '.txt')
+    jobs = [['python', TEST_PIPELINE, '--image', image_path, '--outdir', cache_dir, '--result', result_file,
+             '--writeimg', '--other', 'on'],
+            ['python', os.path.join(cache_dir, "missing.py")]]
+    finished = []
+    # Create a dask LocalCluster client
+    client = Client(n_workers=1)
+    plantcv.parallel.multiprocess(jobs, client=client, callback=lambda job, success: finished.append((job, success)))
+    assert sorted([success for job, success in finished]) == [False, True]
+
+
+def test_plantcv_parallel_multiprocess_batch_size():
+    jobs = [['python', '-c', f'import sys; sys.exit({i % 2})'] for i in range(5)]
+    finished = []
+    # Create a dask LocalCluster client
+    client = Client(n_workers=1)
+    plantcv.parallel.multiprocess(jobs, client=client, callback=lambda job, success: finished.append((job, success)),
+                                  batch_size=2)
+    assert sorted(finished) == sorted([(job, i % 2 == 0) for i, job in enumerate(jobs)])
+
+
+def test_plantcv_parallel_run_manifest():
+    # Create a test tmp directory
+    cache_dir = os.path.join(TEST_TMPDIR, "test_plantcv_parallel_run_manifest")
+    os.mkdir(cache_dir)
+    config = plantcv.parallel.WorkflowConfig()
+    config.json = os.path.join(cache_dir, "output.json")
+    config.workflow = TEST_PIPELINE
+    config.tmp_dir = cache_dir
+    # Results the run appends to
+    shutil.copyfile(os.path.join(PARALLEL_TEST_DATA, "valid.json"), config.json)
+    manifest = plantcv.parallel.RunManifest(config=config)
+    meta = manifest.pending(meta=METADATA_VIS_ONLY)
+    image_path = list(meta.values())[0]["path"]
+    manifest.record(job=["python", TEST_PIPELINE, "--image", image_path], success=True)
+    manifest.close()
+    # A restarted run skips the processed image and keeps the results the run started from
+    os.remove(config.json)
+    manifest = plantcv.parallel.RunManifest(config=config)
+    resumed = manifest.pending(meta=METADATA_VIS_ONLY)
+    manifest.restore_base(json_file=config.json)
+    manifest.close()
+    # A different workflow starts a new run
+    config.other_args = ["--other", "on"]
+    manifest = plantcv.parallel.RunManifest(config=config)
+    changed = manifest.pending(meta=METADATA_VIS_ONLY)
+    manifest.close()
+    assert manifest.new_run and len(meta) == 1 and len(resumed) == 0 and len(changed) == 1
+    assert os.path.exists(config.json) and os.path.isdir(os.path.join(cache_dir, "output.json.run", "jobs"))
+
+
 def test_plantcv_parallel_process_results():
     # Create a test tmp directory
     cache_dir = os.path.join(TEST_TMPDIR, "test_plantcv_parallel_process_results")
@@ -946,6 +1094,135 @@ def test_plantcv_parallel_process_results_new_output():
     assert results == expected
 
 
+def test_plantcv_parallel_process_results_workers():
+    # Create a test tmp directory
+    cache_dir = os.path.join(TEST_TMPDIR, "test_plantcv_parallel_process_results_workers")
+    os.mkdir(cache_dir)
+    plantcv.parallel.process_results(job_dir=os.path.join(PARALLEL_TEST_DATA, "results"),
+                                     json_file=os.path.join(cache_dir, 'appended_results.json'), workers=2)
+    plantcv.parallel.process_results(job_dir=os.path.join(PARALLEL_TEST_DATA, "results"),
+                                     json_file=os.path.join(cache_dir, 'appended_results.json'), workers=2)
+    # Assert that the output JSON file matches the expected output JSON file
+    with open(os.path.join(cache_dir, "appended_results.json"), "r") as result_file:
+        results = json.load(result_file)
+    with open(os.path.join(PARALLEL_TEST_DATA, "appended_results.json"), "r") as expected_file:
+        expected = json.load(expected_file)
+    assert results == expected and not os.path.exists(os.path.join(cache_dir, 'appended_results.json.tmp'))
+
+
+def test_plantcv_parallel_process_results_existing_file_format(tmpdir):
+    # Create a test tmp directory
+    cache_dir = tmpdir.mkdir("sub")
+    with open(os.path.join(PARALLEL_TEST_DATA, "new_result.json"), "r") as fp:
+        existing = json.load(fp)
+    # Existing entities are copied whatever the formatting and key order of the file
+    json_file = os.path.join(cache_dir, "appended_results.json")
+    with open(json_file, "w") as fp:
+        json.dump({"variables": existing["variables"], "entities": existing["entities"]}, fp, indent=4)
+    plantcv.parallel.process_results(job_dir=os.path.join(PARALLEL_TEST_DATA, "results"), json_file=json_file)
+    with open(json_file, "r") as result_file:
+        results = json.load(result_file)
+    with open(os.path.join(PARALLEL_TEST_DATA, "appended_results.json"), "r") as expected_file:
+        expected = json.load(expected_file)
+    assert results == expected
+
+
+def test_plantcv_parallel_process_results_profile(tmpdir):
+    # Create a test tmp directory
+    cache_dir = tmpdir.mkdir("sub")
+    job_dir = os.path.join(cache_dir, "results")
+    shutil.copytree(os.path.join(PARALLEL_TEST_DATA, "results"), job_dir)
+    results_files = sorted(os.listdir(job_dir))
+    for i, results_file in enumerate(results_files):
+        profile = [{"function": "find_objects", "device": 1, "wall_time": 1.0, "cpu_time": 0.5, "peak_memory": 10 * i},
+                   {"function": "analyze_object", "device": 2, "wall_time": 3.0, "cpu_time": 2.5, "peak_memory": 0}]
+        with open(os.path.join(job_dir, results_file + ".profile.json"), "w") as fp:
+            json.dump(profile, fp)
+    plantcv.parallel.process_results(job_dir=job_dir, json_file=os.path.join(cache_dir, 'new_result.json'))
+    # The profiles are not parsed as results files
+    with open(os.path.join(cache_dir, "new_result.json"), "r") as result_file:
+        results = json.load(result_file)
+    with open(os.path.join(PARALLEL_TEST_DATA, "new_result.json"), "r") as expected_file:
+        expected = json.load(expected_file)
+    with open(os.path.join(cache_dir, "new_result_profile.csv"), "r") as report_file:
+        header = report_file.readline().rstrip().split(",")
+        report = [dict(zip(header, line.rstrip().split(","))) for line in report_file]
+    n = len(results_files)
+    assert results == expected
+    assert [row["function"] for row in report] == ["analyze_object", "find_objects"]
+    assert int(report[1]["calls"]) == n and float(report[1]["wall_time_total"]) == n
+    assert float(report[0]["wall_time_percent"]) == 75 and int(report[1]["peak_memory_max"]) == 10 * (n - 1)
+
+
+def test_plantcv_parallel_process_results_parquet():
+    # Create a test tmp directory
+    cache_dir = os.path.join(TEST_TMPDIR, "test_plantcv_parallel_process_results_parquet")
+    os.mkdir(cache_dir)
+    plantcv.parallel.process_results(job_dir=os.path.join(PARALLEL_TEST_DATA, "results"),
+                                     json_file=os.path.join(cache_dir, 'appended_results.parquet'))
+    plantcv.parallel.process_results(job_dir=os.path.join(PARALLEL_TEST_DATA, "results"),
+                                     json_file=os.path.join(cache_dir, 'appended_results.parquet'))
+    results = pq.read_table(os.path.join(cache_dir, 'appended_results.parquet')).to_pandas()
+    assert list(results["trait"]) == ["test", "test"] and list(results["value_text"]) == ["test", "test"] and \
+        list(results["plantbarcode"]) == ["Ca031AA010564", "Ca031AA010564"]
+
+
+def test_plantcv_parallel_process_results_parquet_results_files():
+    # Create a test tmp directory
+    cache_dir = os.path.join(TEST_TMPDIR, "test_plantcv_parallel_process_results_parquet_results_files")
+    os.mkdir(cache_dir)
+    job_dir = os.path.join(cache_dir, "results")
+    shutil.copytree(os.path.join(PARALLEL_TEST_DATA, "results"), job_dir)
+    # Save a per-image Parquet results file that keeps the metadata of the JSON results file
+    result_file = os.path.join(job_dir, "VIS_SV_0_z1_h1_g0_e82_117770.jpg.txt")
+    outputs = pcv.Outputs()
+    outputs.add_observation(sample='default', variable='area', trait='area', method='test', scale='pixels',
+                            datatype=int, value=100, label="pixels")
+    outputs.add_observation(sample='default', variable='hist', trait='histogram', method='test', scale='none',
+                            datatype=list, value=[1, 2, 3], label=[0, 1, 2])
+    outputs.save_results(filename=result_file, outformat="parquet")
+    plantcv.parallel.process_results(job_dir=job_dir, json_file=os.path.join(cache_dir, 'results.parquet'),
+                                     workers=2)
+    results = pq.read_table(os.path.join(cache_dir, 'results.parquet')).to_pandas()
+    assert list(results["trait"]) == ["area", "hist"] and results["value"][0] == 100 and \
+        list(results["value_list"][1]) == [1, 2, 3] and list(results["label_list"][1]) == ["0", "1", "2"] and \
+        results["plantbarcode"][0] == "Ca031AA010564"
+
+
+def test_plantcv_parallel_process_results_parquet_row_groups():
+    # Create a test tmp directory
+    cache_dir = os.path.join(TEST_TMPDIR, "test_plantcv_parallel_process_results_parquet_row_groups")
+    os.mkdir(cache_dir)
+    job_dir = os.path.join(cache_dir, "results")
+    os.mkdir(job_dir)
+    outputs = pcv.Outputs()
+    outputs.add_observation(sample='default', variable='area', trait='area', method='test', scale='pixels',
+                            datatype=int, value=100, label="pixels")
+    for i in range(50):
+        outputs.save_results(filename=os.path.join(job_dir, f"result{i}.txt"), outformat="parquet")
+    out = os.path.join(cache_dir, 'results.parquet')
+    plantcv.parallel.process_results(job_dir=job_dir, json_file=out)
+    # Append to the existing file
+    plantcv.parallel.process_results(job_dir=job_dir, json_file=out)
+    parquet_file = pq.ParquetFile(out)
+    assert parquet_file.metadata.num_rows == 100 and parquet_file.num_row_groups == 1
+
+
+def test_plantcv_parallel_process_results_parquet_to_json():
+    # Create a test tmp directory
+    cache_dir = os.path.join(TEST_TMPDIR, "test_plantcv_parallel_process_results_parquet_to_json")
+    os.mkdir(cache_dir)
+    job_dir = os.path.join(cache_dir, "results")
+    os.mkdir(job_dir)
+    outputs = pcv.Outputs()
+    outputs.add_observation(sample='default', variable='area', trait='area', method='test', scale='pixels',
+                            datatype=int, value=100, label="pixels")
+    outputs.save_results(filename=os.path.join(job_dir, "result.txt"), outformat="parquet")
+    # Parquet results files cannot be combined into a JSON file
+    with pytest.raises(RuntimeError):
+        plantcv.parallel.process_results(job_dir=job_dir, json_file=os.path.join(cache_dir, 'results.json'))
+
+
 def test_plantcv_parallel_process_results_valid_json():
     # Test when the file is a valid json file but doesn't contain expected keys
     with pytest.raises(RuntimeError):
@@ -1095,6 +1372,56 @@ def test_plantcv_debug(debug, tmpdir):
     assert True
 
 
+def test_plantcv_debug_lazy_visual():
+    from plantcv.plantcv._debug import _debug
+    calls = []
+    collector = pcv.DebugCollector()
+    # The visual is not made when debug is off
+    pcv.params.debug = None
+    _debug(visual=lambda: calls.append(1), filename="off.png")
+    pcv.params.debug = collector
+    _debug(visual=lambda: np.ones((2, 2), dtype=np.uint8), filename="on.png")
+    pcv.params.debug = None
+    assert calls == [] and len(collector.visuals) == 1
+    assert collector.visuals[0][0] == "on.png" and np.sum(collector.visuals[0][1]) == 4
+
+
+def test_plantcv_debug_collector():
+    collector = pcv.DebugCollector()
+    pcv.params.debug = collector
+    mask = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_BINARY), -1)
+    cropped = pcv.crop(img=mask, x=10, y=10, h=50, w=60)
+    pcv.params.debug = None
+    filename, visual = collector.visuals[0]
+    collector.clear()
+    assert filename.endswith("_crop.png") and visual.shape == mask.shape and cropped.shape == (50, 60)
+    assert collector.visuals == []
+
+
+def test_plantcv_debug_writer(tmpdir):
+    # Create a test tmp directory
+    img_outdir = tmpdir.mkdir("sub")
+    writer = pcv.DebugWriter(threads=2)
+    pcv.params.debug = writer
+    pcv.params.debug_outdir = str(img_outdir)
+    mask = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_BINARY), -1)
+    for _ in range(4):
+        _ = pcv.fill(bin_img=mask, size=10)
+    pcv.params.debug = None
+    pcv.params.debug_outdir = "."
+    writer.flush()
+    assert len(os.listdir(img_outdir)) == 4
+
+
+def test_plantcv_debug_writer_bad_filename(tmpdir):
+    # Create a test tmp directory
+    img_outdir = tmpdir.mkdir("sub")
+    writer = pcv.DebugWriter()
+    writer(visual=np.zeros((2, 2), dtype=np.uint8), filename=os.path.join(img_outdir, "image.bad"))
+    with pytest.raises(RuntimeError):
+        writer.flush()
+
+
 @pytest.mark.parametrize("datatype,value", [[list, []], [int, 2], [float, 2.2], [bool, True], [str, "2"], [dict, {}],
                                             [tuple, ()], [None, None]])
 def test_plantcv_outputs_add_observation(datatype, value):
@@ -1142,6 +1469,52 @@ def test_plantcv_outputs_save_results_json_existing_file(tmpdir):
         assert results["observations"]["default"]["test"]["value"] == "test"
 
 
+def test_plantcv_outputs_save_results_parquet(tmpdir):
+    # Create a test tmp directory
+    cache_dir = tmpdir.mkdir("sub")
+    outfile = os.path.join(cache_dir, "results.parquet")
+    # Create output instance
+    outputs = pcv.Outputs()
+    outputs.add_observation(sample='default', variable='string', trait='string variable', method='string', scale='none',
+                            datatype=str, value="string", label="none")
+    outputs.add_observation(sample='default', variable='boolean', trait='boolean variable', method='boolean',
+                            scale='none', datatype=bool, value=True, label="none")
+    outputs.add_observation(sample='default', variable='list', trait='list variable', method='list',
+                            scale='none', datatype=list, value=[1, 2, 3], label=[1, 2, 3])
+    outputs.add_observation(sample='default', variable='tuple_list', trait='list of tuples variable',
+                            method='tuple_list', scale='none', datatype=list, value=[(1, 2), (3, 4)], label=[1, 2])
+    outputs.save_results(filename=outfile, outformat="parquet")
+    results = pq.read_table(outfile).to_pandas()
+    assert list(results["trait"]) == ["string", "boolean", "list", "tuple_list"] and \
+        results["value_text"][0] == "string" and results["value"][1] == 1 and \
+        list(results["value_list"][2]) == [1, 2, 3] and results["value_text"][3] == "[[1, 2], [3, 4]]"
+
+
+def test_plantcv_params_profile(tmpdir):
+    # Create a test tmp directory
+    cache_dir = tmpdir.mkdir("sub")
+    outfile = os.path.join(cache_dir, "results.json")
+    pcv.params.debug = None
+    pcv.outputs.clear()
+    mask = np.zeros((100, 100), dtype=np.uint8)
+    mask[20:80, 30:70] = 255
+    # Calls are not profiled by default
+    _ = pcv.fill(bin_img=mask, size=10)
+    assert pcv.outputs.profile == []
+    pcv.params.profile = True
+    _ = pcv.fill(bin_img=mask, size=10)
+    skeleton = pcv.morphology.skeletonize(mask=mask)
+    pcv.params.profile = False
+    pcv.outputs.save_results(filename=outfile)
+    with open(outfile + ".profile.json", "r") as fp:
+        profile = json.load(fp)
+    pcv.outputs.clear()
+    assert [call["function"] for call in profile] == ["fill", "morphology.skeletonize"]
+    assert all([call["wall_time"] >= 0 and call["cpu_time"] >= 0 for call in profile])
+    # Memory allocated by fill includes at least one copy of the mask
+    assert profile[0]["peak_memory"] >= mask.size and np.sum(skeleton) > 0
+
+
 def test_plantcv_outputs_save_results_csv(tmpdir):
     # Create a test tmp directory
     cache_dir = tmpdir.mkdir("sub")
@@ -1187,6 +1560,19 @@ def test_plantcv_acute():
     assert all([i == j] for i, j in zip(np.shape(homology_pts), (29, 1, 2)))
 
 
+def test_plantcv_acute_batch():
+    pcv.params.debug = None
+    mask = cv2.imread(os.path.join(TEST_DATA, TEST_MASK_SMALL), -1)
+    contours_npz = np.load(os.path.join(TEST_DATA, TEST_VIS_COMP_CONTOUR), encoding="latin1")
+    obj_contour = contours_npz['arr_0']
+    objects = [obj_contour, obj_contour[::-1], np.array(([[213, 190]], [[83, 61]], [[149, 246]]))]
+    homolog_pts, _, _, _, chain, _ = pcv.acute(obj=objects, win=5, thresh=15, mask=mask)
+    # Batch results are the same as the results of each contour
+    single = [pcv.acute(obj=obj, win=5, thresh=15, mask=mask) for obj in objects]
+    assert len(chain) == 3 and all([chain[i] == single[i][4] for i in range(3)]) and \
+        all([np.array_equal(homolog_pts[i], single[i][0]) for i in range(3)])
+
+
 def test_plantcv_acute_vertex():
     # Read in test data
     img = cv2.imread(os.path.join(TEST_DATA, TEST_VIS_SMALL))
@@ -1358,6 +1744,34 @@ def test_plantcv_analyze_color():
     assert pcv.outputs.observations['default']['hue_median']['value'] == 84.0
 
 
+def test_plantcv_analyze_color_frequencies():
+    # Clear previous outputs
+    pcv.outputs.clear()
+    pcv.params.debug = None
+    # Read in test data
+    img = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_COLOR))
+    mask = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_BINARY), -1)
+    _ = pcv.analyze_color(rgb_img=img, mask=mask, colorspaces="all")
+    # Compare to masked histograms of the full colorspace conversions
+    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+    lab = cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
+    hue_hist = np.histogram(hsv[:, :, 0][mask > 0], 256, (0, 255))[0] / np.count_nonzero(mask) * 100
+    a_hist = np.histogram(lab[:, :, 1][mask > 0], 256, (0, 255))[0] / np.count_nonzero(mask) * 100
+    assert np.allclose(pcv.outputs.observations['default']['hue_frequencies']['value'], hue_hist[0:180]) and \
+        np.allclose(pcv.outputs.observations['default']['green-magenta_frequencies']['value'], a_hist)
+
+
+def test_plantcv_analyze_color_empty_mask():
+    # Clear previous outputs
+    pcv.outputs.clear()
+    pcv.params.debug = None
+    # Read in test data
+    img = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_COLOR))
+    mask = np.zeros(np.shape(img)[:2], dtype=np.uint8)
+    _ = pcv.analyze_color(rgb_img=img, mask=mask, colorspaces="rgb")
+    assert len(pcv.outputs.observations['default']['blue_frequencies']['value']) == 256
+
+
 def test_plantcv_analyze_color_incorrect_image():
     img_binary = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_BINARY), -1)
     mask = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_BINARY), -1)
@@ -1504,6 +1918,52 @@ def test_plantcv_analyze_object_small_contour():
     assert obj_images is None
 
 
+def test_plantcv_analyze_object_longest_path():
+    # Clear previous outputs
+    pcv.outputs.clear()
+    pcv.params.debug = None
+    # The longest path of a rectangle is a diagonal of its convex hull
+    img = np.zeros((100, 100), dtype=np.uint8)
+    mask = np.copy(img)
+    mask[40:50, 30:70] = 255
+    objects, hierarchy = pcv.find_objects(img=img, mask=mask)
+    obj, mask = pcv.object_composition(img=img, contours=objects, hierarchy=hierarchy)
+    _ = pcv.analyze_object(img=img, obj=obj, mask=mask)
+    longest_path = pcv.outputs.observations["default"]["longest_path"]
+    pcv.outputs.clear()
+    assert np.isclose(longest_path["value"], np.sqrt(39 ** 2 + 9 ** 2))
+    assert longest_path["datatype"] == "<class 'float'>"
+
+
+def test_plantcv_analyze_tray():
+    # Test cache directory
+    cache_dir = os.path.join(TEST_TMPDIR, "test_plantcv_analyze_tray")
+    os.mkdir(cache_dir)
+    pcv.params.debug_outdir = cache_dir
+    # Create a test tray with plants in the first and last ROIs and a plant that overlaps two ROIs
+    img = np.zeros((100, 200, 3), dtype=np.uint8)
+    img[:, :, 1] = 100
+    mask = np.zeros((100, 200), dtype=np.uint8)
+    mask[20:30, 20:30] = 255
+    mask[60:75, 160:170] = 255
+    mask[66:70, 140:160] = 255
+    rois, roi_hierarchies = pcv.roi.multi(img=img, coord=(25, 25), radius=20, spacing=(50, 50), nrows=2, ncols=4)
+    pcv.outputs.clear()
+    # Test with debug = "print"
+    pcv.params.debug = "print"
+    _ = pcv.analyze_tray(img=img, mask=mask, roi_contour=rois, roi_hierarchy=roi_hierarchies)
+    # Test with debug = None
+    pcv.params.debug = None
+    analysis_image, plant_labels = pcv.analyze_tray(img=img, mask=mask, roi_contour=rois,
+                                                    roi_hierarchy=roi_hierarchies, label="pot")
+    areas = [pcv.outputs.observations[f"pot_{i}"]["area"]["value"] for i in range(1, 9)]
+    green = pcv.outputs.observations["pot_1"]["green_mean"]["value"]
+    longest_path = pcv.outputs.observations["pot_1"]["longest_path"]["value"]
+    pcv.outputs.clear()
+    assert areas == [100, 0, 0, 0, 0, 0, 0, 230] and green == 100 and np.count_nonzero(plant_labels == 8) == 230
+    assert np.isclose(longest_path, np.sqrt(2 * 9 ** 2))
+
+
 def test_plantcv_analyze_thermal_values():
     # Clear previous outputs
     pcv.outputs.clear()
@@ -1818,6 +2278,28 @@ def test_plantcv_color_palette_saved():
     assert colors == [[0, 0, 0], [255, 255, 255]]
 
 
+def test_plantcv_connected_components():
+    # Two components, the first one with a hole, and a third one touching the image border
+    mask = np.zeros((50, 60), dtype=np.uint8)
+    mask[5:25, 5:25] = 255
+    mask[10:15, 10:15] = 0
+    mask[30:40, 40:55] = 255
+    mask[45:50, 0:10] = 255
+    components = _ConnectedComponents(mask=mask)
+    objects, _ = cv2.findContours(np.copy(mask), cv2.RETR_TREE, cv2.CHAIN_APPROX_NONE)[-2:]
+    contours, hierarchy = components.contours(labels=1)
+    plants, _ = components.contours(labels=[2, 3])
+    assert components.n == 3 and list(components.areas[1:]) == [375, 150, 50]
+    assert len(contours) == 2 and np.shape(hierarchy) == (1, 2, 4)
+    assert sum([np.array_equal(cnt, obj) for cnt in contours + plants for obj in objects]) == 4
+    assert components.contours(labels=[1])[0] is contours
+
+
+def test_plantcv_connected_components_bad_input():
+    with pytest.raises(RuntimeError):
+        _ = _ConnectedComponents(mask=np.zeros((10, 10, 3), dtype=np.uint8))
+
+
 def test_plantcv_crop():
     # Test cache directory
     cache_dir = os.path.join(TEST_TMPDIR, "test_plantcv_crop")
@@ -2411,6 +2893,18 @@ def test_plantcv_naive_bayes_classifier():
         assert 0
 
 
+def test_plantcv_naive_bayes_classifier_cached_pdfs():
+    from plantcv.plantcv.naive_bayes_classifier import _pdf_cache
+    # Read in test data
+    img = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_COLOR))
+    pdf_file = os.path.join(TEST_DATA, TEST_PDFS)
+    pcv.params.debug = None
+    masks1 = pcv.naive_bayes_classifier(rgb_img=img, pdf_file=pdf_file)
+    masks2 = pcv.naive_bayes_classifier(rgb_img=img, pdf_file=pdf_file)
+    # Assert that the parsed PDFs were cached and the cached PDFs give the same masks
+    assert os.path.abspath(pdf_file) in _pdf_cache and all([np.array_equal(masks1[c], masks2[c]) for c in masks1])
+
+
 def test_plantcv_naive_bayes_classifier_bad_input():
     # Read in test data
     img = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_COLOR))
@@ -2590,6 +3084,58 @@ def test_plantcv_print_image():
     assert os.path.exists(filename) is True
 
 
+def test_plantcv_print_image_writers(tmpdir):
+    # Create a test tmp directory
+    cache_dir = tmpdir.mkdir("sub")
+    img = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_COLOR))
+    pcv.params.image_writers = 2
+    for i in range(6):
+        pcv.print_image(img=img, filename=os.path.join(cache_dir, f"image_{i}.png"))
+    pcv.flush_images()
+    pcv.params.image_writers = 0
+    written = cv2.imread(os.path.join(cache_dir, "image_5.png"))
+    assert len(os.listdir(cache_dir)) == 6 and np.array_equal(written, img)
+
+
+def test_plantcv_print_image_writers_error(tmpdir):
+    # Create a test tmp directory
+    cache_dir = tmpdir.mkdir("sub")
+    img = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_COLOR))
+    pcv.params.image_writers = 1
+    pcv.print_image(img=img, filename=os.path.join(cache_dir, "missing_dir", "image.png"))
+    pcv.params.image_writers = 0
+    with pytest.raises(RuntimeError):
+        pcv.flush_images()
+
+
+@pytest.mark.parametrize("image_format,png_compression,image_quality,extension", [[None, 0, None, ".png"],
+                                                                                  ["jpg", None, 50, ".jpg"],
+                                                                                  ["webp", None, 50, ".webp"]])
+def test_plantcv_print_image_format(image_format, png_compression, image_quality, extension, tmpdir):
+    # Create a test tmp directory
+    cache_dir = tmpdir.mkdir("sub")
+    img = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_COLOR))
+    pcv.params.image_format = image_format
+    pcv.params.png_compression = png_compression
+    pcv.params.image_quality = image_quality
+    pcv.print_image(img=img, filename=os.path.join(cache_dir, "image.png"))
+    pcv.params.image_format = None
+    pcv.params.png_compression = None
+    pcv.params.image_quality = None
+    written = cv2.imread(os.path.join(cache_dir, "image" + extension))
+    assert os.listdir(cache_dir) == ["image" + extension] and written.shape == img.shape
+
+
+def test_plantcv_print_image_bad_format(tmpdir):
+    # Create a test tmp directory
+    cache_dir = tmpdir.mkdir("sub")
+    img = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_COLOR))
+    pcv.params.image_format = "gif"
+    with pytest.raises(RuntimeError):
+        pcv.print_image(img=img, filename=os.path.join(cache_dir, "image.png"))
+    pcv.params.image_format = None
+
+
 def test_plantcv_print_image_bad_type():
     with pytest.raises(RuntimeError):
         pcv.print_image(img=[], filename="/dev/null")
@@ -2958,6 +3504,31 @@ def test_plantcv_roi_objects_bad_input():
                             object_contour=object_contours, obj_hierarchy=object_hierarchy)
 
 
+def test_plantcv_roi_objects_multi():
+    # Read in test data
+    img = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_COLOR))
+    object_contours_npz = np.load(os.path.join(TEST_DATA, TEST_INPUT_OBJECT_CONTOURS), encoding="latin1")
+    object_contours = [object_contours_npz[arr_n] for arr_n in object_contours_npz]
+    object_hierarchy_npz = np.load(os.path.join(TEST_DATA, TEST_INPUT_OBJECT_HIERARCHY), encoding="latin1")
+    object_hierarchy = object_hierarchy_npz['arr_0']
+    pcv.params.debug = None
+    roi_contours, roi_hierarchies = pcv.roi.multi(img=img, coord=(1100, 1100), radius=100, spacing=(150, 150),
+                                                  nrows=3, ncols=3)
+    kept_contours, kept_hierarchies, mask, areas = pcv.roi_objects(img=img, roi_contour=roi_contours,
+                                                                   roi_hierarchy=roi_hierarchies,
+                                                                   object_contour=object_contours,
+                                                                   obj_hierarchy=object_hierarchy, roi_type="partial")
+    # Each ROI gives the same result as filtering with that ROI alone
+    union = np.zeros(np.shape(img)[:2], dtype=np.uint8)
+    for i, (roi_contour, roi_hierarchy) in enumerate(zip(roi_contours, roi_hierarchies)):
+        kept, _, roi_mask, area = pcv.roi_objects(img=img, roi_contour=roi_contour, roi_hierarchy=roi_hierarchy,
+                                                  object_contour=object_contours, obj_hierarchy=object_hierarchy,
+                                                  roi_type="partial")
+        assert len(kept_contours[i]) == len(kept) and areas[i] == area
+        union = cv2.bitwise_or(union, roi_mask)
+    assert len(areas) == 9 and np.sum(areas) > 0 and np.array_equal(mask, union)
+
+
 def test_plantcv_roi_objects_grayscale_input():
     # Test cache directory
     cache_dir = os.path.join(TEST_TMPDIR, "test_plantcv_roi_objects_grayscale_input")
@@ -3113,6 +3684,33 @@ def test_plantcv_stdev_filter():
     assert (np.shape(filter_img) == np.shape(img))
 
 
+def test_plantcv_window_filter():
+    # Test cache directory
+    cache_dir = os.path.join(TEST_TMPDIR, "test_plantcv_window_filter")
+    os.mkdir(cache_dir)
+    pcv.params.debug_outdir = cache_dir
+    # Read in test data
+    img = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_GRAY_SMALL), -1)
+    # Test with debug = "print"
+    pcv.params.debug = "print"
+    _ = pcv.window_filter(img=img, ksize=5, stat="mean")
+    # Test with debug = None
+    pcv.params.debug = None
+    stdev_img = pcv.window_filter(img=img, ksize=5, stat="stdev", borders="reflect")
+    range_img = pcv.window_filter(img=img, ksize=5, stat="range", borders="reflect")
+    # Assert that the moving window statistics match a direct per-pixel calculation
+    expected_stdev = generic_filter(img.astype(np.float64), np.std, size=5, mode="reflect")
+    expected_range = generic_filter(img, np.ptp, size=5, mode="reflect")
+    assert np.allclose(stdev_img, expected_stdev) and np.array_equal(range_img, expected_range)
+
+
+def test_plantcv_window_filter_bad_stat():
+    img = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_GRAY_SMALL), -1)
+    pcv.params.debug = None
+    with pytest.raises(RuntimeError):
+        _ = pcv.window_filter(img=img, ksize=5, stat="median")
+
+
 def test_plantcv_watershed_segmentation():
     # Clear previous outputs
     pcv.outputs.clear()
@@ -3360,11 +3958,36 @@ def test_plantcv_spatial_clustering(alg, min_size, max_size):
     assert len(spmask[1]) == 2
 
 
+@pytest.mark.parametrize("alg, min_size, max_size, precluster, grid_size", [['DBSCAN', 10, None, "grid", 1],
+                                                                            ['DBSCAN', 10, None, "components", 4]]
+                         )
+def test_plantcv_spatial_clustering_precluster(alg, min_size, max_size, precluster, grid_size):
+    img = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_MULTI_MASK), -1)
+    pcv.params.debug = None
+    _, clust_masks = pcv.spatial_clustering(img, algorithm=alg, min_cluster_size=min_size, max_distance=max_size,
+                                            precluster=precluster, grid_size=grid_size)
+    _, labels = pcv.spatial_clustering(img, algorithm=alg, min_cluster_size=min_size, max_distance=max_size,
+                                       precluster=precluster, grid_size=grid_size, return_labels=True)
+    assert len(clust_masks) == 2 and np.max(labels) == 2 and np.array_equal(clust_masks[1] > 0, labels == 2)
+
+
+def test_plantcv_spatial_clustering_labels():
+    img = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_MULTI_MASK), -1)
+    pcv.params.debug = None
+    _, clust_masks = pcv.spatial_clustering(img, algorithm="DBSCAN", min_cluster_size=10)
+    _, labels = pcv.spatial_clustering(img, algorithm="DBSCAN", min_cluster_size=10, return_labels=True)
+    assert labels.dtype == np.int32 and all(np.array_equal(m > 0, labels == i + 1) for i, m in enumerate(clust_masks))
+
+
 def test_plantcv_spatial_clustering_badinput():
     img = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_MULTI_MASK), -1)
     pcv.params.debug = None
     with pytest.raises(NameError):
         _ = pcv.spatial_clustering(img, algorithm="Hydra", min_cluster_size=5, max_distance=100)
+    with pytest.raises(NameError):
+        _ = pcv.spatial_clustering(img, algorithm="DBSCAN", min_cluster_size=5, precluster="Hydra")
+    with pytest.raises(NameError):
+        _ = pcv.spatial_clustering(img, algorithm="OPTICS", min_cluster_size=100, precluster="grid")
 
 
 # ##############################
@@ -3453,6 +4076,31 @@ def test_plantcv_morphology_find_tips_no_mask():
     assert np.sum(tips) == 9435
 
 
+def test_plantcv_morphology_skeleton_graph():
+    pcv.params.debug = None
+    skeleton = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_SKELETON), -1)
+    graph = pcv.morphology.SkeletonGraph(skel_img=skeleton)
+    # Edges and junctions partition the skeleton
+    n_pixels = sum([len(edge) for edge in graph.edges]) + sum([len(junction) for junction in graph.junctions])
+    # Edges and junctions are adjacent to each other
+    connected = all([edge in graph.adjacency[junction] for edge, junctions in enumerate(graph.edge_junctions)
+                     for junction in junctions])
+    assert np.array_equal(graph.tip_img, pcv.morphology.find_tips(skel_img=skeleton)) and \
+        np.array_equal(graph.branch_pts_img, pcv.morphology.find_branch_pts(skel_img=skeleton)) and \
+        n_pixels == np.count_nonzero(skeleton) and connected and len(graph.edges) == len(graph.segment_objects)
+
+
+def test_plantcv_morphology_skeleton_graph_input():
+    pcv.params.debug = None
+    skeleton = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_SKELETON), -1)
+    graph = pcv.morphology.SkeletonGraph(skel_img=skeleton)
+    _, segment_objects = pcv.morphology.segment_skeleton(skel_img=graph)
+    leaf_obj, stem_obj = pcv.morphology.segment_sort(skel_img=graph, objects=segment_objects)
+    pruned_img, _, _ = pcv.morphology.prune(skel_img=graph, size=3)
+    assert len(segment_objects) == 73 and len(leaf_obj) == 36 and \
+        np.array_equal(pruned_img, pcv.morphology.prune(skel_img=skeleton, size=3)[0])
+
+
 def test_plantcv_morphology_prune():
     skeleton = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_SKELETON), -1)
     pcv.params.debug = None
@@ -3484,6 +4132,17 @@ def test_plantcv_morphology_iterative_prune():
     assert np.sum(pruned_img) < np.sum(skeleton)
 
 
+def test_plantcv_morphology_iterative_prune_rounds():
+    pcv.params.debug = None
+    skeleton = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_SKELETON), -1)
+    # Remove tips one round at a time
+    expected = skeleton.copy()
+    for _ in range(12):
+        expected = pcv.image_subtract(expected, pcv.morphology.find_tips(skel_img=expected))
+    pruned_img = pcv.morphology._iterative_prune(skel_img=skeleton, size=12)
+    assert np.array_equal(pruned_img, expected)
+
+
 def test_plantcv_morphology_segment_skeleton():
     pcv.params.debug = None
     mask = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_BINARY), -1)
@@ -3599,6 +4258,21 @@ def test_plantcv_morphology_segment_sort_no_mask():
     assert len(leaf_obj) == 36
 
 
+def test_plantcv_morphology_segment_sort_full_frame():
+    pcv.params.debug = None
+    skeleton = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_SKELETON), -1)
+    segmented_img, seg_objects = pcv.morphology.segment_skeleton(skel_img=skeleton)
+    leaf_obj, stem_obj = pcv.morphology.segment_sort(skeleton, seg_objects, first_stem=False)
+    # Sort segments by drawing each one on a full-size image
+    tips = cv2.dilate(pcv.morphology.find_tips(skel_img=skeleton), np.ones((3, 3), np.uint8))
+    n_leaves = 0
+    for i in range(len(seg_objects)):
+        segment_plot = np.zeros(skeleton.shape, np.uint8)
+        cv2.drawContours(segment_plot, seg_objects, i, 255, 1, lineType=8)
+        n_leaves += int(np.any(np.logical_and(segment_plot, tips)))
+    assert len(leaf_obj) == n_leaves and len(leaf_obj) + len(stem_obj) == len(seg_objects)
+
+
 def test_plantcv_morphology_segment_tangent_angle():
     # Clear previous outputs
     pcv.outputs.clear()
@@ -3736,8 +4410,43 @@ def test_plantcv_hyperspectral_read_data_approx_pseudorgb():
     assert np.shape(array_data.array_data) == (1, 1600, 978)
 
 
-def test_plantcv_hyperspectral_read_data_bad_interleave():
+def test_plantcv_hyperspectral_read_data_bip():
+    pcv.params.debug = None
     spectral_filename = os.path.join(HYPERSPECTRAL_TEST_DATA, HYPERSPECTRAL_DATA_BAD_INTERLEAVE)
+    array_data = pcv.hyperspectral.read_data(filename=spectral_filename)
+    assert np.shape(array_data.array_data) == (1, 1600, 978)
+
+
+def test_plantcv_hyperspectral_read_data_memmap():
+    pcv.params.debug = None
+    spectral_filename = os.path.join(HYPERSPECTRAL_TEST_DATA, HYPERSPECTRAL_DATA)
+    array_data = pcv.hyperspectral.read_data(filename=spectral_filename)
+    mapped_data = pcv.hyperspectral.read_data(filename=spectral_filename, memmap=True)
+    # Assert that the memory-mapped datacube and pseudo-RGB image match the in-memory versions
+    assert isinstance(mapped_data.array_data, np.memmap) and \
+        np.array_equal(mapped_data.array_data, array_data.array_data) and \
+        np.array_equal(mapped_data.pseudo_rgb, array_data.pseudo_rgb)
+
+
+def test_plantcv_hyperspectral_read_data_memmap_index():
+    pcv.params.debug = None
+    spectral_filename = os.path.join(HYPERSPECTRAL_TEST_DATA, HYPERSPECTRAL_DATA)
+    array_data = pcv.hyperspectral.read_data(filename=spectral_filename, memmap=True)
+    index_array = pcv.spectral_index.ndvi(hsi=array_data, distance=20)
+    assert np.shape(index_array.array_data) == (1, 1600) and np.nanmax(index_array.pseudo_rgb) == 255
+
+
+def test_plantcv_hyperspectral_read_data_bad_interleave():
+    # Test cache directory
+    cache_dir = os.path.join(TEST_TMPDIR, "test_plantcv_hyperspectral_read_data_bad_interleave")
+    os.mkdir(cache_dir)
+    # Copy the test data with an unsupported interleave type in the header
+    spectral_filename = os.path.join(cache_dir, HYPERSPECTRAL_DATA_BAD_INTERLEAVE)
+    shutil.copyfile(os.path.join(HYPERSPECTRAL_TEST_DATA, HYPERSPECTRAL_DATA_BAD_INTERLEAVE), spectral_filename)
+    with open(os.path.join(HYPERSPECTRAL_TEST_DATA, HYPERSPECTRAL_HDR_BAD_INTERLEAVE), "r") as fp:
+        header = fp.read().replace("interleave = bip", "interleave = bad")
+    with open(os.path.join(cache_dir, HYPERSPECTRAL_HDR_BAD_INTERLEAVE), "w") as fp:
+        fp.write(header)
     with pytest.raises(RuntimeError):
         _ = pcv.hyperspectral.read_data(filename=spectral_filename)
 
@@ -4208,6 +4917,37 @@ def test_plantcv_spectral_index_wi_bad_input():
         _ = pcv.spectral_index.wi(hsi=index_array, distance=20)
 
 
+def test_plantcv_spectral_index_batch():
+    pcv.params.debug = None
+    spectral_filename = os.path.join(HYPERSPECTRAL_TEST_DATA, HYPERSPECTRAL_DATA)
+    array_data = pcv.hyperspectral.read_data(filename=spectral_filename)
+    index_arrays = pcv.spectral_index.batch(hsi=array_data, indices=["ndvi", "evi", "mtci", "wi"], distance=20)
+    ndvi = pcv.spectral_index.ndvi(hsi=array_data, distance=20)
+    assert sorted(index_arrays.keys()) == ["evi", "mtci", "ndvi", "wi"] and \
+        np.array_equal(index_arrays["ndvi"].array_data, ndvi.array_data) and \
+        index_arrays["evi"].array_type == "index_evi"
+
+
+def test_plantcv_spectral_index_batch_tiles():
+    pcv.params.debug = None
+    spectral_filename = os.path.join(HYPERSPECTRAL_TEST_DATA, HYPERSPECTRAL_DATA)
+    array_data = pcv.hyperspectral.read_data(filename=spectral_filename)
+    # Stack the single line datacube so it spans several blocks of lines
+    array_data.array_data = np.tile(array_data.array_data, (600, 1, 1))
+    index_arrays = pcv.spectral_index.batch(hsi=array_data, indices=["savi", "psri"], distance=20)
+    savi = pcv.spectral_index.savi(hsi=array_data, distance=20)
+    assert np.shape(index_arrays["psri"].array_data) == (600, 1600) and \
+        np.array_equal(index_arrays["savi"].array_data, savi.array_data)
+
+
+def test_plantcv_spectral_index_batch_bad_index():
+    pcv.params.debug = None
+    spectral_filename = os.path.join(HYPERSPECTRAL_TEST_DATA, HYPERSPECTRAL_DATA)
+    array_data = pcv.hyperspectral.read_data(filename=spectral_filename)
+    with pytest.raises(RuntimeError):
+        _ = pcv.spectral_index.batch(hsi=array_data, indices=["ndvi", "egi"], distance=20)
+
+
 def test_plantcv_hyperspectral_analyze_spectral():
     # Clear previous outputs
     pcv.outputs.clear()
@@ -5390,6 +6130,33 @@ def test_plantcv_threshold_texture():
         assert 0
 
 
+@pytest.mark.parametrize("offset", [2, 0])
+def test_plantcv_threshold_texture_methods(offset):
+    from skimage.feature import greycomatrix, greycoprops
+    pcv.params.debug = None
+    gray_img = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_GRAY_SMALL), -1)[:20, :20]
+    for texture_method in ['contrast', 'dissimilarity', 'homogeneity', 'ASM', 'energy', 'correlation']:
+        # Calculate the texture for every window with skimage
+        def calc_texture(inputs):
+            glcm = greycomatrix(np.reshape(inputs, (5, 5)).astype(np.uint8), [offset], [0], 256, symmetric=True,
+                                normed=True)
+            return greycoprops(glcm, texture_method)[0, 0]
+        expected = generic_filter(gray_img.astype(np.float64), calc_texture, size=5, mode='reflect')
+        textures = pcv.threshold.threshold_methods._glcm_props(gray_img=gray_img, ksize=5, offset=offset,
+                                                               props=[texture_method], borders='reflect')
+        # Assert that the moving-window GLCM properties match skimage
+        assert np.allclose(textures[texture_method], expected)
+
+
+def test_plantcv_threshold_texture_bad_offset():
+    pcv.params.debug = None
+    gray_img = cv2.imread(os.path.join(TEST_DATA, TEST_INPUT_GRAY_SMALL), -1)
+    with pytest.raises(RuntimeError):
+        _ = pcv.threshold.texture(gray_img, ksize=3, threshold=7, offset=3)
+    with pytest.raises(RuntimeError):
+        _ = pcv.threshold.texture(gray_img, ksize=3, threshold=7, offset=-1)
+
+
 def create_test_img(sz_img):
     img = np.random.randint(np.prod(sz_img), size=sz_img) * 255
     img = img.astype(np.uint8)